@@ -1,169 +1,111 @@
 #!/usr/bin/env python3
 """
-Add 4 Placeholder Car Listings to DynamoDB
-This script reads SEED_CAR_LISTINGS.json and adds each listing to the CarListings table
+Add Placeholder Car Listings to DynamoDB
+This script streams SEED_CAR_LISTINGS.json (or any JSON array / JSON Lines feed, optionally .gz)
+and writes the listings to the CarListings table from several writer threads. Invalid rows are
+skipped and reported. Re-runs are cheap: a state file next to the feed (FILE.import-state.json)
+records the content hash of every listing written and how far the last run got, so unchanged rows
+are skipped, and changed ones are written with a conditional PutItem that leaves listings whose
+stored contentHash already matches (and their updatedAt) alone. --batch writes with BatchWriteItem
+instead (25 per call, no condition), for a first load into an empty table.
+
+Usage: python add-placeholder-listings.py [--file FILE] [--table CarListings] [--region us-east-1]
+                                          [--workers 4] [--segments 8] [--state FILE] [--fresh] [--batch]
+                                          [--endpoint-url http://localhost:8000]
 """
 
-import json
-import subprocess
+import argparse
 import sys
 
-def run_command(cmd):
-    """Run a shell command and return the result"""
-    try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        return result.returncode == 0, result.stdout, result.stderr
-    except Exception as e:
-        return False, "", str(e)
+import boto3
 
-def add_listing_to_dynamodb(listing):
-    """Add a single listing to DynamoDB using AWS CLI"""
-    # Convert Python dict to JSON string for CLI
-    item_json = json.dumps(listing)
-    
-    # Create a temporary file with the item
-    temp_file = f"temp-{listing['listingId']}.json"
-    with open(temp_file, 'w') as f:
-        json.dump(listing, f)
-    
-    # Use AWS CLI to put the item
-    cmd = f'aws dynamodb put-item --table-name CarListings --region us-east-1 --item file://{temp_file}'
-    success, stdout, stderr = run_command(cmd)
-    
-    # Clean up temp file
-    try:
-        import os
-        os.remove(temp_file)
-    except:
-        pass
-    
-    return success, stderr
+from listing_tools.bulk_loader import BulkLoader
+from listing_tools.checkpoint import ImportCheckpoint, changed_condition
+from listing_tools.ingest import FeedReader, IngestProgress
+from listing_tools.scan import ParallelScan
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Bulk-load car listings into DynamoDB')
+    parser.add_argument('--file', default='SEED_CAR_LISTINGS.json', help='JSON array or JSON Lines of listings (.gz ok)')
+    parser.add_argument('--table', default='CarListings')
+    parser.add_argument('--region', default='us-east-1')
+    parser.add_argument('--workers', type=int, default=4, help='writer threads')
+    parser.add_argument('--endpoint-url', help='e.g. http://localhost:8000 for DynamoDB Local')
+    parser.add_argument('--segments', type=int, default=8, help='parallel scan segments for the final count')
+    parser.add_argument('--state', help='checkpoint file (default: FILE.import-state.json)')
+    parser.add_argument('--fresh', action='store_true', help='ignore the checkpoint and look at every row again')
+    parser.add_argument('--batch', action='store_true', help='BatchWriteItem without conditions (empty table)')
+    parser.add_argument('--progress-every', type=float, default=2.0, help='seconds between progress lines')
+    return parser.parse_args()
 
 def main():
-    print("🚗 Adding 4 Placeholder Car Listings to DynamoDB...")
-    print("=" * 60)
+    args = parse_args()
     
-    # Read seed data
+    # Stream seed data
     try:
-        with open('SEED_CAR_LISTINGS.json', 'r') as f:
-            listings = json.load(f)
+        reader = FeedReader(args.file)
     except FileNotFoundError:
-        print("❌ Error: SEED_CAR_LISTINGS.json not found!")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        print(f"❌ Error parsing JSON: {e}")
+        print(f"❌ Error: {args.file} not found!")
         sys.exit(1)
     
-    # Add each listing
-    success_count = 0
-    for i, listing in enumerate(listings, 1):
-        car_name = f"{listing['car']['make']} {listing['car']['model']} ({listing['car']['registrationYear']})"
-        print(f"\n[{i}/4] Adding: {car_name}...")
-        
-        # Convert to DynamoDB format
-        dynamodb_item = convert_to_dynamodb_format(listing)
-        
-        success, error = add_listing_to_dynamodb(dynamodb_item)
-        
-        if success:
-            print(f"✅ Successfully added: {car_name}")
-            success_count += 1
-        else:
-            print(f"❌ Failed to add: {car_name}")
-            if error:
-                print(f"   Error: {error}")
+    print(f"🚗 Adding Car Listings from {args.file} ({reader.size / 1024 / 1024:.1f} MB) to DynamoDB ({args.table})...")
+    print("=" * 60)
+    
+    client = boto3.client('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+    progress = IngestProgress(reader, interval=args.progress_every, out=lambda line: print(f"   {line}", flush=True))
+    problems = []
+    
+    checkpoint = ImportCheckpoint(args.state or f"{args.file}.import-state.json", args.file)
+    if not args.fresh and checkpoint.load():
+        print(f"📌 Resuming from {checkpoint.path}: {len(checkpoint.hashes)} listings known, "
+              f"rows up to {checkpoint.offset} done")
+    
+    def valid_listings():
+        for number, listing, errors in reader:
+            if errors:
+                if len(problems) < 20:
+                    problems.append(f"row {number}: {'; '.join(errors)}")
+                listing = None
+            yield listing
+    
+    loader = BulkLoader(client, args.table, workers=args.workers, on_batch=progress, on_done=checkpoint.committed,
+                        condition=None if args.batch else changed_condition)
+    try:
+        with reader:
+            stats = loader.load(checkpoint.select(valid_listings()))
+    except ValueError as e:
+        print(f"❌ Error parsing {args.file}: {e}")
+        sys.exit(1)
+    finally:
+        checkpoint.save()
     
     print("\n" + "=" * 60)
-    print(f"✅ Added {success_count}/4 placeholder listings successfully!")
+    print(f"✅ Added {stats.written}/{reader.rows} listings in {stats.elapsed:.1f}s "
+          f"({stats.items_per_second:.0f} items/s, {stats.batches} batches, {stats.retries} retries)")
+    print(f"⏭️ Skipped {checkpoint.resumed} rows done by an earlier run, {checkpoint.unchanged} unchanged, "
+          f"{stats.skipped} already up to date in the table")
+    if reader.invalid:
+        print(f"⚠️ Skipped {reader.invalid} invalid rows")
+        for problem in problems:
+            print(f"   {problem}")
+    if stats.failed:
+        print(f"❌ Failed to add {stats.failed} listings")
+        for error in stats.errors:
+            print(f"   Error: {error}")
     print("=" * 60)
     
     # Verify
     print("\n🔍 Verifying listings in DynamoDB...")
-    cmd = 'aws dynamodb scan --table-name CarListings --region us-east-1 --select COUNT'
-    success, stdout, stderr = run_command(cmd)
-    if success:
-        try:
-            result = json.loads(stdout)
-            count = result.get('Count', 0)
-            print(f"✅ Total listings in table: {count}")
-        except:
-            print("✅ Listings added (count verification failed)")
+    try:
+        summary = ParallelScan(client, args.table, segments=args.segments).count()
+        print(f"✅ Total listings in table: {summary.count} ({summary.elapsed:.1f}s, {args.segments} scan segments)")
+    except Exception as e:
+        print(f"✅ Listings added (count verification failed: {e})")
     
-    print("\n🎉 Placeholder listings are ready!")
-    print("📝 These 4 cars will be visible on your website after deployment.\n")
-
-def convert_to_dynamodb_format(listing):
-    """Convert JSON listing to DynamoDB item format"""
-    return {
-        "listingId": {"S": listing["listingId"]},
-        "status": {"S": listing["status"]},
-        "isPlaceholder": {"BOOL": listing["isPlaceholder"]},
-        "createdAt": {"S": listing["createdAt"]},
-        "updatedAt": {"S": listing["updatedAt"]},
-        "seller": {
-            "M": {
-                "name": {"S": listing["seller"]["name"]},
-                "mobile": {"S": listing["seller"]["mobile"]},
-                "email": {"S": listing["seller"]["email"]}
-            }
-        },
-        "car": {
-            "M": {
-                "make": {"S": listing["car"]["make"]},
-                "model": {"S": listing["car"]["model"]},
-                "edition": {"S": listing["car"]["edition"]},
-                "registrationYear": {"S": listing["car"]["registrationYear"]},
-                "kmsDriven": {"S": listing["car"]["kmsDriven"]},
-                "expectedPrice": {"S": listing["car"]["expectedPrice"]}
-            }
-        },
-        "photos": {
-            "M": {
-                "exteriorFront": {
-                    "M": {
-                        "key": {"S": listing["photos"]["exteriorFront"]["key"]},
-                        "url": {"S": listing["photos"]["exteriorFront"]["url"]},
-                        "contentType": {"S": listing["photos"]["exteriorFront"]["contentType"]}
-                    }
-                },
-                "exteriorBack": {
-                    "M": {
-                        "key": {"S": listing["photos"]["exteriorBack"]["key"]},
-                        "url": {"S": listing["photos"]["exteriorBack"]["url"]},
-                        "contentType": {"S": listing["photos"]["exteriorBack"]["contentType"]}
-                    }
-                },
-                "exteriorLeft": {
-                    "M": {
-                        "key": {"S": listing["photos"]["exteriorLeft"]["key"]},
-                        "url": {"S": listing["photos"]["exteriorLeft"]["url"]},
-                        "contentType": {"S": listing["photos"]["exteriorLeft"]["contentType"]}
-                    }
-                },
-                "exteriorRight": {
-                    "M": {
-                        "key": {"S": listing["photos"]["exteriorRight"]["key"]},
-                        "url": {"S": listing["photos"]["exteriorRight"]["url"]},
-                        "contentType": {"S": listing["photos"]["exteriorRight"]["contentType"]}
-                    }
-                },
-                "interiorSeat": {
-                    "M": {
-                        "key": {"S": listing["photos"]["interiorSeat"]["key"]},
-                        "url": {"S": listing["photos"]["interiorSeat"]["url"]},
-                        "contentType": {"S": listing["photos"]["interiorSeat"]["contentType"]}
-                    }
-                },
-                "interiorCluster": {
-                    "M": {
-                        "key": {"S": listing["photos"]["interiorCluster"]["key"]},
-                        "url": {"S": listing["photos"]["interiorCluster"]["url"]},
-                        "contentType": {"S": listing["photos"]["interiorCluster"]["contentType"]}
-                    }
-                }
-            }
-        }
-    }
+    print("\n🎉 Listings are ready!")
+    print("📝 Approved cars will be visible on your website after deployment.\n")
+    if stats.failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
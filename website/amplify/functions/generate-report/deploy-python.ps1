@@ -18,7 +18,9 @@ Write-Host "📦 Installing Python dependencies..." -ForegroundColor Yellow
 pip install -r requirements.txt -t package --quiet
 
 # Copy lambda function
-Copy-Item lambda_function.py package\
+Copy-Item lambda_function.py, pdf_writer.py, report_ids.py, ratings.py, notes.py, fonts.py, photos.py, report_index.py, linearize.py package\
+# Devanagari TTF for Hindi/Marathi notes (see fonts.py)
+Copy-Item fonts package\ -Recurse -Force
 
 # Create ZIP
 Write-Host "🗜️ Creating deployment package..." -ForegroundColor Yellow
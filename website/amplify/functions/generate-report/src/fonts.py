@@ -0,0 +1,130 @@
+"""
+Unicode font for user text (Hindi / Marathi notes and the like)
+
+The report's Helvetica only covers WinAnsi (Latin-1), so Devanagari came
+out as black boxes. Text that Helvetica cannot encode is set in a TrueType
+font instead, run by run, so Latin text keeps the report's look.
+
+Font files (glyf-outline TTF, e.g. Noto Sans Devanagari) are looked up in
+REPORT_FONT_DIR (default: fonts/ next to this module, which ships Noto Sans
+Devanagari Regular under the SIL Open Font License, see fonts/OFL.txt):
+- REPORT_FONT_REGULAR: default NotoSansDevanagari-Regular.ttf
+- REPORT_FONT_BOLD: default NotoSansDevanagari-Bold.ttf (regular is used
+  when there is no bold file, as with the shipped fonts)
+Without a font file everything stays in Helvetica, as before.
+
+Limitation: reportlab 4.0 does no text shaping, so glyphs are drawn one
+per character in Unicode order. Devanagari comes out readable but not
+typeset correctly: the pre-base vowel sign (ि) is drawn after its
+consonant instead of before it ("कि" shows as क followed by ि), and
+conjuncts show as the consonants joined by a visible virama ("क्ष" as
+क, virama, ष). Latin text is unaffected.
+
+Costs and caching:
+- a font file is parsed once per process, on first use, and registered
+  with pdfmetrics for every later report
+- reportlab embeds a freshly built subset of the font in every PDF; built
+  subsets are cached by their glyph list, and each document starts its
+  first subset with ASCII plus the whole Devanagari block in a fixed order,
+  so that subset is identical, and built once, for every report
+"""
+
+import os
+import threading
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont, TTFontFace
+
+FONT_DIR = os.environ.get('REPORT_FONT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts'))
+FONT_FILES = {
+    False: os.environ.get('REPORT_FONT_REGULAR', 'NotoSansDevanagari-Regular.ttf'),
+    True: os.environ.get('REPORT_FONT_BOLD', 'NotoSansDevanagari-Bold.ttf'),
+}
+BASE_ENCODING = 'cp1252'    # what Helvetica and the other standard fonts cover
+DEVANAGARI = ''.join(map(chr, range(0x0900, 0x0980)))
+SUBSET_CACHE_SIZE = 64     # built subsets kept per font
+
+_fonts = {}
+_lock = threading.Lock()
+
+
+class CachedSubsetFace(TTFontFace):
+    """TTFontFace that builds each distinct subset once per process"""
+
+    def makeSubset(self, subset):
+        key = tuple(subset)
+        data = self._subsets.get(key)
+        if data is None:
+            data = TTFontFace.makeSubset(self, subset)
+            if len(self._subsets) >= SUBSET_CACHE_SIZE:
+                self._subsets.pop(next(iter(self._subsets)))
+            self._subsets[key] = data
+        return data
+
+
+class ReportTTFont(TTFont):
+    """TTFont whose per-document subsets start with a fixed character block"""
+
+    def __init__(self, name, filename, preload=DEVANAGARI):
+        TTFont.__init__(self, name, filename)
+        # adopt the parsed face rather than parsing the file again
+        self.face.__class__ = CachedSubsetFace
+        self.face._subsets = {}
+        self.preload = preload
+
+    def splitString(self, text, doc, encoding='utf-8'):
+        if self.preload and doc not in self.state:
+            TTFont.splitString(self, self.preload, doc)
+        return TTFont.splitString(self, text, doc, encoding)
+
+
+def _load(filename, quiet=False):
+    """Registered font name for a file, parsing it on first use; None if missing"""
+    name = os.path.splitext(filename)[0]
+    if name not in _fonts:
+        with _lock:
+            if name not in _fonts:
+                path = os.path.join(FONT_DIR, filename)
+                if os.path.exists(path):
+                    pdfmetrics.registerFont(ReportTTFont(name, path))
+                    print(f"✅ Loaded font {filename}")
+                    _fonts[name] = name
+                else:
+                    if not quiet:
+                        print(f"⚠️ Font {path} not found, non-Latin text stays in Helvetica")
+                    _fonts[name] = None
+    return _fonts[name]
+
+
+def unicode_font(bold=False):
+    """Name of the Unicode TTF to use, or None when no font file is installed"""
+    if bold:
+        name = _load(FONT_FILES[True], quiet=True)
+        if name:
+            return name
+    return _load(FONT_FILES[False])
+
+
+def needs_unicode(text):
+    """True if the standard fonts cannot show text"""
+    try:
+        text.encode(BASE_ENCODING)
+        return False
+    except UnicodeEncodeError:
+        return True
+
+
+def script_runs(text):
+    """Split text into (needs_unicode, run) pieces, in order"""
+    if not needs_unicode(text):
+        return [(False, text)]
+    runs = []
+    start = 0
+    current = None
+    for i, char in enumerate(text):
+        flag = needs_unicode(char)
+        if flag != current and i > start:
+            runs.append((current, text[start:i]))
+            start = i
+        current = flag
+    runs.append((current, text[start:]))
+    return runs
@@ -11,17 +11,32 @@ Professional Vehicle Inspection Report Generator - FINAL VERSION
 import json
 import boto3
 import io
+import os
 import base64
+import bisect
 import math
+import tempfile
+import threading
+import time
 from datetime import datetime
+from functools import lru_cache, partial
 from PIL import Image
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage, KeepTogether
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, KeepTogether, Flowable
 from reportlab.lib.styles import ParagraphStyle
-from reportlab.pdfgen import canvas
 from reportlab.lib.colors import HexColor
-from reportlab.graphics.shapes import Drawing, Polygon, String
+from reportlab.graphics.shapes import Drawing, Polygon, Rect, String
+from reportlab.graphics import renderPDF
+from reportlab.lib.utils import simpleSplit
+from pdf_writer import ReportCanvas
+from report_ids import new_report_id
+from ratings import RatingCategory, parse_ratings
+from notes import notes_paragraph
+from fonts import needs_unicode, unicode_font
+from photos import LazyPhoto, PhotoStore
+from report_index import ReportRecord, default_index
+from linearize import linearize, linearize_file
 
 # VIBRANT COLOR PALETTE
 COLOR_PRIMARY = HexColor('#004a99')      # Primary blue
@@ -46,11 +61,97 @@ PAGE_MARGIN = 18 * mm
 PAGE_WIDTH, PAGE_HEIGHT = A4
 CONTENT_WIDTH = PAGE_WIDTH - (2 * PAGE_MARGIN)
 
+# CHECKLIST - status key: (label, colour); free-form statuses map via aliases
+CHECKLIST_STATUS = {
+    'ok': ('OK', HexColor('#16a34a')),
+    'attention': ('Attention', HexColor('#d97706')),
+    'fail': ('Fail', HexColor('#dc2626')),
+    'na': ('N/A', COLOR_META),
+}
+CHECKLIST_STATUS_ALIASES = {
+    'pass': 'ok', 'good': 'ok', 'yes': 'ok',
+    'warn': 'attention', 'minor': 'attention', 'repair': 'attention',
+    'bad': 'fail', 'no': 'fail', 'replace': 'fail',
+    'n/a': 'na', '': 'na',
+}
+CHECKLIST_MAX_LINES = 20        # per cell, so one row always fits a page
 
-def compress_image(image_data, max_width=1200, max_height=1200, quality=85):
+# OUTPUT - stream finished pages/photos to a temp file instead of memory (bounds
+# memory, not time: page streams are then compressed serially as they are written)
+STREAM_PDF = os.environ.get('PDF_STREAMING', '0') == '1'
+# OUTPUT - rewrite the finished PDF linearized, so viewers show page 1 early
+LINEARIZE_PDF = os.environ.get('PDF_LINEARIZE', '0') == '1'
+
+# INIT - render a throwaway report at import so the first request is warm
+WARMUP = os.environ.get('REPORT_WARMUP', '1') == '1'
+
+# INDEX - reports are recorded in REPORT_INDEX (see report_index.py); the
+# artifact location is this prefix + the PDF filename
+ARTIFACT_BASE = os.environ.get('REPORT_ARTIFACT_BASE', '')
+
+
+# RENDER BUDGET - photo settings, cheapest last, with relative cost
+IMAGE_LEVELS = [
+    (None, dict(max_width=1200, max_height=1200, quality=85, optimize=True), 1.0),
+    ('no-optimize', dict(max_width=1200, max_height=1200, quality=85, optimize=False), 0.8),
+    ('reduced-resolution', dict(max_width=800, max_height=800, quality=70, optimize=False, draft=True), 0.4),
+    ('thumbnails', dict(max_width=400, max_height=400, quality=60, optimize=False, draft=True), 0.2),
+]
+DEADLINE_RESERVE_MS = 2000      # response encoding + safety margin
+BUILD_BASE_MS = 500             # doc.build without photos
+BUILD_PER_IMAGE_MS = 80         # doc.build cost per photo
+IMAGE_ESTIMATE_MS = 400         # first guess per full-quality photo
+
+
+class RenderBudget:
+    """Picks photo settings so the report is ready before the Lambda deadline
+    
+    Photos start at full quality. Before each one the remaining work is
+    estimated from the average time taken so far; if it would not fit in the
+    time left, the next cheaper IMAGE_LEVELS entry is used from then on.
+    Degradations only ever get stronger and are listed in `degradations`.
+    """
+    
+    def __init__(self, context=None):
+        remaining = context.get_remaining_time_in_millis() if context is not None else None
+        self.deadline = time.monotonic() + remaining / 1000 if remaining else None
+        self.level = 0
+        self.degradations = []
+        self._image_ms = []
+    
+    def remaining_ms(self):
+        if self.deadline is None:
+            return None
+        return (self.deadline - time.monotonic()) * 1000
+    
+    def _full_quality_ms(self):
+        if not self._image_ms:
+            return IMAGE_ESTIMATE_MS
+        return sum(ms / IMAGE_LEVELS[level][2] for level, ms in self._image_ms) / len(self._image_ms)
+    
+    def image_settings(self, images_left, images_total):
+        """compress_image kwargs for the next photo"""
+        remaining = self.remaining_ms()
+        if remaining is not None:
+            available = remaining - DEADLINE_RESERVE_MS - BUILD_BASE_MS - BUILD_PER_IMAGE_MS * images_total
+            per_image = self._full_quality_ms()
+            while self.level < len(IMAGE_LEVELS) - 1 and images_left * per_image * IMAGE_LEVELS[self.level][2] > available:
+                self.level += 1
+                self.degradations.append(IMAGE_LEVELS[self.level][0])
+                print(f"⏱️ {remaining:.0f}ms left, photos now: {IMAGE_LEVELS[self.level][0]}")
+        return IMAGE_LEVELS[self.level][1]
+    
+    def record_image(self, elapsed_ms):
+        self._image_ms.append((self.level, elapsed_ms))
+
+
+def compress_image(image_data, max_width=1200, max_height=1200, quality=85, optimize=True, draft=False):
     """Compress large phone images"""
     try:
         img = Image.open(io.BytesIO(image_data))
+        if draft:
+            # JPEG only: let the decoder downscale by 1/2-1/8 while decoding
+            img.draft('RGB', (max_width, max_height))
         
         if img.mode in ('RGBA', 'LA', 'P'):
             background = Image.new('RGB', img.size, (255, 255, 255))
@@ -62,7 +163,7 @@ def compress_image(image_data, max_width=1200, max_height=1200, quality=85):
         img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
         
         output = io.BytesIO()
-        img.save(output, format='JPEG', quality=quality, optimize=True)
+        img.save(output, format='JPEG', quality=quality, optimize=optimize)
         compressed_data = output.getvalue()
         
         print(f"✅ Compressed: {len(image_data)/1024:.0f}KB → {len(compressed_data)/1024:.0f}KB")
@@ -73,28 +174,52 @@ def compress_image(image_data, max_width=1200, max_height=1200, quality=85):
         return image_data
 
 
-def parse_multipart(event):
-    """Parse multipart/form-data"""
+def report_mode(event):
+    """'preview' for a quick text-only proof, 'full' otherwise (?mode=preview)"""
+    params = event.get('queryStringParameters') or {}
+    return 'preview' if params.get('mode') == 'preview' else 'full'
+
+
+def iter_multipart(body, boundary):
+    """Yield (headers, start, end) for each part; its content is body[start:end]
+    
+    Works on offsets so callers only copy the parts they actually need.
+    """
+    delimiter = b'--' + boundary
+    pos = body.find(delimiter)
+    while pos != -1:
+        start = pos + len(delimiter)
+        next_pos = body.find(delimiter, start)
+        if next_pos == -1:
+            break
+        header_end = body.find(b'\r\n\r\n', start, next_pos)
+        if header_end != -1:
+            yield body[start:header_end].decode('utf-8', errors='ignore'), header_end + 4, next_pos - 2
+        pos = next_pos
+
+
+def parse_multipart(event, budget=None, preview=False, store=None):
+    """Parse multipart/form-data from an API Gateway event"""
     content_type = event['headers'].get('content-type') or event['headers'].get('Content-Type', '')
     body = base64.b64decode(event['body']) if event.get('isBase64Encoded') else event['body'].encode()
+    return parse_form_data(body, content_type, budget, preview, store)
+
+
+def parse_form_data(body, content_type, budget=None, preview=False, store=None):
+    """Parse a raw multipart/form-data body into (fields, files)
+    
+    In preview mode file parts are recorded by name only: their bytes are
+    never copied or decoded and 'content' is None.
+    With a PhotoStore, compressed photos go into the store and 'content' is
+    their StoredPhoto handle.
+    """
     boundary = content_type.split('boundary=')[1].encode()
     
     fields = {}
     files = {}
+    images = []
     
-    parts = body.split(b'--' + boundary)
-    
-    for part in parts[1:-1]:
-        if not part.strip():
-            continue
-            
-        header_end = part.find(b'\r\n\r\n')
-        if header_end == -1:
-            continue
-            
-        headers = part[:header_end].decode('utf-8', errors='ignore')
-        content = part[header_end+4:-2]
-        
+    for headers, start, end in iter_multipart(body, boundary):
         if 'Content-Disposition' in headers:
             name_match = headers.split('name="')[1].split('"')[0] if 'name="' in headers else None
             
@@ -103,38 +228,65 @@ def parse_multipart(event):
             
             if 'filename="' in headers:
                 filename = headers.split('filename="')[1].split('"')[0]
-                if any(ext in filename.lower() for ext in ['.jpg', '.jpeg', '.png', '.heic']):
-                    content = compress_image(content)
-                files[name_match] = {'filename': filename, 'content': content}
+                if any(ext in filename.lower() for ext in ['.jpg', '.jpeg', '.png', '.heic']) and name_match not in images:
+                    images.append(name_match)
+                files[name_match] = {'filename': filename, 'content': None if preview else body[start:end]}
             else:
-                fields[name_match] = content.decode('utf-8', errors='ignore')
+                fields[name_match] = body[start:end].decode('utf-8', errors='ignore')
+    
+    # Compress photos once the total is known, so the budget can plan ahead
+    budget = budget or RenderBudget()
+    for i, name in enumerate([] if preview else images):
+        started = time.monotonic()
+        settings = budget.image_settings(len(images) - i, len(images))
+        compressed = compress_image(files[name]['content'], **settings)
+        files[name]['content'] = compressed if store is None else store.put(name, compressed)
+        budget.record_image((time.monotonic() - started) * 1000)
     
     print(f"✅ Parsed {len(fields)} fields, {len(files)} files")
     return fields, files
 
 
-class FooterCanvas(canvas.Canvas):
-    """Custom canvas with colorful icons and light blue background"""
+class FooterCanvas(ReportCanvas):
+    """Custom canvas with colorful icons and light blue background
+    
+    "Page N of M" needs the page count, so pages are held until save().
+    When streaming, each page gets its footer and is written out right
+    away instead; its page number is a form XObject drawn at save().
+    """
     
     def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
+        ReportCanvas.__init__(self, *args, **kwargs)
         self.pages = []
+        self.page_count = 0
         
     def showPage(self):
-        self.pages.append(dict(self.__dict__))
+        self.page_count += 1
+        if self.streaming:
+            self.draw_footer(self.page_count, None)
+            ReportCanvas.showPage(self)
+        else:
+            self.pages.append(dict(self.__dict__))
         self._startPage()
         
     def save(self):
-        num_pages = len(self.pages)
+        num_pages = self.page_count
+        if self.streaming:
+            # only the background of a page after the last one is pending
+            self._code = []
+            for page_num in range(1, num_pages + 1):
+                self.beginForm(f'PageNumber{page_num}')
+                self.draw_page_number(page_num, num_pages)
+                self.endForm()
         for page_num, page in enumerate(self.pages, 1):
             self.__dict__.update(page)
             self.draw_footer(page_num, num_pages)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
+            ReportCanvas.showPage(self)
+        ReportCanvas.save(self)
     
     def _startPage(self):
         """Draw light blue background on EVERY page"""
-        canvas.Canvas._startPage(self)
+        ReportCanvas._startPage(self)
         self.setFillColor(COLOR_PAGE_BG)
         self.rect(0, 0, PAGE_WIDTH, PAGE_HEIGHT, fill=1, stroke=0)
     
@@ -189,29 +341,37 @@ class FooterCanvas(canvas.Canvas):
         self.setFillColor(COLOR_FOOTER)
         self.drawString(icon_x + 3 * mm, footer_y + 5 * mm, 'inspectionwale.com')
         
-        # Page number
-        self.setFont(FONT_FAMILY, FONT_SMALL - 1)
-        self.setFillColor(COLOR_META)
-        self.drawCentredString(PAGE_WIDTH / 2, footer_y + 1 * mm, f'Page {page_num} of {total_pages}')
+        # Page number (total_pages is None until save() when streaming)
+        if total_pages is None:
+            self.doForwardForm(f'PageNumber{page_num}')
+        else:
+            self.draw_page_number(page_num, total_pages)
         
         # Disclaimer
         self.setFont(FONT_FAMILY, FONT_SMALL - 2)
+        self.setFillColor(COLOR_META)
         self.drawCentredString(PAGE_WIDTH / 2, footer_y - 1.5 * mm, 
                                'Professional vehicle inspection report. Valid for 2 days or 20 km.')
+    
+    def draw_page_number(self, page_num, total_pages):
+        footer_y = PAGE_MARGIN - 5 * mm
+        self.setFont(FONT_FAMILY, FONT_SMALL - 1)
+        self.setFillColor(COLOR_META)
+        self.drawCentredString(PAGE_WIDTH / 2, footer_y + 1 * mm, f'Page {page_num} of {total_pages}')
 
 
-def create_header(data):
+def create_header(data, preview=False):
     """Create header with vibrant blue border"""
-    report_id = f"INS-{int(datetime.now().timestamp())}"
+    report_id = new_report_id()
     report_date = datetime.now().strftime('%d %b %Y')
     
     header_data = [
         ['InspectionWale\nRebranded from Whizzcheck', 
-         'Vehicle Inspection Report', 
+         'Vehicle Inspection Report\n(Preview)' if preview else 'Vehicle Inspection Report', 
          f'Inspection ID:\n{report_id}\n\nDate:\n{report_date}']
     ]
     
-    header_table = Table(header_data, colWidths=[60*mm, 80*mm, 34*mm])
+    header_table = Table(header_data, colWidths=[62*mm, 70*mm, 42*mm])
     header_table.setStyle(TableStyle([
         ('FONT', (0, 0), (0, 0), f'{FONT_FAMILY}-Bold', FONT_TITLE),
         ('TEXTCOLOR', (0, 0), (0, 0), COLOR_PRIMARY),
@@ -326,21 +486,31 @@ def create_two_column_card_table(data_rows, card_padding=14):
     return card_table
 
 
+# Unit 5-pointed star (outer radius 1), alternating outer/inner vertices
+STAR_UNIT_POINTS = tuple(
+    (r * math.cos(angle), r * math.sin(angle))
+    for angle, r in (
+        ((i * 36 - 90) * math.pi / 180, 1.0 if i % 2 == 0 else 0.4)
+        for i in range(10)
+    )
+)
+
+
 def create_star_shape(x, y, size):
     """Create 5-pointed star polygon"""
     points = []
-    for i in range(10):
-        angle = (i * 36 - 90) * math.pi / 180
-        r = size if i % 2 == 0 else size * 0.4
-        points.append(x + r * math.cos(angle))
-        points.append(y + r * math.sin(angle))
+    for ux, uy in STAR_UNIT_POINTS:
+        points.append(x + size * ux)
+        points.append(y + size * uy)
     return points
 
 
-def create_star_drawing(rating):
-    """Draw actual star shapes"""
-    full_stars = int(rating)
-    half_star = (rating % 1) >= 0.5
+@lru_cache(maxsize=None)
+def _star_drawing(half_steps):
+    """Star drawing for a rating of half_steps / 2, built once per process"""
+    rating = half_steps / 2
+    full_stars = half_steps // 2
+    half_star = half_steps % 2 == 1
     empty_stars = 5 - full_stars - (1 if half_star else 0)
     
     d = Drawing(120, 16)
@@ -350,7 +520,7 @@ def create_star_drawing(rating):
     
     vibrant_gold = HexColor('#fbbf24')
     
-    for i in range(full_stars):
+    for i in range(full_stars + (1 if half_star else 0)):
         x = x_start + i * 14
         star = Polygon(create_star_shape(x + star_size, y_center, star_size))
         star.fillColor = vibrant_gold
@@ -358,14 +528,6 @@ def create_star_drawing(rating):
         star.strokeWidth = 0.8
         d.add(star)
     
-    if half_star:
-        x = x_start + full_stars * 14
-        star = Polygon(create_star_shape(x + star_size, y_center, star_size))
-        star.fillColor = vibrant_gold
-        star.strokeColor = HexColor('#f59e0b')
-        star.strokeWidth = 0.8
-        d.add(star)
-    
     for i in range(empty_stars):
         x = x_start + (full_stars + (1 if half_star else 0) + i) * 14
         star = Polygon(create_star_shape(x + star_size, y_center, star_size))
@@ -380,21 +542,44 @@ def create_star_drawing(rating):
     return d
 
 
-def create_star_rating_table(label, rating):
+class FormDrawing(Flowable):
+    """Drawing rendered once per PDF as a form XObject and reused after that
+    
+    The cached drawings are shared between reports and the renderer writes
+    to them while drawing, so concurrent renders take turns.
+    """
+    _render_lock = threading.Lock()
+    
+    def __init__(self, drawing, name):
+        Flowable.__init__(self)
+        self.drawing = drawing
+        self.name = name
+        self.width = drawing.width
+        self.height = drawing.height
+    
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+    
+    def draw(self):
+        if not self.canv.hasForm(self.name):
+            self.canv.beginForm(self.name, 0, 0, self.width, self.height)
+            with self._render_lock:
+                renderPDF.draw(self.drawing, self.canv, 0, 0)
+            self.canv.endForm()
+        self.canv.doForm(self.name)
+
+
+def create_star_rating_table(label, half_steps):
     """Star rating with drawn stars"""
-    star_drawing = create_star_drawing(rating)
+    star_drawing = FormDrawing(_star_drawing(half_steps), f'Stars{half_steps}')
     return [label, star_drawing]
 
 
-def create_ratings_card():
-    """Ratings card with actual drawn stars"""
+def create_ratings_card(ratings):
+    """Ratings card with actual drawn stars, one row per rated category"""
     ratings_data = [
-        create_star_rating_table('Interior', 4.0),
-        create_star_rating_table('Exterior / Body', 4.5),
-        create_star_rating_table('Engine', 4.0),
-        create_star_rating_table('Structure', 5.0),
-        create_star_rating_table('Test Drive', 4.5),
-        create_star_rating_table('Electrical', 4.0),
+        create_star_rating_table(category.label, half_steps)
+        for category, half_steps in ratings.items()
     ]
     
     col_widths = [(CONTENT_WIDTH - 28) * 0.36, (CONTENT_WIDTH - 28) * 0.64]
@@ -424,8 +609,8 @@ def create_ratings_card():
     return card_table
 
 
-def create_notes_card(content):
-    """Notes card - square corners"""
+def create_notes_card(sections, label_break=False):
+    """Notes card - square corners; sections are (label, user text) pairs"""
     style = ParagraphStyle(
         'Notes',
         fontSize=FONT_BODY,
@@ -434,7 +619,7 @@ def create_notes_card(content):
         leading=14
     )
     
-    notes_para = Paragraph(content, style)
+    notes_para = notes_paragraph(sections, style, label_break)
     
     card_data = [[notes_para]]
     card_table = Table(card_data, colWidths=[CONTENT_WIDTH])
@@ -450,8 +635,183 @@ def create_notes_card(content):
     return card_table
 
 
+def parse_checklist(raw):
+    """Checklist rows from the 'checklist' form field
+    
+    The field is a JSON list of {"section", "item", "status", "remarks"}
+    objects; returns (section, item, status key, remarks) tuples. A malformed
+    checklist is logged and left out rather than failing the report.
+    """
+    if not raw:
+        return []
+    try:
+        items = json.loads(raw)
+    except ValueError as e:
+        print(f"⚠️ Ignoring checklist: {e}")
+        return []
+    
+    rows = []
+    for entry in items if isinstance(items, list) else []:
+        if not isinstance(entry, dict) or not entry.get('item'):
+            continue
+        status = str(entry.get('status') or '').strip().lower()
+        status = CHECKLIST_STATUS_ALIASES.get(status, status)
+        if status not in CHECKLIST_STATUS:
+            status = 'na'
+        rows.append((str(entry.get('section') or ''), str(entry['item']), status, str(entry.get('remarks') or '')))
+    return rows
+
+
+class ChecklistTable(Flowable):
+    """Checklist drawn straight onto the canvas, split across pages in linear time
+    
+    A platypus Table re-wraps every remaining row each time it splits, so a
+    long checklist costs roughly rows x pages. Here each row is laid out once
+    (wrapped lines and height, with running height offsets); page fragments
+    share that layout and only hold a row range, so a split is a bisect.
+    Every fragment repeats the header row, and a section row is never left
+    at the bottom of a page.
+    """
+    HEADERS = ('#', 'Checkpoint', 'Status', 'Remarks')
+    COLUMN_FRACTIONS = (0.07, 0.43, 0.13, 0.37)
+    PADDING = 4
+    
+    def __init__(self, rows, layout=None, start=0, stop=None):
+        Flowable.__init__(self)
+        self.rows = rows
+        self._layout = layout
+        self.start = start
+        self.stop = stop
+        self.fontSize = FONT_SMALL
+        self.leading = FONT_SMALL * 1.25
+    
+    def _cell(self, text, width, font, bold=False):
+        """(font, wrapped lines) for a cell; text Helvetica cannot show gets the Unicode font"""
+        if needs_unicode(text):
+            font = unicode_font(bold) or font
+        lines = simpleSplit(text, font, self.fontSize, width - 2 * self.PADDING) or ['']
+        if len(lines) > CHECKLIST_MAX_LINES:
+            lines = lines[:CHECKLIST_MAX_LINES - 1] + ['…']
+        return font, lines
+    
+    def _ensure_layout(self, width):
+        """Lay every entry out once: (width, entries, offsets)"""
+        if self._layout is not None and self._layout[0] == width:
+            return
+        widths = [width * f for f in self.COLUMN_FRACTIONS]
+        line_height = self.leading
+        entries = []
+        section = None
+        number = 0
+        for row_section, item, status, remarks in self.rows:
+            if row_section and row_section != section:
+                section = row_section
+                cell = self._cell(section, width, f'{FONT_FAMILY}-Bold', bold=True)
+                entries.append(('section', cell, len(cell[1]) * line_height + 2 * self.PADDING))
+            number += 1
+            cells = (str(number), self._cell(item, widths[1], FONT_FAMILY), status, self._cell(remarks, widths[3], FONT_FAMILY))
+            entries.append(('item', cells, max(len(cells[1][1]), len(cells[3][1])) * line_height + 2 * self.PADDING))
+        offsets = [0]
+        for entry in entries:
+            offsets.append(offsets[-1] + entry[2])
+        self._layout = (width, widths, entries, offsets)
+        if self.stop is None:
+            self.stop = len(entries)
+    
+    @property
+    def _header_height(self):
+        return self.leading + 2 * self.PADDING
+    
+    def wrap(self, availWidth, availHeight):
+        self._ensure_layout(availWidth)
+        offsets = self._layout[3]
+        self.width = availWidth
+        self.height = self._header_height + offsets[self.stop] - offsets[self.start]
+        return self.width, self.height
+    
+    def split(self, availWidth, availHeight):
+        self._ensure_layout(availWidth)
+        entries, offsets = self._layout[2], self._layout[3]
+        limit = offsets[self.start] + availHeight - self._header_height
+        end = bisect.bisect_right(offsets, limit, self.start, self.stop + 1) - 1
+        if end >= self.stop:
+            return [self]
+        if end > self.start + 1 and entries[end - 1][0] == 'section':
+            end -= 1
+        if end <= self.start:
+            return []
+        return [
+            ChecklistTable(self.rows, self._layout, self.start, end),
+            ChecklistTable(self.rows, self._layout, end, self.stop),
+        ]
+    
+    def _draw_lines(self, cell, x, top):
+        font, lines = cell
+        self.canv.setFont(font, self.fontSize)
+        y = top - self.PADDING - self.fontSize
+        for line in lines:
+            self.canv.drawString(x + self.PADDING, y, line)
+            y -= self.leading
+    
+    def draw(self):
+        canv = self.canv
+        _, widths, entries, _ = self._layout
+        xs = [0]
+        for w in widths[:-1]:
+            xs.append(xs[-1] + w)
+        
+        canv.saveState()
+        canv.setFillColor(COLOR_CARD_BG)
+        canv.setStrokeColor(COLOR_BORDER)
+        canv.rect(0, 0, self.width, self.height, fill=1, stroke=1)
+        
+        top = self.height
+        canv.setFillColor(COLOR_PRIMARY)
+        canv.rect(0, top - self._header_height, self.width, self._header_height, fill=1, stroke=0)
+        canv.setFillColor(HexColor('#ffffff'))
+        for x, title in zip(xs, self.HEADERS):
+            self._draw_lines((f'{FONT_FAMILY}-Bold', [title]), x, top)
+        top -= self._header_height
+        
+        canv.setLineWidth(0.5)
+        for kind, cells, height in entries[self.start:self.stop]:
+            if kind == 'section':
+                canv.setFillColor(HexColor('#eef4fb'))
+                canv.rect(0, top - height, self.width, height, fill=1, stroke=0)
+                canv.setFillColor(COLOR_PRIMARY)
+                self._draw_lines(cells, 0, top)
+            else:
+                number, item, status, remarks = cells
+                label, color = CHECKLIST_STATUS[status]
+                canv.setFillColor(COLOR_LABEL)
+                self._draw_lines((FONT_FAMILY, [number]), xs[0], top)
+                canv.setFillColor(COLOR_TEXT)
+                self._draw_lines(item, xs[1], top)
+                self._draw_lines(remarks, xs[3], top)
+                canv.setFillColor(color)
+                self._draw_lines((f'{FONT_FAMILY}-Bold', [label]), xs[2], top)
+            top -= height
+            canv.line(0, top, self.width, top)
+        canv.restoreState()
+
+
+@lru_cache(maxsize=None)
+def _photo_placeholder(width, height):
+    """Vector stand-in for a photo in preview reports"""
+    drawing = Drawing(width, height)
+    drawing.add(Rect(0, 0, width, height, fillColor=HexColor('#f8f9fa'),
+                     strokeColor=HexColor('#dcdcdc'), strokeWidth=1))
+    drawing.add(String(width / 2, height / 2 - 4, 'PHOTO', fontName=f'{FONT_FAMILY}-Bold',
+                       fontSize=12, fillColor=HexColor('#b4b4b4'), textAnchor='middle'))
+    return drawing
+
+
 def create_image_grid(image_files, captions):
-    """3-column image grid"""
+    """3-column image grid (placeholders for photos without content)
+    
+    Photos are LazyPhoto flowables: each is opened only while its cell is
+    drawn, so a long grid never holds every photo open at once.
+    """
     if not image_files:
         return None
     
@@ -461,8 +821,10 @@ def create_image_grid(image_files, captions):
     
     row_data = []
     for i, (field_name, img_data) in enumerate(image_files.items()):
-        img_obj = io.BytesIO(img_data['content'])
-        img = RLImage(img_obj, width=image_width, height=image_height)
+        if img_data['content'] is None:
+            img = FormDrawing(_photo_placeholder(image_width, image_height), 'PhotoPlaceholder')
+        else:
+            img = LazyPhoto(img_data['content'], image_width, image_height)
         
         caption = captions[i] if i < len(captions) else field_name.replace('_', ' ').title()
         
@@ -506,9 +868,17 @@ def create_image_grid(image_files, captions):
     return elements
 
 
-def generate_pdf(data, image_files):
-    """Generate PDF with final design"""
-    buffer = io.BytesIO()
+def generate_pdf(data, image_files, output=None, preview=False):
+    """Generate PDF with final design
+
+    If output (a writable file-like object) is given, the PDF is streamed
+    into it as pages and photos are finished and pdf_data is None.
+    With preview the header is marked and photos without content are drawn
+    as placeholders. With PDF_LINEARIZE=1 the finished PDF is rewritten
+    linearized (see linearize.py); a streamed one is read back into memory
+    for that, so output must then be readable and seekable too.
+    """
+    buffer = io.BytesIO() if output is None else output
     
     doc = SimpleDocTemplate(
         buffer,
@@ -523,7 +893,7 @@ def generate_pdf(data, image_files):
     story = []
     
     # HEADER
-    header_table, report_id = create_header(data)
+    header_table, report_id = create_header(data, preview)
     story.append(header_table)
     story.append(Spacer(1, 10))
     
@@ -568,47 +938,53 @@ def generate_pdf(data, image_files):
     # KEY HIGHLIGHTS
     story.append(create_section_header('Key Highlights'))
     highlights = data.get('highlights', 'No highlights provided.')
-    highlights_text = f'<font face="Helvetica">{highlights}</font>'
-    story.append(create_notes_card(highlights_text))
+    story.append(create_notes_card([(None, highlights)]))
     story.append(Spacer(1, 12))
     
     # DETAILED NOTES
     if data.get('paintNotes') or data.get('interiorNotes') or data.get('engineNotes'):
         story.append(create_section_header('Detailed Inspection Notes'))
-        notes_text = ""
-        if data.get('paintNotes'):
-            notes_text += f"<b>Exterior/Paint:</b> {data.get('paintNotes')}<br/><br/>"
-        if data.get('interiorNotes'):
-            notes_text += f"<b>Interior:</b> {data.get('interiorNotes')}<br/><br/>"
-        if data.get('engineNotes'):
-            notes_text += f"<b>Engine:</b> {data.get('engineNotes')}<br/><br/>"
-        if data.get('tiresNotes'):
-            notes_text += f"<b>Tires & Wheels:</b> {data.get('tiresNotes')}<br/><br/>"
-        if data.get('structureNotes'):
-            notes_text += f"<b>Structure:</b> {data.get('structureNotes')}<br/><br/>"
-        if data.get('testDriveNotes'):
-            notes_text += f"<b>Test Drive:</b> {data.get('testDriveNotes')}<br/><br/>"
-        story.append(create_notes_card(f'<font face="Helvetica">{notes_text.rstrip("<br/><br/>")}</font>'))
+        notes_sections = [
+            (label, data.get(field)) for label, field in (
+                ('Exterior/Paint:', 'paintNotes'),
+                ('Interior:', 'interiorNotes'),
+                ('Engine:', 'engineNotes'),
+                ('Tires & Wheels:', 'tiresNotes'),
+                ('Structure:', 'structureNotes'),
+                ('Test Drive:', 'testDriveNotes'),
+            ) if data.get(field)
+        ]
+        story.append(create_notes_card(notes_sections))
         story.append(Spacer(1, 12))
     
     # ISSUES & RECOMMENDATIONS
     if data.get('issuesFound') or data.get('recommendations'):
         story.append(create_section_header('Issues & Recommendations'))
-        issues_text = ""
-        if data.get('issuesFound'):
-            issues_text += f"<b>Issues Found:</b><br/>{data.get('issuesFound')}<br/><br/>"
-        if data.get('recommendations'):
-            issues_text += f"<b>Recommendations:</b><br/>{data.get('recommendations')}"
-        story.append(create_notes_card(f'<font face="Helvetica">{issues_text}</font>'))
+        issues_sections = [
+            (label, data.get(field)) for label, field in (
+                ('Issues Found:', 'issuesFound'),
+                ('Recommendations:', 'recommendations'),
+            ) if data.get(field)
+        ]
+        story.append(create_notes_card(issues_sections, label_break=True))
         story.append(Spacer(1, 12))
     
-    # RATINGS - Keep together
-    ratings_section = [
-        create_section_header('Overall Ratings'),
-        create_ratings_card()
-    ]
-    story.append(KeepTogether(ratings_section))
-    story.append(Spacer(1, 16))
+    # RATINGS - Keep together, only categories the inspector rated
+    ratings = parse_ratings(data)
+    if ratings:
+        ratings_section = [
+            create_section_header('Overall Ratings'),
+            create_ratings_card(ratings)
+        ]
+        story.append(KeepTogether(ratings_section))
+        story.append(Spacer(1, 16))
+    
+    # CHECKLIST - any length, splits across pages
+    checklist_rows = parse_checklist(data.get('checklist'))
+    if checklist_rows:
+        story.append(create_section_header(f'Inspection Checklist ({len(checklist_rows)} checkpoints)'))
+        story.append(ChecklistTable(checklist_rows))
+        story.append(Spacer(1, 16))
     
     # PHOTOS
     if image_files:
@@ -621,14 +997,50 @@ def generate_pdf(data, image_files):
                 story.append(elem)
     
     # Build PDF
+    if output is not None:
+        doc.build(story, canvasmaker=partial(FooterCanvas, streaming=True))
+        if LINEARIZE_PDF and not isinstance(output, _NullSink):
+            linearize_file(output)
+        return None, report_id
+    
     doc.build(story, canvasmaker=FooterCanvas)
     
     pdf_data = buffer.getvalue()
     buffer.close()
+    if LINEARIZE_PDF:
+        pdf_data = linearize(pdf_data)
     
     return pdf_data, report_id
 
 
+def encode_pdf_file(pdf_file, chunk_size=3 * 1024 * 1024):
+    """Base64-encode a PDF file chunk by chunk (chunk_size must be a multiple of 3)"""
+    pdf_file.seek(0)
+    chunks = []
+    while True:
+        chunk = pdf_file.read(chunk_size)
+        if not chunk:
+            break
+        chunks.append(base64.b64encode(chunk).decode('ascii'))
+    return ''.join(chunks)
+
+
+def report_filename(report_id, preview=False):
+    return f'Inspection_{"Preview" if preview else "Report"}_{report_id}.pdf'
+
+
+def index_report(fields, report_id, preview=False):
+    """Record a generated report in the report index; never fails the request"""
+    if preview:
+        return
+    try:
+        index = default_index()
+        if index is not None:
+            index.add(ReportRecord.from_fields(report_id, fields, ARTIFACT_BASE + report_filename(report_id)))
+    except Exception as e:
+        print(f"⚠️ Report {report_id} not indexed: {e}")
+
+
 def lambda_handler(event, context):
     """Main Lambda handler"""
     try:
@@ -650,15 +1062,27 @@ def lambda_handler(event, context):
         print(f"Request method: {event.get('requestContext', {}).get('http', {}).get('method')}")
         
         # Parse form data
-        fields, files = parse_multipart(event)
-        
-        # Generate PDF
-        pdf_data, report_id = generate_pdf(fields, files)
-        
-        # Return PDF as base64-encoded data
-        pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
+        mode = report_mode(event)
+        preview = mode == 'preview'
+        budget = RenderBudget(context)
+        with PhotoStore() as store:
+            fields, files = parse_multipart(event, budget, preview, store)
+            
+            # Generate PDF
+            if STREAM_PDF:
+                with tempfile.TemporaryFile() as pdf_file:
+                    _, report_id = generate_pdf(fields, files, output=pdf_file, preview=preview)
+                    pdf_size = pdf_file.tell()
+                    pdf_base64 = encode_pdf_file(pdf_file)
+            else:
+                pdf_data, report_id = generate_pdf(fields, files, preview=preview)
+                pdf_size = len(pdf_data)
+                # Return PDF as base64-encoded data
+                pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
+                del pdf_data
         
-        print(f"✅ PDF generated successfully, size: {len(pdf_data)} bytes")
+        print(f"✅ PDF generated successfully, size: {pdf_size} bytes")
+        index_report(fields, report_id, preview)
         
         return {
             'statusCode': 200,
@@ -670,7 +1094,9 @@ def lambda_handler(event, context):
                 'success': True,
                 'reportId': report_id,
                 'pdfData': pdf_base64,
-                'filename': f'Inspection_Report_{report_id}.pdf',
+                'filename': report_filename(report_id, preview),
+                'mode': mode,
+                'degradations': budget.degradations,
                 'message': 'Report generated successfully!'
             })
         }
@@ -695,3 +1121,49 @@ def lambda_handler(event, context):
                 'traceback': traceback.format_exc()
             })
         }
+
+
+class _NullSink:
+    """Writable file-like object that discards everything"""
+    
+    def write(self, data):
+        return len(data)
+
+
+WARMUP_FIELDS = {
+    name: 'Warm-up' for name in (
+        'registrationNumber', 'make', 'model', 'variant', 'chassisNumber', 'engineNumber',
+        'vinNumber', 'manufactureYear', 'registrationDate', 'fuelType', 'color',
+        'odometerReading', 'ownersCount', 'ownerName', 'ownerContact', 'ownerEmail',
+        'location', 'inspectorName', 'highlights', 'paintNotes', 'interiorNotes',
+        'engineNotes', 'structureNotes', 'tiresNotes', 'testDriveNotes',
+        'issuesFound', 'recommendations',
+    )
+}
+WARMUP_FIELDS.update({category.field: '4.5' for category in RatingCategory})
+WARMUP_FIELDS['highlights'] = 'Warm-up तपासणी'     # loads the Unicode font and its first subset
+
+
+def warm_up():
+    """Render a tiny report into a null sink
+    
+    Runs at import, i.e. in the Lambda init phase, so the first real request
+    does not pay for reportlab font metrics, paragraph parsing, rl_config,
+    the Unicode TTF and the Pillow JPEG plugin. Set REPORT_WARMUP=0 to skip it.
+    """
+    started = time.monotonic()
+    try:
+        for half_steps in range(11):
+            _star_drawing(half_steps)
+        photo = io.BytesIO()
+        Image.new('RGB', (64, 48), (200, 200, 200)).save(photo, format='JPEG')
+        with PhotoStore() as store:
+            files = {'warmup': {'filename': 'warmup.jpg', 'content': store.put('warmup', compress_image(photo.getvalue()))}}
+            generate_pdf(WARMUP_FIELDS, files, output=_NullSink())
+        print(f"🔥 Warm-up render took {(time.monotonic() - started) * 1000:.0f} ms")
+    except Exception as e:
+        print(f"⚠️ Warm-up failed: {e}")
+
+
+if WARMUP:
+    warm_up()
@@ -0,0 +1,327 @@
+"""
+Linearized ("fast web view") PDF output
+- linearize(data): the report rearranged so that a viewer can show page 1
+  as soon as the start of the file has arrived
+- linearize_file(f): the same for a PDF written to a file, in place
+
+reportlab writes objects in creation order with the cross-reference table
+at the end, so a viewer has to download the whole file, every photo
+included, before it can find page 1. A linearized file (PDF 1.7, Annex F)
+starts with a linearization dictionary and a cross-reference section for
+the first page, followed by the catalog, the hint stream and every object
+page 1 uses; the other pages follow one after the other with the objects
+only they use, then the objects several later pages share, then the rest
+(page tree, document info) and the main cross-reference section. The hint
+stream tells the viewer where each page starts and which shared objects it
+needs.
+
+Only what reportlab writes is handled: one classic cross-reference table,
+no object streams, no incremental updates, no encryption (ValueError
+otherwise). Stream data is copied byte for byte; only object numbers
+change. Binary streams (RL_useA85=0 in the environment) make the file,
+and with it page 1, about a fifth smaller than ASCII85.
+"""
+
+import re
+
+_XREF = re.compile(rb'startxref\s+(\d+)\s+%%EOF\s*$')
+_OBJ = re.compile(rb'(\d+)\s+(\d+)\s+obj\b\s*')
+_STREAM = re.compile(rb'>>\s*stream\r?\n')
+_ENDSTREAM = re.compile(rb'\s*endstream\s+endobj')
+# strings are matched (and left alone) so that text like "(1 0 R)" is not renumbered
+_TOKEN = re.compile(rb'\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>|(\d+)\s+0\s+R\b')
+_LENGTH = re.compile(rb'/Length\s+(\d+)(\s+0\s+R)?')
+_TYPE = re.compile(rb'/Type\s*/(Pages|Page|Catalog)\b')
+_KIDS = re.compile(rb'/Kids\s*\[([^\]]*)\]')
+_TRAILER_REF = rb'/%s\s+(\d+)\s+0\s+R'
+_ID = re.compile(rb'/ID\s*(\[[^\]]*\])')
+
+# fixed bit widths keep the hint stream's size independent of the offsets in it
+_BITS_OBJECTS = 16
+_BITS_LENGTH = 32
+_BITS_SHARED = 16
+
+
+class _PDFObject:
+    __slots__ = ('number', 'head', 'stream', 'refs', 'kind')
+
+    def __init__(self, number, head, stream):
+        self.number = number
+        self.head = head
+        self.stream = stream
+        self.refs = [int(m.group(1)) for m in _TOKEN.finditer(head) if m.group(1)]
+        kind = _TYPE.search(head)
+        self.kind = kind.group(1).decode() if kind else None
+
+    def format(self, number, renumber):
+        head = _TOKEN.sub(lambda m: b'%d 0 R' % renumber[int(m.group(1))] if m.group(1) else m.group(0), self.head)
+        if self.stream is None:
+            return b'%d 0 obj\n%s\nendobj\n' % (number, head.rstrip())
+        return b'%d 0 obj\n%s\nstream\n%s\nendstream\nendobj\n' % (number, head.rstrip(), self.stream)
+
+
+def _parse(data):
+    """(header, {number: _PDFObject}, trailer dict bytes)"""
+    end = _XREF.search(data)
+    if not end or data[int(end.group(1)):int(end.group(1)) + 4] != b'xref':
+        raise ValueError('not a PDF with a single classic cross-reference table')
+    xref = int(end.group(1))
+    trailer_at = data.index(b'trailer', xref)
+    if data.rfind(b'startxref', 0, end.start()) != -1 or b'/Encrypt' in data[trailer_at:end.start()]:
+        raise ValueError('incrementally updated or encrypted PDFs are not supported')
+    tokens = data[xref + 4:trailer_at].split()
+    offsets = {}
+    i = 0
+    while i < len(tokens):
+        first, count = int(tokens[i]), int(tokens[i + 1])
+        for n in range(count):
+            offset, _, state = tokens[i + 2 + 3 * n:i + 5 + 3 * n]
+            if state == b'n':
+                offsets[first + n] = int(offset)
+        i += 2 + 3 * count
+
+    raw = {}
+    for number, offset in offsets.items():
+        match = _OBJ.match(data, offset)
+        if not match or int(match.group(1)) != number:
+            raise ValueError(f'cross-reference entry for object {number} does not point at it')
+        start = match.end()
+        stop = data.index(b'endobj', start)
+        stream = _STREAM.search(data, start, stop + 6)
+        if stream is None:
+            raw[number] = (data[start:stop], None)
+        else:
+            raw[number] = (data[start:stream.start() + 2], stream.end())
+
+    objects = {}
+    for number, (head, stream_at) in raw.items():
+        stream = None
+        if stream_at is not None:
+            length = _LENGTH.search(head)
+            size = int(length.group(1))
+            if length.group(2):
+                size = int(raw[size][0].strip())
+            stream = data[stream_at:stream_at + size]
+            if not _ENDSTREAM.match(data, stream_at + size):
+                raise ValueError(f'stream of object {number} does not end at its /Length')
+        objects[number] = _PDFObject(number, head, stream)
+    header = data[:min(offsets.values())]
+    return header, objects, data[trailer_at:end.start()]
+
+
+def _pages(objects, root):
+    """Page object numbers in document order"""
+    pages = []
+    catalog = objects[root]
+    tree = int(re.search(rb'/Pages\s+(\d+)\s+0\s+R', catalog.head).group(1))
+    stack = [tree]
+    while stack:
+        node = objects[stack.pop()]
+        if node.kind == 'Pages':
+            kids = [int(n) for n in re.findall(rb'(\d+)\s+0\s+R', _KIDS.search(node.head).group(1))]
+            stack.extend(reversed(kids))
+        else:
+            pages.append(node.number)
+    return pages
+
+
+def _closure(objects, start, stop):
+    """Objects reachable from `start` without passing through any object in `stop`"""
+    seen = {start}
+    todo = [start]
+    while todo:
+        for ref in objects[todo.pop()].refs:
+            if ref not in seen and ref not in stop and ref in objects:
+                seen.add(ref)
+                todo.append(ref)
+    return seen
+
+
+class _Bits:
+    def __init__(self):
+        self.value = 0
+        self.count = 0
+        self.out = bytearray()
+
+    def put(self, value, bits):
+        if bits and not 0 <= value < 1 << bits:
+            raise ValueError(f'hint value {value} does not fit in {bits} bits')
+        self.value = (self.value << bits) | value
+        self.count += bits
+        while self.count >= 8:
+            self.count -= 8
+            self.out.append((self.value >> self.count) & 0xFF)
+        self.value &= (1 << self.count) - 1
+
+    def align(self):
+        if self.count:
+            self.put(0, 8 - self.count)
+
+
+def _hint_stream(pages, part6, shared, lengths, first_page_at, shared_at):
+    """Primary hint stream data and the offset of its shared object table (/S)
+
+    pages: per page (objects in its part, length in bytes, shared object
+    identifiers it uses); offsets already adjusted for the hint stream.
+    """
+    counts = [len(p[0]) for p in pages]
+    sizes = [p[1] for p in pages]
+    least_objects, least_size = min(counts), min(sizes)
+    bits = _Bits()
+    for value, width in ((least_objects, 32), (first_page_at, 32), (_BITS_OBJECTS, 16), (least_size, 32),
+                         (_BITS_LENGTH, 16), (0, 32), (0, 16), (least_size, 32), (_BITS_LENGTH, 16),
+                         (_BITS_SHARED, 16), (_BITS_SHARED, 16), (0, 16), (1, 16)):
+        bits.put(value, width)
+    for count in counts:
+        bits.put(count - least_objects, _BITS_OBJECTS)
+    bits.align()
+    for size in sizes:
+        bits.put(size - least_size, _BITS_LENGTH)
+    bits.align()
+    for _, _, ids in pages:
+        bits.put(len(ids), _BITS_SHARED)
+    bits.align()
+    for _, _, ids in pages:
+        for identifier in ids:
+            bits.put(identifier, _BITS_SHARED)
+    bits.align()
+    # numerators (0 bits) and content stream offsets (0 bits, all 0)
+    for size in sizes:
+        # content stream length: the page's length, as qpdf writes it
+        bits.put(size - least_size, _BITS_LENGTH)
+    bits.align()
+
+    shared_table = len(bits.out)
+    groups = [lengths[n] for n in part6 + shared]
+    least_group = min(groups)
+    for value, width in ((shared[0] if shared else 0, 32), (shared_at if shared else 0, 32), (len(part6), 32),
+                         (len(groups), 32), (0, 16), (least_group, 32), (_BITS_LENGTH, 16)):
+        bits.put(value, width)
+    for size in groups:
+        bits.put(size - least_group, _BITS_LENGTH)
+    bits.align()
+    for _ in groups:
+        bits.put(0, 1)          # no MD5 signatures
+    bits.align()
+    return bytes(bits.out), shared_table
+
+
+def linearize(data):
+    """The PDF `data` as a linearized PDF with the same objects and pages"""
+    header, objects, trailer = _parse(data)
+    root = int(re.search(_TRAILER_REF % b'Root', trailer).group(1))
+    info = re.search(_TRAILER_REF % b'Info', trailer)
+    file_id = _ID.search(trailer)
+    pages = _pages(objects, root)
+    stop = {n for n, obj in objects.items() if obj.kind in ('Page', 'Pages')} | {root}
+
+    # part 6: page 1 and everything it uses; part 7: per later page, its own
+    # objects; part 8: objects several later pages use; part 9: the rest
+    part6 = sorted(_closure(objects, pages[0], stop - {pages[0]}), key=lambda n: (n != pages[0], n))
+    first = set(part6)
+    closures = [_closure(objects, page, stop - {page}) - first for page in pages[1:]]
+    users = {}
+    for closure in closures:
+        for n in closure:
+            users[n] = users.get(n, 0) + 1
+    part7 = [[page] + sorted(n for n in closure if users[n] == 1 and n != page)
+             for page, closure in zip(pages[1:], closures)]
+    shared = sorted(n for n, count in users.items() if count > 1)
+    placed = first | {root} | set(shared) | {n for part in part7 for n in part}
+    part9 = sorted(n for n in objects if n not in placed)
+
+    # numbers: 1..m-1 for the main section, m..n-1 for the first-page section
+    main_order = [n for part in part7 for n in part] + shared + part9
+    m = len(main_order) + 1
+    renumber = {old: new for new, old in enumerate(main_order, 1)}
+    lin_number, catalog_number = m, m + 1
+    renumber[root] = catalog_number
+    renumber.update({old: new for new, old in enumerate(part6, m + 2)})
+    hint_number = m + 2 + len(part6)
+    size = hint_number + 1
+
+    body = {old: objects[old].format(renumber[old], renumber) for old in objects}
+    lengths = {old: len(text) for old, text in body.items()}
+    shared_index = {n: i for i, n in enumerate(part6 + shared)}
+    page_users = [[], *([shared_index[n] for n in sorted(_closure(objects, page, stop - {page}))
+                         if n in shared_index] for page in pages[1:])]
+
+    trailer_refs = b'/Root %d 0 R' % catalog_number
+    if info:
+        trailer_refs += b' /Info %d 0 R' % renumber[int(info.group(1))]
+    if file_id:
+        trailer_refs += b' /ID ' + file_id.group(1)
+
+    def build(values):
+        lin = (b'%d 0 obj\n<< /Linearized 1 /L %10d /H [ %10d %10d ] /O %d /E %10d /N %d /T %10d >>\nendobj\n'
+               % (lin_number, values['L'], values['H0'], values['H1'], renumber[pages[0]], values['E'],
+                  len(pages), values['T']))
+        offsets = {lin_number: len(header)}
+        out = [header, lin]
+        at = len(header) + len(lin)
+        first_xref_at = at
+        first_xref = b'xref\n%d %d\n' % (m, size - m) + b''.join(
+            b'%010d 00000 n \n' % values['first'].get(n, 0) for n in range(m, size))
+        first_trailer = (b'trailer\n<< /Size %d %s /Prev %10d >>\nstartxref\n0\n%%%%EOF\n'
+                         % (size, trailer_refs, values['prev']))
+        out += [first_xref, first_trailer]
+        at += len(first_xref) + len(first_trailer)
+
+        def emit(text, number):
+            nonlocal at
+            offsets[number] = at
+            out.append(text)
+            at += len(text)
+
+        emit(body[root], catalog_number)
+        hint_at = at
+        hint_data, shared_table = values['hint']
+        hint = (b'%d 0 obj\n<< /Length %10d /S %10d >>\nstream\n%s\nendstream\nendobj\n'
+                % (hint_number, len(hint_data), shared_table, hint_data))
+        emit(hint, hint_number)
+        starts = {}
+        for n in part6 + [n for part in part7 for n in part] + shared + part9:
+            starts[n] = at
+            emit(body[n], renumber[n])
+            if n == part6[-1]:
+                first_end = at
+        main_xref_at = at
+        entries = b''.join(b'%010d 00000 n \n' % offsets[n] for n in range(1, m))
+        main_xref = b'xref\n0 %d\n' % m
+        out += [main_xref, b'0000000000 65535 f \n', entries,
+                b'trailer\n<< /Size %d >>\nstartxref\n%d\n%%%%EOF\n' % (m, first_xref_at)]
+        at += len(main_xref) + 20 + len(entries)
+        text = b''.join(out)
+        return text, {
+            'L': len(text), 'H0': hint_at, 'H1': len(hint), 'E': first_end, 'T': main_xref_at + len(main_xref) - 1,
+            'prev': main_xref_at, 'first': {n: offsets[n] for n in range(m, size)},
+            'starts': starts, 'hint_len': len(hint), 'hint_at': hint_at,
+        }
+
+    def hints(layout):
+        adjust = layout['hint_len']     # hint tables count offsets as if the hint stream were absent
+        page_parts = [(part6, layout['E'] - layout['starts'][pages[0]], [])]
+        for part, ids in zip(part7, page_users[1:]):
+            page_parts.append((part, sum(lengths[n] for n in part), ids))
+        return _hint_stream(page_parts, part6, shared, lengths, layout['starts'][pages[0]] - adjust,
+                            layout['starts'][shared[0]] - adjust if shared else 0)
+
+    zero = {'L': 0, 'H0': 0, 'H1': 0, 'E': 0, 'T': 0, 'prev': 0, 'first': {}, 'hint': (b'', 0)}
+    _, layout = build(zero)
+    zero['hint'] = hints(layout)
+    _, layout = build(zero)
+    layout['hint'] = hints(layout)
+    text, final = build(layout)
+    if len(text) != layout['L'] or final['E'] != layout['E']:
+        raise AssertionError('linearized layout did not settle')
+    return text
+
+
+def linearize_file(f):
+    """Linearize the PDF in the seekable file `f` in place; leaves the position at its end"""
+    f.seek(0)
+    text = linearize(f.read())
+    f.seek(0)
+    f.write(text)
+    f.truncate()
+    return len(text)
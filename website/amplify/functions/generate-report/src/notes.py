@@ -0,0 +1,109 @@
+"""
+Paragraphs for user-written notes
+
+Notes (highlights, paint notes, issues, ...) used to be spliced into
+<b>/<font> markup and run through reportlab's paragraph parser on every
+render, so a stray '<' or '&' in a note failed the parse and the report.
+Here a note is a list of (label, text) sections turned straight into the
+ParaFrag list the parser would have produced: labels in the bold face of
+the style's font, user text as plain fragments. User text is never read
+as markup, so it prints exactly as typed; runs the style's font cannot
+show (Devanagari, ...) get the Unicode font from fonts.py.
+
+Compiled fragment lists are cached by a hash of the content and style.
+Paragraph only reads its frags (line breaking works on clones), so one
+list is shared by every paragraph built from the same note.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from reportlab.lib.fonts import ps2tt, tt2ps
+from reportlab.platypus import Paragraph
+from reportlab.platypus.paraparser import ParaFrag
+from fonts import script_runs, unicode_font
+
+CACHE_SIZE = 256
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _frag(style, text, fontName, bold=0):
+    frag = ParaFrag()
+    frag.text = text
+    frag.fontName = fontName
+    frag.fontSize = style.fontSize
+    frag.textColor = style.textColor
+    frag.bold = bold
+    frag.italic = 0
+    frag.rise = 0
+    frag.greek = 0
+    frag.link = []
+    frag.us_lines = []
+    return frag
+
+
+def _text_frags(style, text, fontName, bold=0):
+    """Fragments for text, with runs Helvetica cannot show in the Unicode font"""
+    frags = []
+    for needs_unicode, run in script_runs(text):
+        font = unicode_font(bold) if needs_unicode else None
+        frags.append(_frag(style, run, font or fontName, bold))
+    return frags
+
+
+def _line_break(style):
+    frag = _frag(style, '', style.fontName)
+    frag.lineBreak = True
+    return frag
+
+
+def compile_notes(sections, style, label_break=False):
+    """ParaFrag list for [(label, text), ...]
+
+    Sections are separated by a blank line. label may be None; otherwise it
+    is set in bold, followed by the text on the same line or, with
+    label_break, on the next one.
+    """
+    family = ps2tt(style.fontName)[0]
+    bold_font = tt2ps(family, 1, 0)
+    frags = []
+    for label, text in sections:
+        if frags:
+            frags += [_line_break(style), _line_break(style)]
+        if label:
+            frags += _text_frags(style, label, bold_font, bold=1)
+            if label_break:
+                frags.append(_line_break(style))
+            else:
+                text = ' ' + text
+        frags += _text_frags(style, text, style.fontName)
+    return frags
+
+
+def _key(sections, style, label_break):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((style.fontName, style.fontSize, str(style.textColor), label_break)).encode())
+    for label, text in sections:
+        digest.update(b'\0' + (label or '').encode('utf-8', 'surrogatepass'))
+        digest.update(b'\1' + text.encode('utf-8', 'surrogatepass'))
+    return digest.digest()
+
+
+def notes_paragraph(sections, style, label_break=False):
+    """Paragraph for the sections, compiled once per distinct content"""
+    sections = [(label, str(text)) for label, text in sections]
+    key = _key(sections, style, label_break)
+    with _cache_lock:
+        frags = _cache.get(key)
+        if frags is not None:
+            _cache.move_to_end(key)
+    if frags is None:
+        frags = compile_notes(sections, style, label_break)
+        with _cache_lock:
+            _cache[key] = frags
+            if len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    plain = '\n\n'.join(f'{label} {text}' if label else text for label, text in sections)
+    return Paragraph(plain, style, frags=frags)
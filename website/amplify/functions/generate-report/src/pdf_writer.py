@@ -0,0 +1,333 @@
+"""
+PDF writer extensions for the inspection report
+- ReportCanvas: canvas base class used by FooterCanvas; embeds each
+  distinct JPEG once, keyed by a hash of its bytes
+- ReportPDFDocument: reportlab PDFDocument with tunable stream compression
+  and an optional streaming mode that writes finished pages and images
+  straight to the output file instead of holding the whole document
+
+Streaming bounds memory, not time: page streams are compressed one by one
+as they are written, where the in-memory path compresses them all at once
+in a thread pool (PDF_COMPRESS_WORKERS).
+
+Settings (environment variables, read at import):
+- PDF_COMPRESS_LEVEL: zlib level for content streams, 0-9 (default 6)
+- PDF_COMPRESS_MIN_SIZE: streams shorter than this many bytes are stored
+  uncompressed (default 256)
+- PDF_COMPRESS_WORKERS: threads used to compress page streams at save time
+  (default: up to 4, one per CPU; 1 disables the pool)
+"""
+
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from reportlab import rl_config
+from reportlab.pdfbase import pdfdoc
+from reportlab.lib.boxstuff import aspectRatioFix
+from reportlab.lib.utils import ImageReader, _digester
+from reportlab.pdfgen import canvas
+
+COMPRESS_LEVEL = int(os.environ.get('PDF_COMPRESS_LEVEL', 6))
+COMPRESS_MIN_SIZE = int(os.environ.get('PDF_COMPRESS_MIN_SIZE', 256))
+COMPRESS_WORKERS = int(os.environ.get('PDF_COMPRESS_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+class ZlibFilter:
+    """FlateDecode stream filter with a configurable zlib level"""
+    pdfname = 'FlateDecode'
+
+    def __init__(self, level=COMPRESS_LEVEL):
+        if not 0 <= level <= 9:
+            raise ValueError(f'invalid zlib level {level!r}, need 0-9')
+        self.level = level
+
+    def encode(self, text):
+        if isinstance(text, str):
+            text = text.encode('utf8')
+        return zlib.compress(text, self.level)
+
+    def decode(self, encoded):
+        return zlib.decompress(encoded)
+
+
+class PrecompressedFilter:
+    """FlateDecode filter whose output was computed ahead of time"""
+    pdfname = 'FlateDecode'
+
+    def __init__(self, data):
+        self.data = data
+
+    def encode(self, text):
+        return self.data
+
+
+class StreamingPDFFile(pdfdoc.PDFFile):
+    """PDFFile that writes to a file-like sink instead of accumulating"""
+
+    def __init__(self, sink, pdfVersion=pdfdoc.PDF_VERSION_DEFAULT):
+        pdfdoc.PDFFile.__init__(self, pdfVersion)
+        self.write = sink.write
+        for header in self.strings:
+            self.write(header)
+        self.strings = []
+
+    def format(self, document):
+        return b''
+
+
+class ReservedForm(pdfdoc.PDFObject):
+    """Object number held for a form XObject that is defined later"""
+
+    def format(self, document):
+        raise ValueError('form XObject reserved but never defined')
+
+
+class ReportPDFDocument(pdfdoc.PDFDocument):
+    """PDFDocument that applies our compression policy to content streams.
+
+    reportlab builds page streams with the shared level-6 PDFZCompress filter.
+    Every stream passes through Reference() before it is formatted, so that
+    is where the filter gets swapped for ours or dropped for tiny streams.
+    Image XObjects carry their own Filter entry (DCTDecode for JPEG photos)
+    and are left alone.
+
+    Page streams are all complete by the time format() runs. zlib releases
+    the GIL, so they are compressed up front in a thread pool and the results
+    handed to the serial formatting loop; the output bytes are the same as
+    with a single worker.
+
+    In streaming mode (startStreaming) the PDF header goes to the sink
+    immediately and flushObjects() writes image XObjects, pages and their
+    content streams as soon as the canvas is done with them, dropping the
+    image bytes and page code. format() then only writes what is left
+    (fonts, forms, page tree, catalog), the xref table and the trailer.
+    Object order in the file differs from the in-memory path, which is
+    fine since the xref records each offset. Streams written early are
+    compressed on the spot, so the thread pool only sees what is left.
+
+    A page can use a form that is only drawn at the end ("Page 1 of N")
+    through reserveForm(): the page's reference needs an object number
+    when the page is written, and addForm() fills in the reserved one.
+    """
+    compressMinSize = COMPRESS_MIN_SIZE
+    compressWorkers = COMPRESS_WORKERS
+    _zfilter = ZlibFilter(COMPRESS_LEVEL)
+    _precompressed = {}
+    _file = None
+    _flushable = (pdfdoc.PDFImageXObject, pdfdoc.PDFPage, pdfdoc.PDFStream)
+
+    def setCompressionLevel(self, level=None, minSize=None, workers=None):
+        if level is not None:
+            self._zfilter = ZlibFilter(level)
+        if minSize is not None:
+            self.compressMinSize = minSize
+        if workers is not None:
+            self.compressWorkers = workers
+
+    def format(self):
+        if self.compressWorkers > 1:
+            self._precompress()
+        if self._file is None:
+            return pdfdoc.PDFDocument.format(self)
+        return self._formatStreaming()
+
+    def reserveForm(self, name):
+        """Give form `name` an object number now; addForm(name, ...) must follow before save"""
+        internal = pdfdoc.xObjectName(name)
+        if internal not in self.idToObject:
+            self.Reference(ReservedForm(), internal)
+
+    def addForm(self, name, form):
+        internal = pdfdoc.xObjectName(name)
+        if not isinstance(self.idToObject.get(internal), ReservedForm):
+            return pdfdoc.PDFDocument.addForm(self, name, form)
+        form.__InternalName__ = internal
+        self.idToObject[internal] = form
+        self.inObject = None
+
+    def startStreaming(self, sink):
+        """Write the document to sink incrementally"""
+        self._file = StreamingPDFFile(sink, self._pdfVersion)
+        self._written = set()
+        self._flushedCount = 0
+
+    def flushObjects(self):
+        """Write every finished image, page and content stream not yet in the file"""
+        if self._file is None:
+            return
+        if self.encrypt.info():
+            raise ValueError('streaming output does not support encryption')
+        while self._flushedCount < self.objectcounter:
+            self._flushedCount += 1
+            oid = self.numberToId[self._flushedCount]
+            obj = self.idToObject[oid]
+            if isinstance(obj, self._flushable) and oid not in self._written:
+                self._writeObject(oid, obj)
+
+    def _writeObject(self, oid, obj):
+        if not rl_config.invariant and rl_config.pdfComments:
+            self._file.add("%% %s: class %s \n" % (ascii(oid), obj.__class__.__name__[:50]))
+        self.idToOffset[oid] = self._file.add(pdfdoc.PDFIndirectObject(oid, obj).format(self))
+        self._written.add(oid)
+        if isinstance(obj, pdfdoc.PDFImageXObject):
+            obj.streamContent = None
+        elif isinstance(obj, pdfdoc.PDFPage):
+            obj.stream = None
+        elif isinstance(obj, pdfdoc.PDFStream):
+            obj.content = None
+
+    def _formatStreaming(self):
+        """PDFDocument.format() for a document whose objects are partly written"""
+        self.encrypt.prepare(self)
+        cat = self.Catalog
+        info = self.info
+        self.Reference(cat)
+        self.Reference(info)
+        encryptref = None
+        encryptinfo = self.encrypt.info()
+        if encryptinfo:
+            encryptref = self.Reference(encryptinfo)
+        counter = 0
+        # objects may still be registered while formatting, so no range()
+        while counter + 1 in self.numberToId:
+            counter += 1
+            oid = self.numberToId[counter]
+            if oid not in self._written:
+                self._writeObject(oid, self.idToObject[oid])
+        ids = [self.numberToId[n] for n in range(1, counter + 1)]
+        xref = pdfdoc.PDFCrossReferenceTable()
+        xref.addsection(0, ids)
+        xrefoffset = self._file.add(xref.format(self))
+        trailer = pdfdoc.PDFTrailer(
+            startxref=xrefoffset,
+            Size=counter + 1,
+            Root=self.Reference(cat),
+            Info=self.Reference(info),
+            Encrypt=encryptref,
+            ID=self.ID(),
+        )
+        self._file.add(trailer.format(self))
+        return self._file.format(self)
+
+    def _precompress(self):
+        """Compress the pending page streams in parallel"""
+        raw = [
+            obj.stream for obj in self.idToObject.values()
+            if isinstance(obj, pdfdoc.PDFPage) and obj.compression and obj.stream
+            and not obj.Contents and len(obj.stream) >= self.compressMinSize
+        ]
+        if len(raw) < 2:
+            return
+        with ThreadPoolExecutor(min(self.compressWorkers, len(raw))) as pool:
+            self._precompressed = dict(zip(raw, pool.map(self._zfilter.encode, raw)))
+
+    def Reference(self, obj, name=None):
+        if isinstance(obj, pdfdoc.PDFStream) and obj.filters:
+            self._applyCompression(obj)
+        return pdfdoc.PDFDocument.Reference(self, obj, name)
+
+    def _applyCompression(self, stream):
+        filters = stream.filters
+        if pdfdoc.PDFZCompress not in filters:
+            return
+        if len(stream.content) < self.compressMinSize:
+            filters = [f for f in filters if f is not pdfdoc.PDFZCompress]
+            stream.filters = filters or None
+        else:
+            data = self._precompressed.get(stream.content)
+            zfilter = self._zfilter if data is None else PrecompressedFilter(data)
+            stream.filters = [zfilter if f is pdfdoc.PDFZCompress else f for f in filters]
+
+
+def set_compression(level=None, min_size=None, workers=None):
+    """Change the process-wide defaults used by new documents"""
+    if level is not None:
+        ReportPDFDocument._zfilter = ZlibFilter(level)
+    if min_size is not None:
+        ReportPDFDocument.compressMinSize = min_size
+    if workers is not None:
+        ReportPDFDocument.compressWorkers = workers
+
+
+class ReportCanvas(canvas.Canvas):
+    """Canvas writing through ReportPDFDocument
+
+    With streaming=True the filename must be a writable file-like object;
+    finished images and pages are written to it as drawing progresses.
+
+    canvas.Canvas.drawImage names an ImageReader's XObject by hashing its
+    fully decoded RGB data, which decodes every photo just to find out
+    whether it was seen before. JPEGs are embedded as-is (DCTDecode), so
+    here they are named by a hash of the file bytes instead: identical
+    photos share one XObject and nothing is decoded.
+    """
+
+    def __init__(self, filename, *args, compressLevel=None, compressMinSize=None,
+                 compressWorkers=None, streaming=False, **kwargs):
+        canvas.Canvas.__init__(self, filename, *args, **kwargs)
+        # canvas.Canvas hardwires pdfdoc.PDFDocument; adopt that instance so
+        # the fonts and settings registered during __init__ are kept
+        self._doc.__class__ = ReportPDFDocument
+        self._doc.setCompressionLevel(compressLevel, compressMinSize, compressWorkers)
+        if streaming:
+            self._doc.startStreaming(filename)
+
+    def drawImage(self, image, x, y, width=None, height=None, mask=None,
+                  preserveAspectRatio=False, anchor='c', anchorAtXY=False,
+                  showBoundary=False, extraReturn=None):
+        key = None if extraReturn else self._jpegKey(image)
+        if key is None:
+            result = canvas.Canvas.drawImage(self, image, x, y, width, height, mask,
+                                             preserveAspectRatio, anchor, anchorAtXY,
+                                             showBoundary, extraReturn)
+        else:
+            result = self._drawJPEG(key, image, x, y, width, height,
+                                    preserveAspectRatio, anchor, anchorAtXY, showBoundary)
+        self._doc.flushObjects()
+        return result
+
+    @staticmethod
+    def _jpegKey(image):
+        """Content hash for JPEG ImageReaders, None for anything else"""
+        if not isinstance(image, ImageReader):
+            return None
+        fp = image.jpeg_fh()
+        if fp is None:
+            return None
+        return _digester(fp.getvalue())
+
+    def _drawJPEG(self, key, image, x, y, width, height,
+                  preserveAspectRatio, anchor, anchorAtXY, showBoundary):
+        """canvas.Canvas.drawImage for an already-named JPEG (masks do not apply)"""
+        self._currentPageHasImages = 1
+        regName = self._doc.getXObjectName(key)
+        imgObj = self._doc.idToObject.get(regName)
+        if imgObj is None:
+            imgObj = pdfdoc.PDFImageXObject(key, image)
+            self._setXObjects(imgObj)
+            self._doc.Reference(imgObj, regName)
+            self._doc.addForm(key, imgObj)
+        x, y, width, height, scaled = aspectRatioFix(preserveAspectRatio, anchor, x, y, width, height,
+                                                     imgObj.width, imgObj.height, anchorAtXY)
+        self.saveState()
+        self.translate(x, y)
+        self.scale(width, height)
+        self._code.append("/%s Do" % regName)
+        self.restoreState()
+        if showBoundary:
+            self.drawBoundary(showBoundary, x, y, width, height)
+        self._formsinuse.append(key)
+        return (imgObj.width, imgObj.height)
+
+    @property
+    def streaming(self):
+        return self._doc._file is not None
+
+    def doForwardForm(self, name):
+        """doForm for a form that is drawn later, before save()"""
+        self._doc.reserveForm(name)
+        self.doForm(name)
+
+    def showPage(self):
+        canvas.Canvas.showPage(self)
+        self._doc.flushObjects()
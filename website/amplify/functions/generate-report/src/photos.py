@@ -0,0 +1,148 @@
+"""
+Photo storage for the report's photo grid
+- PhotoStore: compressed photos by name, kept in memory up to a limit and
+  spilled to a temp file beyond it
+- StoredPhoto: handle for one stored photo; parse_form_data puts it in
+  files[name]['content'] in place of the bytes
+- LazyPhoto: grid flowable that reads and opens its photo only while it is
+  drawn and releases it right after
+
+reportlab's Image flowable opens a file-like image as soon as it is built,
+so every photo of the report stayed open and referenced for the whole
+doc.build. With LazyPhoto at most one photo is open at a time, and with
+PDF_STREAMING=1 the embedded copy is written out and dropped as well (the
+in-memory PDF keeps every image until save either way).
+
+Settings (environment variables, read at import):
+- PHOTO_STORE_MEMORY_MB: photos are held in memory until they add up to
+  this many MB, later ones go to a temp file (default 16; 0 keeps every
+  photo on disk)
+- PHOTO_STORE_DIR: directory for the temp file (default: the system's
+  temp directory, /tmp on Lambda)
+"""
+
+import io
+import os
+import tempfile
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Flowable
+
+MEMORY_LIMIT = int(float(os.environ.get('PHOTO_STORE_MEMORY_MB', 16)) * 1024 * 1024)
+SPILL_DIR = os.environ.get('PHOTO_STORE_DIR') or None
+
+
+class StoredPhoto:
+    """A photo in a PhotoStore; len() is its size in bytes"""
+    __slots__ = ('store', 'key', 'size')
+
+    def __init__(self, store, key, size):
+        self.store = store
+        self.key = key
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def read(self):
+        return self.store.read(self.key)
+
+    def release(self):
+        self.store.release(self.key)
+
+
+class PhotoStore:
+    """Photo bytes by key, in memory up to max_memory bytes, then in a temp file
+
+    One store serves one request; it is not thread-safe. Spilled photos are
+    appended to a single anonymous temp file that is removed on close().
+    """
+
+    def __init__(self, max_memory=MEMORY_LIMIT, dir=SPILL_DIR):
+        self.max_memory = max_memory
+        self.dir = dir
+        self.memory_bytes = 0
+        self.spilled_bytes = 0
+        self._memory = {}
+        self._spilled = {}      # key: (offset, length)
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._memory) + len(self._spilled)
+
+    def __contains__(self, key):
+        return key in self._memory or key in self._spilled
+
+    def put(self, key, data):
+        """Store data under key and return its StoredPhoto"""
+        self.release(key)
+        if self.memory_bytes + len(data) <= self.max_memory:
+            self._memory[key] = data
+            self.memory_bytes += len(data)
+        else:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile(dir=self.dir)
+            offset = self._file.seek(0, io.SEEK_END)
+            self._file.write(data)
+            self._spilled[key] = (offset, len(data))
+            self.spilled_bytes += len(data)
+        return StoredPhoto(self, key, len(data))
+
+    def read(self, key):
+        data = self._memory.get(key)
+        if data is not None:
+            return data
+        offset, length = self._spilled[key]
+        self._file.seek(offset)
+        return self._file.read(length)
+
+    def release(self, key):
+        """Forget key; its memory is freed (temp file space is reclaimed on close)"""
+        data = self._memory.pop(key, None)
+        if data is not None:
+            self.memory_bytes -= len(data)
+        self._spilled.pop(key, None)
+
+    def close(self):
+        self._memory.clear()
+        self._spilled.clear()
+        self.memory_bytes = 0
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LazyPhoto(Flowable):
+    """Fixed-size photo that is opened only while drawing, then released
+
+    source is the photo's bytes or a StoredPhoto. The grid always gives the
+    drawing size, so nothing needs to be read to lay the page out. draw()
+    opens an ImageReader for ReportCanvas.drawImage (which embeds JPEGs
+    as-is) and then drops the reader and, for a StoredPhoto, its store entry.
+    """
+
+    def __init__(self, source, width, height, hAlign='CENTER'):
+        Flowable.__init__(self)
+        self.source = source
+        self.drawWidth = width
+        self.drawHeight = height
+        self.hAlign = hAlign
+
+    def wrap(self, availWidth, availHeight):
+        return self.drawWidth, self.drawHeight
+
+    def draw(self):
+        source = self.source
+        if source is None:
+            raise ValueError('LazyPhoto drawn twice, its photo was already released')
+        data = source.read() if isinstance(source, StoredPhoto) else source
+        self.canv.drawImage(ImageReader(io.BytesIO(data)), 0, 0,
+                            self.drawWidth, self.drawHeight, mask='auto')
+        if isinstance(source, StoredPhoto):
+            source.release()
+        self.source = None
@@ -0,0 +1,174 @@
+"""
+Inspection ratings
+
+Scores are 0-5 stars in half-star steps, kept as small ints (0-10) with
+255 meaning "not rated". One inspection's ratings are a fixed-size bytes
+value indexed by RatingCategory, so many inspections pack into one buffer
+and category statistics are computed column-wise with bytes.count.
+- RatingCategory: the fixed set of rated categories and their form fields
+- Ratings: one inspection's scores
+- parse_ratings(fields): Ratings from request form fields
+- category_stats(ratings): count, mean and histogram per category
+"""
+
+import enum
+import math
+from collections import namedtuple
+
+MAX_STEPS = 10              # 5 stars
+UNRATED = 255
+
+# overallRating is a radio group on the inspector form
+RATING_WORDS = {'excellent': 10, 'good': 8, 'average': 6, 'poor': 4}
+
+
+class RatingCategory(enum.IntEnum):
+    INTERIOR = 0
+    EXTERIOR = 1
+    ENGINE = 2
+    STRUCTURE = 3
+    TEST_DRIVE = 4
+    ELECTRICAL = 5
+    OVERALL = 6
+
+    @property
+    def label(self):
+        return _LABELS[self]
+
+    @property
+    def field(self):
+        """Form field carrying this category's score"""
+        return _FIELDS[self]
+
+
+_LABELS = {
+    RatingCategory.INTERIOR: 'Interior',
+    RatingCategory.EXTERIOR: 'Exterior / Body',
+    RatingCategory.ENGINE: 'Engine',
+    RatingCategory.STRUCTURE: 'Structure',
+    RatingCategory.TEST_DRIVE: 'Test Drive',
+    RatingCategory.ELECTRICAL: 'Electrical',
+    RatingCategory.OVERALL: 'Overall Condition',
+}
+_FIELDS = {
+    RatingCategory.INTERIOR: 'interiorRating',
+    RatingCategory.EXTERIOR: 'exteriorRating',
+    RatingCategory.ENGINE: 'engineRating',
+    RatingCategory.STRUCTURE: 'structureRating',
+    RatingCategory.TEST_DRIVE: 'testDriveRating',
+    RatingCategory.ELECTRICAL: 'electricalRating',
+    RatingCategory.OVERALL: 'overallRating',
+}
+SIZE = len(RatingCategory)
+
+CategoryStats = namedtuple('CategoryStats', 'count mean histogram')
+
+
+def half_steps(value):
+    """Score as half-star steps (0-10), rounding down
+
+    Accepts numbers or strings: '4', '4.5', '9/10' style fractions and the
+    form's rating words. Raises ValueError for anything else.
+    """
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in RATING_WORDS:
+            return RATING_WORDS[text]
+        if '/' in text:
+            score, _, scale = text.partition('/')
+            scale = float(scale)
+            if not (math.isfinite(scale) and scale > 0):
+                raise ValueError(f'rating scale {scale!r} must be a positive number')
+            value = float(score) * 5 / scale
+        else:
+            value = float(text)
+    value = float(value)
+    if not 0 <= value <= 5:
+        raise ValueError(f'rating {value!r} outside 0-5')
+    return int(value * 2)
+
+
+class Ratings:
+    """One inspection's scores, SIZE bytes of half-star steps"""
+    __slots__ = ('_steps',)
+
+    def __init__(self, steps=None):
+        if steps is None:
+            steps = bytes([UNRATED]) * SIZE
+        steps = bytes(steps)
+        if len(steps) != SIZE:
+            raise ValueError(f'expected {SIZE} scores, got {len(steps)}')
+        if any(s > MAX_STEPS and s != UNRATED for s in steps):
+            raise ValueError(f'scores must be 0-{MAX_STEPS} half steps')
+        self._steps = steps
+
+    @classmethod
+    def from_scores(cls, scores):
+        """Ratings from a {RatingCategory: stars} mapping"""
+        steps = bytearray([UNRATED]) * SIZE
+        for category, value in scores.items():
+            steps[RatingCategory(category)] = half_steps(value)
+        return cls(steps)
+
+    def __getitem__(self, category):
+        """Half steps for category, None if not rated"""
+        step = self._steps[category]
+        return None if step == UNRATED else step
+
+    def __bool__(self):
+        return any(s != UNRATED for s in self._steps)
+
+    def __eq__(self, other):
+        return isinstance(other, Ratings) and self._steps == other._steps
+
+    def __hash__(self):
+        return hash(self._steps)
+
+    def __repr__(self):
+        return 'Ratings(%s)' % ', '.join(f'{c.name}={s / 2}' for c, s in self.items())
+
+    def items(self):
+        """(category, half steps) for each rated category, in enum order"""
+        return [(c, s) for c, s in zip(RatingCategory, self._steps) if s != UNRATED]
+
+    def to_bytes(self):
+        return self._steps
+
+
+def parse_ratings(fields):
+    """Ratings from form fields; unreadable scores are logged and left unrated"""
+    steps = bytearray([UNRATED]) * SIZE
+    for category in RatingCategory:
+        raw = fields.get(category.field)
+        if raw is None or not str(raw).strip():
+            continue
+        try:
+            steps[category] = half_steps(raw)
+        except ValueError as e:
+            print(f"⚠️ Ignoring {category.field}={raw!r}: {e}")
+    return Ratings(steps)
+
+
+def pack(ratings):
+    """Many Ratings as one buffer, SIZE bytes per inspection"""
+    return b''.join(r.to_bytes() for r in ratings)
+
+
+def category_stats(ratings):
+    """{RatingCategory: CategoryStats} across many inspections
+
+    ratings is an iterable of Ratings or a buffer from pack(). mean is in
+    stars (None when nobody rated the category); histogram counts each half
+    step 0-10.
+    """
+    packed = ratings if isinstance(ratings, (bytes, bytearray)) else pack(ratings)
+    if len(packed) % SIZE:
+        raise ValueError(f'packed ratings length must be a multiple of {SIZE}')
+    stats = {}
+    for category in RatingCategory:
+        column = packed[category::SIZE]
+        histogram = [column.count(step) for step in range(MAX_STEPS + 1)]
+        count = sum(histogram)
+        total = sum(step * n for step, n in enumerate(histogram))
+        stats[category] = CategoryStats(count, total / count / 2 if count else None, histogram)
+    return stats
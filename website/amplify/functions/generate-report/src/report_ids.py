@@ -0,0 +1,80 @@
+"""
+Report ID generator
+
+IDs look like INS-1M5A85KFRRTX3Y6J: 16 Crockford base32 characters after
+the prefix, so they sort by creation time as plain strings.
+- 9 chars: 45-bit millisecond timestamp
+- 4 chars: 20-bit node, random per process (drawn again after fork)
+- 3 chars: 15-bit sequence shared by all threads of the process
+
+No locks: the sequence is an itertools.count, whose next() is atomic
+under the GIL, and the timestamp comes from the monotonic clock anchored
+to wall time at import, so it never goes backwards within a process.
+When the sequence wraps inside a millisecond the calling thread waits for
+the next one, so the IDs each thread gets are strictly increasing. Two
+IDs from one process only collide if 32768 are made in the same
+millisecond; IDs from different processes or containers also need the
+same random node.
+"""
+
+import itertools
+import os
+import secrets
+import threading
+import time
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+# A frozen Lambda container does not advance the monotonic clock; re-anchor
+# when it has fallen this far behind wall time
+_MAX_LAG_MS = 1000
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def _seed():
+    global _node, _sequence, _anchor, _last
+    _node = _encode(secrets.randbits(20), 4)
+    _sequence = itertools.count(secrets.randbits(15))
+    _anchor = (time.time_ns() // 1_000_000, time.monotonic_ns())
+    _last = threading.local()
+
+
+def _now_ms():
+    global _anchor
+    wall_ms, mono_ns = _anchor
+    now = wall_ms + (time.monotonic_ns() - mono_ns) // 1_000_000
+    wall = time.time_ns() // 1_000_000
+    if wall - now > _MAX_LAG_MS:
+        _anchor = (wall, time.monotonic_ns())
+        now = wall
+    return now
+
+
+def new_report_id(prefix='INS'):
+    """Unique, time-sortable report ID"""
+    seq = next(_sequence) & 0x7FFF
+    now = _now_ms()
+    last = getattr(_last, 'value', -1)
+    while (now << 15 | seq) <= last:
+        now = _now_ms()
+    _last.value = now << 15 | seq
+    return f'{prefix}-{_encode(now, 9)}{_node}{_encode(seq, 3)}'
+
+
+def report_id_time(report_id):
+    """Creation time (seconds since the epoch) encoded in a report ID"""
+    ms = 0
+    for char in report_id.rsplit('-', 1)[-1][:9]:
+        ms = ms * 32 + ALPHABET.index(char)
+    return ms / 1000
+
+
+_seed()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_seed)
@@ -0,0 +1,275 @@
+"""
+Searchable index of generated reports
+- ReportRecord: what is kept per report (ID, registration/chassis/engine
+  numbers, make/model, inspector, date, where the PDF went)
+- SQLiteReportIndex: append-only SQLite table with B-tree indexes on the
+  three vehicle numbers and an FTS5 index over the text fields
+- open_index(url): the store for a REPORT_INDEX setting; backends register
+  a factory per URL scheme in STORES (sqlite:// is built in)
+- default_index(): open_index(REPORT_INDEX), once per process (and again
+  after a fork), None when it is not set
+
+A store has add(record), add_many(records), get(report_id) and
+search(text, limit), and never updates or deletes what it holds. Adding
+a report ID that is already there does nothing, so a retried request can
+record its report again.
+
+search() takes what a customer or the back office would type: a
+registration, chassis or engine number in any spacing or case finds that
+vehicle's reports through the B-tree indexes; anything else ("brezza
+prasad", "MA3NYF") goes to FTS5, where every word must match and the last
+one may be the start of a word.
+Results are newest first: both paths read their index backwards by
+insertion order and stop after `limit` rows, so lookups stay fast however
+many reports the table holds.
+
+Settings (environment variables, read at first use):
+- REPORT_INDEX: e.g. sqlite:////mnt/reports/index.db (absolute path after
+  the third slash); unset means reports are not indexed
+
+Usage: python report_index.py [--index URL] [--limit N] MH46CH6894
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+FIELDS = ('report_id', 'registration', 'chassis', 'engine', 'make', 'model',
+          'inspector', 'inspected_on', 'created_at', 'artifact')
+IDENTIFIERS = ('registration', 'chassis', 'engine')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    seq INTEGER PRIMARY KEY,
+    report_id TEXT NOT NULL UNIQUE,
+    registration TEXT NOT NULL,
+    chassis TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    make TEXT NOT NULL,
+    model TEXT NOT NULL,
+    inspector TEXT NOT NULL,
+    inspected_on TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    artifact TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_registration ON reports (registration, seq);
+CREATE INDEX IF NOT EXISTS reports_chassis ON reports (chassis, seq);
+CREATE INDEX IF NOT EXISTS reports_engine ON reports (engine, seq);
+CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5 (
+    registration, chassis, engine, make, model, inspector,
+    content='reports', content_rowid='seq', prefix='3 5'
+);
+CREATE TRIGGER IF NOT EXISTS reports_no_update BEFORE UPDATE ON reports BEGIN
+    SELECT RAISE(ABORT, 'reports are append-only');
+END;
+CREATE TRIGGER IF NOT EXISTS reports_no_delete BEFORE DELETE ON reports BEGIN
+    SELECT RAISE(ABORT, 'reports are append-only');
+END;
+"""
+
+
+def normalize_number(value):
+    """'mh 46 ch-6894' -> 'MH46CH6894': how registration, chassis and engine numbers are stored"""
+    return re.sub(r'[^0-9A-Z]', '', str(value or '').upper())
+
+
+class ReportRecord:
+    """Metadata of one generated report"""
+    __slots__ = FIELDS
+
+    def __init__(self, report_id, registration='', chassis='', engine='', make='', model='',
+                 inspector='', inspected_on='', created_at='', artifact=''):
+        self.report_id = report_id
+        self.registration = normalize_number(registration)
+        self.chassis = normalize_number(chassis)
+        self.engine = normalize_number(engine)
+        self.make = (make or '').strip()
+        self.model = (model or '').strip()
+        self.inspector = (inspector or '').strip()
+        now = datetime.now(timezone.utc)
+        self.inspected_on = inspected_on or now.date().isoformat()
+        self.created_at = created_at or now.isoformat(timespec='seconds')
+        self.artifact = artifact or ''
+
+    @classmethod
+    def from_fields(cls, report_id, fields, artifact):
+        """Record for a report generated from the inspection form `fields`"""
+        return cls(
+            report_id,
+            registration=fields.get('registrationNumber'),
+            chassis=fields.get('chassisNumber') or fields.get('vinNumber'),
+            engine=fields.get('engineNumber'),
+            make=fields.get('make'),
+            model=fields.get('model'),
+            inspector=fields.get('inspectorName'),
+            artifact=artifact,
+        )
+
+    def values(self):
+        return tuple(getattr(self, name) for name in FIELDS)
+
+    def to_dict(self):
+        return dict(zip(FIELDS, self.values()))
+
+    def __eq__(self, other):
+        return isinstance(other, ReportRecord) and self.values() == other.values()
+
+    def __repr__(self):
+        return f'ReportRecord({self.report_id!r}, {self.registration!r})'
+
+
+def _fts_query(text):
+    """'Brezza pras' -> '"brezza" "pras"*'
+
+    Only the last term is a prefix, as in search-as-you-type: FTS5 reads a
+    whole term's doclist backwards and stops at `limit`, but has to merge
+    every matching term's doclist for a prefix first.
+    """
+    terms = [f'"{term}"' for term in re.findall(r'\w+', text.lower())]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class SQLiteReportIndex:
+    """Reports in an SQLite file (':memory:' for a throwaway index)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+
+    _INSERT = (f"INSERT OR IGNORE INTO reports ({', '.join(FIELDS)}) "
+               f"VALUES ({', '.join('?' * len(FIELDS))})")
+    _SELECT = f"SELECT {', '.join(FIELDS)} FROM reports"
+
+    _INDEX_TEXT = ("INSERT INTO reports_fts (rowid, registration, chassis, engine, make, model, inspector) "
+                   "SELECT seq, registration, chassis, engine, make, model, inspector FROM reports WHERE seq > ?")
+
+    def add(self, record):
+        """Record one report; False if its ID was already there"""
+        return self.add_many([record]) == 1
+
+    def add_many(self, records):
+        """Record reports in one transaction; returns how many were new
+
+        The new rows go into the FTS index with one INSERT ... SELECT at
+        the end, which is several times cheaper than a trigger per row.
+        BEGIN IMMEDIATE takes the write lock before max(seq) is read, so
+        with several processes on one file the rows past it are this
+        call's own.
+        """
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                before = self._db.execute('SELECT coalesce(max(seq), 0) FROM reports').fetchone()[0]
+                changes = self._db.total_changes
+                self._db.executemany(self._INSERT, (record.values() for record in records))
+                # ignored duplicates change nothing
+                added = self._db.total_changes - changes
+                if added:
+                    self._db.execute(self._INDEX_TEXT, (before,))
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+            self._db.execute('COMMIT')
+            return added
+
+    def get(self, report_id):
+        with self._lock:
+            row = self._db.execute(f'{self._SELECT} WHERE report_id = ?', (report_id,)).fetchone()
+        return ReportRecord(*row) if row else None
+
+    def search(self, text, limit=20):
+        """Newest reports for a vehicle number, or else matching every term of `text`"""
+        number = normalize_number(text)
+        query = _fts_query(text)
+        if not query:
+            return []
+        exact = ' UNION ALL '.join(f'SELECT * FROM (SELECT seq FROM reports WHERE {field} = :n '
+                                   f'ORDER BY seq DESC LIMIT :limit)' for field in IDENTIFIERS)
+        with self._lock:
+            rows = []
+            if number:
+                rows = self._db.execute(
+                    f'{self._SELECT} WHERE seq IN ({exact}) ORDER BY seq DESC LIMIT :limit',
+                    {'n': number, 'limit': limit}).fetchall()
+            if not rows:
+                rows = self._db.execute(
+                    f'{self._SELECT} WHERE seq IN (SELECT rowid FROM reports_fts WHERE reports_fts MATCH :q '
+                    f'ORDER BY rowid DESC LIMIT :limit) ORDER BY seq DESC',
+                    {'q': query, 'limit': limit}).fetchall()
+        return [ReportRecord(*row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._db.execute('SELECT count(*) FROM reports').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _open_sqlite(url):
+    # sqlite:///relative.db, sqlite:////absolute.db, sqlite:///:memory:
+    path = url[len('sqlite:///'):]
+    if path != ':memory:' and os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    return SQLiteReportIndex(path)
+
+
+# URL scheme -> factory(url) returning a store
+STORES = {'sqlite': _open_sqlite}
+
+
+def open_index(url):
+    """The store for `url`, e.g. sqlite:////tmp/reports.db"""
+    scheme = url.split('://', 1)[0]
+    if '://' not in url or scheme not in STORES or (scheme == 'sqlite' and not url.startswith('sqlite:///')):
+        raise ValueError(f"REPORT_INDEX {url!r}: expected one of {', '.join(f'{s}://' for s in STORES)}")
+    return STORES[scheme](url)
+
+
+_default = None
+_default_pid = None
+_default_lock = threading.Lock()
+
+
+def default_index():
+    """Store from REPORT_INDEX for this process, None if it is not set"""
+    global _default, _default_pid
+    url = os.environ.get('REPORT_INDEX')
+    if not url:
+        return None
+    with _default_lock:
+        if _default is None or _default_pid != os.getpid():
+            _default = open_index(url)
+            _default_pid = os.getpid()
+        return _default
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('query', nargs='+', help='registration, chassis or engine number, or words')
+    parser.add_argument('--index', default=os.environ.get('REPORT_INDEX'), help='default: $REPORT_INDEX')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+    if not args.index:
+        parser.error('no index: pass --index or set REPORT_INDEX')
+
+    index = open_index(args.index)
+    records = index.search(' '.join(args.query), args.limit)
+    for record in records:
+        print(f"{record.report_id}  {record.inspected_on}  {record.registration:12} {record.make} {record.model}"
+              f"  ({record.inspector})  {record.artifact}")
+    print(f"{len(records)} report(s) of {index.count()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Self-hosted HTTP server for the report generator
+- `application` is a plain WSGI app: POST the inspection form as
+  multipart/form-data (?mode=preview works as on Lambda) and get the PDF
+  back as application/pdf, report ID in X-Report-Id. The raw request body
+  goes straight to the parser, no base64 or JSON envelope either way.
+- `serve()` runs it on a pre-forked worker pool. The parent imports the
+  report code (fonts, star drawings, PIL plugins) before forking, so every
+  worker starts warm. Each worker handles at most `threads` requests at a
+  time and is replaced after `max_requests`, which bounds memory creep.
+
+Used during Lambda outages and for bulk jobs. Any WSGI server can host
+`application` too, e.g. gunicorn report_server:application.
+
+Usage: python report_server.py [--port 8080] [--workers N] [--threads N] [--max-requests N]
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import threading
+import traceback
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler
+
+import lambda_function
+
+MAX_BODY_BYTES = int(os.environ.get('REPORT_SERVER_MAX_BODY', 64 * 1024 * 1024))
+
+CORS_HEADERS = [
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+]
+
+
+def _json_response(start_response, status, payload):
+    body = json.dumps(payload).encode()
+    start_response(status, CORS_HEADERS + [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(body))),
+    ])
+    return [body]
+
+
+def application(environ, start_response):
+    """WSGI entry point: multipart form in, PDF out"""
+    method = environ['REQUEST_METHOD']
+    if method == 'OPTIONS':
+        start_response('200 OK', CORS_HEADERS + [('Access-Control-Max-Age', '86400'), ('Content-Length', '0')])
+        return [b'']
+    if method != 'POST':
+        return _json_response(start_response, '405 Method Not Allowed', {'success': False, 'error': 'POST a multipart form'})
+
+    content_type = environ.get('CONTENT_TYPE', '')
+    if 'boundary=' not in content_type:
+        return _json_response(start_response, '400 Bad Request', {'success': False, 'error': 'expected multipart/form-data'})
+    try:
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        length = -1
+    if not 0 < length <= MAX_BODY_BYTES:
+        return _json_response(start_response, '413 Payload Too Large', {'success': False, 'error': f'body must be 1-{MAX_BODY_BYTES} bytes'})
+
+    query = parse_qs(environ.get('QUERY_STRING', ''))
+    preview = query.get('mode', [''])[-1] == 'preview'
+    try:
+        body = environ['wsgi.input'].read(length)
+        with lambda_function.PhotoStore() as store:
+            fields, files = lambda_function.parse_form_data(body, content_type, preview=preview, store=store)
+            del body
+            pdf_data, report_id = lambda_function.generate_pdf(fields, files, preview=preview)
+        lambda_function.index_report(fields, report_id, preview)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        traceback.print_exc()
+        return _json_response(start_response, '500 Internal Server Error', {'success': False, 'error': str(e)})
+
+    filename = lambda_function.report_filename(report_id, preview)
+    start_response('200 OK', CORS_HEADERS + [
+        ('Content-Type', 'application/pdf'),
+        ('Content-Length', str(len(pdf_data))),
+        ('Content-Disposition', f'attachment; filename="{filename}"'),
+        ('X-Report-Id', report_id),
+    ])
+    return [pdf_data]
+
+
+class QuietHandler(WSGIRequestHandler):
+    """wsgiref handler without the per-request access log line"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WorkerServer(ThreadingMixIn, WSGIServer):
+    """WSGI server for one worker process, accepting from a shared socket
+
+    Accepts only while it has a free slot, so a busy worker leaves new
+    connections in the listen backlog for its siblings. After max_requests
+    (0 = no limit) or SIGTERM it stops accepting, finishes in-flight
+    requests and returns from serve().
+    """
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, sock, app, threads=1, max_requests=0, handler=QuietHandler):
+        WSGIServer.__init__(self, sock.getsockname()[:2], handler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = sock
+        host, self.server_port = sock.getsockname()[:2]
+        self.server_name = socket.getfqdn(host)
+        self.setup_environ()
+        self.set_app(app)
+        self.timeout = 1.0
+        self.max_requests = max_requests
+        self.handled = 0
+        self.stopping = False
+        self._slots = threading.BoundedSemaphore(threads)
+
+    def serve(self):
+        while not self.stopping and (not self.max_requests or self.handled < self.max_requests):
+            self._slots.acquire()
+            accepted = self.handled
+            self.handle_request()
+            if self.handled == accepted:
+                self._slots.release()
+        self.server_close()
+
+    def handle_timeout(self):
+        pass
+
+    def process_request(self, request, client_address):
+        self.handled += 1
+        ThreadingMixIn.process_request(self, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            ThreadingMixIn.process_request_thread(self, request, client_address)
+        finally:
+            self._slots.release()
+
+
+def _run_worker(sock, threads, max_requests, handler):
+    server = WorkerServer(sock, application, threads, max_requests, handler)
+
+    def stop(signum, frame):
+        server.stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    server.serve()
+
+
+def serve(host='0.0.0.0', port=8080, workers=None, threads=1, max_requests=500, backlog=128, access_log=False):
+    """Run the pre-forked pool until SIGTERM/SIGINT
+
+    reportlab work is CPU-bound and holds the GIL, so throughput comes from
+    workers (default: one per CPU); more than one thread per worker only
+    helps overlap slow uploads and downloads.
+    """
+    workers = workers or os.cpu_count() or 1
+    handler = WSGIRequestHandler if access_log else QuietHandler
+    sock = socket.create_server((host, port), backlog=backlog)
+    # workers poll the shared socket; losing an accept race must not block
+    sock.setblocking(False)
+    print(f"🚀 Report server on http://{host}:{sock.getsockname()[1]} "
+          f"({workers} workers x {threads} threads, recycle after {max_requests or 'no limit'} requests)")
+
+    if not hasattr(os, 'fork'):
+        print("⚠️ os.fork unavailable, serving from a single process")
+        _run_worker(sock, threads, 0, handler)
+        sock.close()
+        return
+
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                _run_worker(sock, threads, max_requests, handler)
+            except BaseException:
+                traceback.print_exc()
+                status = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(status)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if stopping or started is None:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if code != 0:
+            print(f"⚠️ Worker {pid} exited with {code}, restarting")
+            # do not spin if workers die straight away
+            if time.monotonic() - started < 1:
+                time.sleep(1)
+        spawn()
+
+    sock.close()
+    print("✅ Report server stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--threads', type=int, default=1, help='concurrent requests per worker')
+    parser.add_argument('--max-requests', type=int, default=500, help='recycle a worker after this many requests (0 = never)')
+    parser.add_argument('--backlog', type=int, default=128)
+    parser.add_argument('--access-log', action='store_true')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.threads, args.max_requests, args.backlog, args.access_log)
+
+
+if __name__ == '__main__':
+    main()
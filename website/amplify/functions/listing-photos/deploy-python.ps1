@@ -0,0 +1,52 @@
+# Deploy Listing Photos Lambda - Quick Script
+# Run this from PowerShell in the src directory
+
+Write-Host "🚀 Packaging listing photo Lambda for InspectionWale..." -ForegroundColor Green
+
+# Navigate to correct directory
+Set-Location "C:\Users\Administrator\Documents\Inpectionwale\website\amplify\functions\listing-photos\src"
+
+# Create package directory
+if (Test-Path "package") {
+    Remove-Item -Recurse -Force package
+}
+New-Item -ItemType Directory -Path package
+
+Write-Host "📦 Installing Python dependencies..." -ForegroundColor Yellow
+
+# Install dependencies (Lambda runs Linux, so fetch manylinux wheels)
+pip install -r requirements.txt -t package --quiet --platform manylinux2014_x86_64 --only-binary=:all: --python-version 3.11
+
+# Copy lambda function
+Copy-Item lambda_function.py, photo_derivatives.py, object_store.py package\
+
+# Create ZIP
+Write-Host "🗜️ Creating deployment package..." -ForegroundColor Yellow
+Set-Location package
+Compress-Archive -Path * -DestinationPath ..\listing-photos-deploy.zip -Force
+Set-Location ..
+
+Write-Host "✅ Package created: listing-photos-deploy.zip" -ForegroundColor Green
+Write-Host ""
+Write-Host "📋 Next steps:" -ForegroundColor Cyan
+Write-Host "1. Go to AWS Lambda Console → Create function (Python 3.11)"
+Write-Host "2. Click 'Upload from' → '.zip file'"
+Write-Host "3. Upload: listing-photos-deploy.zip"
+Write-Host "4. Runtime Settings → Edit:"
+Write-Host "   - Handler: lambda_function.lambda_handler"
+Write-Host "5. Configuration → Edit:"
+Write-Host "   - Timeout: 60 seconds"
+Write-Host "   - Memory: 1024 MB"
+Write-Host "   - Environment: LISTINGS_BUCKET = the customer listings bucket"
+Write-Host "6. Add trigger → S3 → the listings bucket:"
+Write-Host "   - Event types: All object create events"
+Write-Host "   - Prefix: submissions/"
+Write-Host "7. Role: s3:GetObject and s3:PutObject on submissions/*"
+Write-Host "8. Test by submitting a listing with photos!"
+Write-Host ""
+Write-Host "📄 Deployment package size: $((Get-Item listing-photos-deploy.zip).Length / 1MB) MB" -ForegroundColor Green
+
+# Cleanup
+if (Test-Path "package") {
+    Remove-Item -Recurse -Force package
+}
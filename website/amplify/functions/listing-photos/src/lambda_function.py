@@ -0,0 +1,67 @@
+"""
+Listing Photo Derivatives - S3 upload trigger
+- Runs on ObjectCreated in the listings bucket (prefix submissions/)
+- Makes full (1600 px), card (640 px) and thumb (320 px) JPEGs of each
+  uploaded listing photo from one decode (see photo_derivatives.py)
+- Writes them next to the original with content-hashed, immutable keys,
+  plus <slot>.derivatives.json for the site to look them up
+- Ignores its own output, RC documents and anything outside submissions/
+- Skips uploads that are not decodable images or are gone; only S3 and
+  other errors that may pass fail the event
+"""
+
+import json
+import os
+from urllib.parse import unquote_plus
+from object_store import S3Store
+from photo_derivatives import ORIGINAL_KEY, UnreadablePhoto, process_photo
+
+BUCKET = os.environ.get('LISTINGS_BUCKET', '')
+
+_stores = {}
+
+
+def store_for(bucket):
+    if bucket not in _stores:
+        _stores[bucket] = S3Store(bucket)
+    return _stores[bucket]
+
+
+def lambda_handler(event, context, store=None):
+    """Process every original photo in the S3 event
+
+    `store` replaces S3 (LocalObjectStore in the benchmark). A photo that
+    does not decode, or was deleted before it could be read, is logged and
+    skipped: a retry would fail the same way. Any other failure (S3,
+    network) is reported and re-raised after the rest of the batch, so
+    Lambda retries the event; photos already done are skipped on the retry.
+    """
+    processed = []
+    skipped = []
+    failed = []
+    for record in event.get('Records', []):
+        key = unquote_plus(record['s3']['object']['key'])
+        if not ORIGINAL_KEY.match(key):
+            continue
+        bucket = record['s3']['bucket']['name'] or BUCKET
+        try:
+            manifest = process_photo(store or store_for(bucket), key)
+        except (UnreadablePhoto, FileNotFoundError) as e:
+            print(f"⚠️ {key}: skipped, not retrying ({e})")
+            skipped.append(key)
+            continue
+        except Exception as e:
+            print(f"❌ {key}: {e}")
+            failed.append(key)
+            continue
+        if manifest.get('skipped'):
+            print(f"⏭️ {key}: derivatives already up to date")
+        else:
+            sizes = ', '.join(f"{name} {v['width']}x{v['height']} {v['bytes'] / 1024:.0f}KB"
+                              for name, v in manifest['variants'].items())
+            print(f"✅ {key} ({manifest['bytes'] / 1024:.0f}KB) → {sizes}")
+        processed.append(key)
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} photo(s) failed: {', '.join(failed)}")
+    return {'statusCode': 200, 'body': json.dumps({'processed': processed, 'skipped': skipped})}
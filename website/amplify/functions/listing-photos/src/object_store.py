@@ -0,0 +1,72 @@
+"""
+Object stores for the photo worker
+- S3Store: one S3 bucket
+- LocalObjectStore: in-memory stand-in with an optional per-call latency,
+  for the benchmark and for trying the worker without AWS
+- s3_event: an S3 ObjectCreated notification for keys, as Lambda gets it
+
+Both have get(key) -> bytes or None and put(key, data, content_type,
+cache_control).
+"""
+
+import threading
+import time
+from urllib.parse import quote_plus
+
+
+class S3Store:
+    """Objects in `bucket`"""
+
+    def __init__(self, bucket, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client('s3')
+        self.bucket = bucket
+        self.client = client
+
+    def get(self, key):
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=key)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return response['Body'].read()
+
+    def put(self, key, data, content_type, cache_control=None):
+        params = {'Bucket': self.bucket, 'Key': key, 'Body': data, 'ContentType': content_type}
+        if cache_control:
+            params['CacheControl'] = cache_control
+        self.client.put_object(**params)
+
+
+class LocalObjectStore:
+    """Objects in a dict: key -> (data, content_type, cache_control)"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.objects = {}
+        self.calls = {'get': 0, 'put': 0}
+        self._lock = threading.Lock()
+
+    def _call(self, operation):
+        with self._lock:
+            self.calls[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, key):
+        self._call('get')
+        stored = self.objects.get(key)
+        return stored[0] if stored else None
+
+    def put(self, key, data, content_type, cache_control=None):
+        self._call('put')
+        self.objects[key] = (bytes(data), content_type, cache_control)
+
+
+def s3_event(bucket, *keys):
+    """S3 ObjectCreated:Put notification for `keys` (URL-encoded like S3 does)"""
+    return {'Records': [{
+        'eventSource': 'aws:s3',
+        'eventName': 'ObjectCreated:Put',
+        's3': {'bucket': {'name': bucket}, 'object': {'key': quote_plus(key, safe='/')}},
+    } for key in keys]}
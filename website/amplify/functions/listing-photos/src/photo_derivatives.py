@@ -0,0 +1,146 @@
+"""
+Thumbnail, card and full-size copies of an uploaded listing photo
+- make_derivatives: every size from one decode
+- process_photo: read an original from a store, write its derivatives and
+  a small manifest next to it, skip it if that was already done
+
+Phone photos arrive at 12 MP and more while the marketplace grid shows
+them a few hundred pixels wide. A JPEG is decoded in draft mode, which
+lets libjpeg scale by 1/2, 1/4 or 1/8 while decoding, straight to the
+smallest size still at least as large as the full variant; then full,
+card and thumb are each resized from the one before (chained), so every
+resize works on an image already close to its target.
+
+Keys sit next to the original and carry a hash of its content, so they
+can be cached forever:
+
+    submissions/sub_1/exteriorFront.jpg                 original upload
+    submissions/sub_1/exteriorFront.full.1a2b3c4d.jpg   derivatives
+    submissions/sub_1/exteriorFront.card.1a2b3c4d.jpg
+    submissions/sub_1/exteriorFront.thumb.1a2b3c4d.jpg
+    submissions/sub_1/exteriorFront.derivatives.json    {hash, variants: {name: {key, width, height, bytes}}}
+"""
+
+import hashlib
+import io
+import json
+import math
+import re
+from PIL import Image, ImageOps
+
+# name, longest edge in px, JPEG quality; largest first (each is made from the one before)
+VARIANTS = (
+    ('full', 1600, 82),
+    ('card', 640, 78),
+    ('thumb', 320, 72),
+)
+PHOTO_SLOTS = ['exteriorFront', 'exteriorBack', 'exteriorLeft', 'exteriorRight', 'interiorSeat', 'interiorCluster']
+# Originals only: derivative keys have extra dots, so the worker never reacts to its own writes
+ORIGINAL_KEY = re.compile(r'^(?P<prefix>submissions/[^/]+/)(?P<slot>' + '|'.join(PHOTO_SLOTS) + r')\.(?P<ext>[A-Za-z0-9]+)$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+MANIFEST_CACHE = 'public, max-age=60'
+_ORIENTATION = 0x0112
+_SWAPS_AXES = (5, 6, 7, 8)
+
+
+class UnreadablePhoto(Exception):
+    """The original is not an image Pillow can decode; retrying will not change that"""
+
+
+class Derivative:
+    """One encoded size"""
+    __slots__ = ('name', 'data', 'width', 'height')
+
+    def __init__(self, name, data, width, height):
+        self.name = name
+        self.data = data
+        self.width = width
+        self.height = height
+
+
+def fit(width, height, edge):
+    """(width, height) scaled down so the longer side is at most `edge`"""
+    scale = min(1.0, edge / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def make_derivatives(data, variants=VARIANTS, draft=True, chained=True):
+    """Derivative per variant, largest first, from the image bytes `data`
+
+    draft=False / chained=False decode at full size / resize every variant
+    from the full decode (for comparison in the benchmark). Raises
+    UnreadablePhoto if `data` does not decode: everything here works in
+    memory, so an OSError can only come from the image itself.
+    """
+    try:
+        return _make_derivatives(data, variants, draft, chained)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise UnreadablePhoto(str(e) or type(e).__name__) from e
+
+
+def _make_derivatives(data, variants, draft, chained):
+    with Image.open(io.BytesIO(data)) as image:
+        orientation = image.getexif().get(_ORIENTATION, 1)
+        width, height = image.size
+        if orientation in _SWAPS_AXES:
+            width, height = height, width
+        if draft and image.format == 'JPEG':
+            scale = min(1.0, variants[0][1] / max(width, height))
+            image.draft('RGB', (math.ceil(image.size[0] * scale), math.ceil(image.size[1] * scale)))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    derivatives = []
+    source = image
+    for name, edge, quality in variants:
+        size = fit(width, height, edge)
+        frame = source if source.size == size else source.resize(size, Image.LANCZOS, reducing_gap=2.0)
+        if chained:
+            source = frame
+        output = io.BytesIO()
+        frame.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+        derivatives.append(Derivative(name, output.getvalue(), *size))
+    return derivatives
+
+
+def derivative_key(match, name, digest):
+    return f"{match['prefix']}{match['slot']}.{name}.{digest[:8]}.jpg"
+
+
+def manifest_key(match):
+    return f"{match['prefix']}{match['slot']}.derivatives.json"
+
+
+def process_photo(store, key, variants=VARIANTS):
+    """Make and store the derivatives of the original at `key`
+
+    Returns the manifest, or None if `key` is not an original listing
+    photo. An original whose manifest already has its hash is not decoded
+    again (S3 can deliver the same event twice).
+    """
+    match = ORIGINAL_KEY.match(key)
+    if not match:
+        return None
+    data = store.get(key)
+    if data is None:
+        raise FileNotFoundError(key)
+    digest = hashlib.sha256(data).hexdigest()
+    existing = store.get(manifest_key(match))
+    if existing is not None:
+        manifest = json.loads(existing)
+        if manifest.get('hash') == digest:
+            manifest['skipped'] = True
+            return manifest
+
+    manifest = {'source': key, 'hash': digest, 'bytes': len(data), 'variants': {}}
+    for derivative in make_derivatives(data, variants):
+        derivative_path = derivative_key(match, derivative.name, digest)
+        store.put(derivative_path, derivative.data, 'image/jpeg', IMMUTABLE)
+        manifest['variants'][derivative.name] = {
+            'key': derivative_path,
+            'width': derivative.width,
+            'height': derivative.height,
+            'bytes': len(derivative.data),
+        }
+    store.put(manifest_key(match), json.dumps(manifest).encode('utf-8'), 'application/json', MANIFEST_CACHE)
+    return manifest
+
@@ -0,0 +1,159 @@
+"""
+Shared setup for the benchmark scripts
+- puts the report and listing photo Lambda sources on sys.path (vendored
+  packages as fallback)
+- sample form fields and synthetic phone photos
+- multipart bodies, raw or wrapped in an API Gateway style event
+- synthetic car listings shaped like SEED_CAR_LISTINGS.json
+- small timing helper
+"""
+
+import base64
+import io
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPORT_SRC = os.path.join(HERE, '..', 'amplify', 'functions', 'generate-report', 'src')
+PHOTOS_SRC = os.path.join(HERE, '..', 'amplify', 'functions', 'listing-photos', 'src')
+
+sys.path.insert(0, REPORT_SRC)
+sys.path.insert(1, os.path.join(HERE, '..'))      # listing_tools, image_tools
+sys.path.insert(2, PHOTOS_SRC)                     # photo_derivatives, object_store
+sys.path.append(os.path.join(REPORT_SRC, 'package'))
+
+SAMPLE_FIELDS = {
+    'registrationNumber': 'MH46CH6894',
+    'make': 'Maruti',
+    'model': 'Brezza',
+    'variant': 'VDi',
+    'chassisNumber': 'MA3NYF81SKD535417',
+    'engineNumber': 'D13A-5818272',
+    'manufactureYear': '2019',
+    'registrationDate': '2019-09-19',
+    'fuelType': 'Diesel',
+    'color': 'Pearl White',
+    'odometerReading': '45320',
+    'ownersCount': '2',
+    'ownerName': 'Akshada Sondulkar',
+    'ownerContact': '9876543210',
+    'ownerEmail': 'akshada@example.com',
+    'location': 'Byculla, Mumbai',
+    'inspectorName': 'Prasad Kumar',
+    'highlights': 'Well maintained, single careful owner. Service history available.',
+    'paintNotes': 'No major dents. Paint in good condition. Minor scratches on rear bumper.',
+    'interiorNotes': 'Dashboard clean. All controls working. Seats show normal wear.',
+    'engineNotes': 'Engine running smoothly. No oil leaks. Battery in good condition.',
+    'issuesFound': 'Front tyres at 40% tread.',
+    'recommendations': 'Replace front tyres within 5,000 km.',
+    'interiorRating': '4',
+    'exteriorRating': '4.5',
+    'engineRating': '4',
+    'structureRating': '5',
+    'testDriveRating': '4.5',
+    'electricalRating': '4',
+    'overallRating': 'Good',
+}
+
+
+def make_photo(seed=0, size=(1200, 900), quality=85):
+    """Deterministic JPEG bytes with enough texture to compress like a photo"""
+    from PIL import Image
+    rng = random.Random(seed)
+    small = (max(1, size[0] // 8), max(1, size[1] // 8))
+    img = Image.frombytes('RGB', small, rng.randbytes(small[0] * small[1] * 3))
+    img = img.resize(size, Image.Resampling.BICUBIC)
+    output = io.BytesIO()
+    img.save(output, format='JPEG', quality=quality)
+    return output.getvalue()
+
+
+def make_photo_files(count, size=(1200, 900)):
+    """image_files dict as produced by parse_multipart"""
+    return {
+        f'photo{i + 1}': {'filename': f'photo{i + 1}.jpg', 'content': make_photo(i, size)}
+        for i in range(count)
+    }
+
+
+MAKES = {
+    'Maruti': ['Swift', 'Baleno', 'Brezza', 'Dzire'],
+    'Hyundai': ['Creta', 'i20', 'Venue', 'Verna'],
+    'Tata': ['Nexon', 'Altroz', 'Punch', 'Harrier'],
+    'Honda': ['City', 'Amaze', 'Jazz'],
+    'Mahindra': ['XUV700', 'Thar', 'Scorpio'],
+}
+PHOTO_SLOTS = ['exteriorFront', 'exteriorBack', 'exteriorLeft', 'exteriorRight', 'interiorSeat', 'interiorCluster']
+
+
+def make_listing(i, rng):
+    """One listing with the fields and photo slots of SEED_CAR_LISTINGS.json"""
+    make = rng.choice(sorted(MAKES))
+    day = 1 + i % 28
+    stamp = f'2025-{1 + i % 12:02d}-{day:02d}T{i % 24:02d}:00:00.000Z'
+    return {
+        'listingId': f'bench-{i:07d}',
+        'status': rng.choice(['approved', 'approved', 'approved', 'pending', 'rejected', 'sold']),
+        'isPlaceholder': False,
+        'createdAt': stamp,
+        'updatedAt': stamp,
+        'seller': {'name': f'Seller {i}', 'mobile': f'9{rng.randrange(10**9):09d}', 'email': f'seller{i}@example.com'},
+        'car': {
+            'make': make,
+            'model': rng.choice(MAKES[make]),
+            'edition': rng.choice(['LXi', 'VXi', 'ZXi', 'XZ Plus', 'SX']),
+            'registrationYear': str(rng.randint(2012, 2024)),
+            'kmsDriven': str(rng.randrange(5000, 150000, 500)),
+            'expectedPrice': str(rng.randrange(250000, 2500000, 5000)),
+        },
+        'photos': {
+            slot: {'key': f'listings/bench-{i:07d}/{slot}.jpg', 'url': f'listings/bench-{i:07d}/{slot}.jpg',
+                   'contentType': 'image/jpeg'}
+            for slot in PHOTO_SLOTS
+        },
+    }
+
+
+def make_listings(count, seed=0):
+    """Iterator over `count` deterministic listings"""
+    rng = random.Random(seed)
+    return (make_listing(i, rng) for i in range(count))
+
+
+def make_multipart(fields, files, boundary='----InspectionWaleBench'):
+    """Raw multipart/form-data body and its Content-Type header"""
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, f in files.items():
+        head = (f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{f["filename"]}"\r\n'
+                f'Content-Type: image/jpeg\r\n\r\n')
+        parts.append(head.encode() + f['content'] + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def make_event(fields, files, query=None):
+    """Base64 multipart/form-data event as API Gateway delivers it"""
+    body, content_type = make_multipart(fields, files)
+    return {
+        'headers': {'content-type': content_type},
+        'body': base64.b64encode(body).decode(),
+        'isBase64Encoded': True,
+        'queryStringParameters': query,
+        'requestContext': {'http': {'method': 'POST'}},
+    }
+
+
+def timed(fn, *args, repeat=3, **kwargs):
+    """Best wall time of `repeat` runs and the last result"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BulkLoader vs one put per listing against a local DynamoDB stand-in
+
+Every call to the stand-in sleeps --latency ms, like an in-region round
+trip. The old pattern (one PutItem per listing, here without the process
+spawn the CLI version paid on top) is timed on a sample and extrapolated;
+BulkLoader loads all --items listings with 1, 4 and 8 writer threads and
+then once more against a throttled table (--capacity items/s), where
+UnprocessedItems have to be retried.
+
+Usage: python bench_bulk_load.py [--items N] [--latency MS] [--capacity N]
+"""
+
+import argparse
+import time
+
+from _common import make_listings
+
+from listing_tools.bulk_loader import BulkLoader
+from listing_tools.listings import marshal_listing
+from listing_tools.local_dynamo import LocalDynamoDB
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=50_000)
+    parser.add_argument('--latency', type=float, default=5.0, help='ms per call')
+    parser.add_argument('--capacity', type=int, default=5_000, help='write capacity for the throttled run')
+    parser.add_argument('--sample', type=int, default=300, help='listings for the PutItem baseline')
+    args = parser.parse_args()
+
+    latency = args.latency / 1000
+    print(f"{args.items} listings, {args.latency:.0f} ms per call")
+
+    db = LocalDynamoDB(latency=latency)
+    start = time.perf_counter()
+    for listing in make_listings(args.sample):
+        db.put_item(TableName='CarListings', Item=marshal_listing(listing))
+    rate = args.sample / (time.perf_counter() - start)
+    print(f"{'PutItem, serial':28} {rate:9.0f} items/s  ~{args.items / rate:6.1f} s for all (extrapolated)")
+
+    runs = [(f'BulkLoader, {n} thread{"s" if n > 1 else ""}', n, None) for n in (1, 4, 8)]
+    runs.append((f'BulkLoader, 8, {args.capacity}/s cap', 8, args.capacity))
+    for name, workers, capacity in runs:
+        db = LocalDynamoDB(latency=latency, write_capacity=capacity)
+        loader = BulkLoader(db, 'CarListings', workers=workers)
+        stats = loader.load(marshal_listing(listing) for listing in make_listings(args.items))
+        if stats.written != args.items or len(db.tables['CarListings']) != args.items:
+            raise SystemExit(f'{name}: wrote {stats.written}, table has {len(db.tables["CarListings"])}')
+        print(f"{name:28} {stats.items_per_second:9.0f} items/s  {stats.elapsed:7.1f} s  "
+              f"{stats.batches} batches, {stats.retries} retries")
+
+
+if __name__ == '__main__':
+    main()
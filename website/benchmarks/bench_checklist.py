@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: checklist section, ChecklistTable vs platypus Table
+
+Builds a document holding just the checklist for each row count, once with
+the row-streaming ChecklistTable and once as a platypus Table with wrapped
+Paragraph cells and a repeated header row (what the section would be
+otherwise). Per-row cost should stay flat for ChecklistTable as the
+checklist grows.
+
+Usage: python bench_checklist.py [--rows 250 500 1000 2000] [--table-max N]
+"""
+
+import argparse
+import io
+import json
+
+from _common import timed
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
+
+import lambda_function
+from lambda_function import CHECKLIST_STATUS, CONTENT_WIDTH, ChecklistTable, parse_checklist
+
+STATUSES = ['ok', 'ok', 'ok', 'attention', 'fail', 'na']
+
+
+def make_checklist(count):
+    """'checklist' field value with `count` checkpoints in sections of 25"""
+    return json.dumps([
+        {
+            'section': f'Section {i // 25 + 1}',
+            'item': f'Checkpoint {i + 1}: ' + 'condition of part and mounting ' * (i % 4),
+            'status': STATUSES[i % len(STATUSES)],
+            'remarks': 'observed wear within limits ' * (i % 3),
+        }
+        for i in range(count)
+    ])
+
+
+def build(story):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=lambda_function.A4,
+                            leftMargin=lambda_function.PAGE_MARGIN, rightMargin=lambda_function.PAGE_MARGIN)
+    doc.build(story)
+    return doc.page
+
+
+def build_checklist(rows):
+    return build([ChecklistTable(rows)])
+
+
+def build_table(rows):
+    style = ParagraphStyle('Cell', fontName=lambda_function.FONT_FAMILY, fontSize=lambda_function.FONT_SMALL)
+    data = [list(ChecklistTable.HEADERS)]
+    for number, (section, item, status, remarks) in enumerate(rows, 1):
+        data.append([str(number), Paragraph(item, style), CHECKLIST_STATUS[status][0], Paragraph(remarks, style)])
+    table = Table(data, colWidths=[CONTENT_WIDTH * f for f in ChecklistTable.COLUMN_FRACTIONS], repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), lambda_function.COLOR_PRIMARY),
+        ('LINEBELOW', (0, 0), (-1, -1), 0.5, lambda_function.COLOR_BORDER),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    return build([table])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[250, 500, 1000, 2000])
+    parser.add_argument('--table-max', type=int, default=2000, help='skip the Table baseline above this many rows')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'pages':>6} {'checklist ms':>13} {'us/row':>7} {'table ms':>9} {'us/row':>7}")
+    for count in args.rows:
+        rows = parse_checklist(make_checklist(count))
+        elapsed, pages = timed(build_checklist, rows, repeat=args.repeat)
+        line = f"{count:6d} {pages:6d} {elapsed * 1000:13.0f} {elapsed / count * 1e6:7.0f}"
+        if count <= args.table_max:
+            elapsed, _ = timed(build_table, rows, repeat=1)
+            line += f" {elapsed * 1000:9.0f} {elapsed / count * 1e6:7.0f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
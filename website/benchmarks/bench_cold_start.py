@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: first-request latency with and without the init warm-up
+
+Each round starts a fresh interpreter, imports lambda_function (the Lambda
+init phase) and calls lambda_handler twice, once with REPORT_WARMUP=1 and
+once with REPORT_WARMUP=0. Prints median init, first and second request
+times; the warm-up should move cost from the first request into init.
+
+Usage: python bench_cold_start.py [--rounds N] [--photos N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import SAMPLE_FIELDS, make_event, make_photo_files
+
+
+def child(event_path):
+    """Runs in the fresh interpreter: time init and the first two requests"""
+    with open(event_path) as f:
+        event = json.load(f)
+    start = time.perf_counter()
+    import lambda_function
+    timings = {'init': time.perf_counter() - start}
+    for name in ('first', 'second'):
+        start = time.perf_counter()
+        response = lambda_function.lambda_handler(event, None)
+        timings[name] = time.perf_counter() - start
+        if response['statusCode'] != 200:
+            raise SystemExit(response['body'])
+    print('RESULT ' + json.dumps(timings))
+
+
+def run_round(event_path, warmup):
+    env = dict(os.environ, REPORT_WARMUP='1' if warmup else '0')
+    out = subprocess.run([sys.executable, __file__, '--child', event_path],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    line = next(line for line in out.splitlines() if line.startswith('RESULT '))
+    return json.loads(line[len('RESULT '):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--photos', type=int, default=3)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(make_event(SAMPLE_FIELDS, make_photo_files(args.photos)), f)
+    try:
+        results = {True: [], False: []}
+        for _ in range(args.rounds):
+            for warmup in (True, False):
+                results[warmup].append(run_round(f.name, warmup))
+    finally:
+        os.unlink(f.name)
+
+    print(f"{args.rounds} cold starts each, {args.photos} photos, median ms")
+    print(f"{'':12} {'init':>8} {'first':>8} {'second':>8}")
+    for warmup in (False, True):
+        medians = [statistics.median(r[key] for r in results[warmup]) * 1000 for key in ('init', 'first', 'second')]
+        print(f"{'warm-up' if warmup else 'no warm-up':12} " + " ".join(f"{ms:8.0f}" for ms in medians))
+
+
+if __name__ == '__main__':
+    main()
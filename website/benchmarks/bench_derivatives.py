@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: responsive image derivative build, cold, warm and after one change
+
+Copies the site's Images/ and img/ folders to a temporary tree and builds
+their derivatives with DerivativeBuilder: cold without and with JPEG draft
+decoding on one process, cold on every core, then again with nothing
+changed, and after one photo changed. Checks that each derivative in the
+manifest exists with the recorded size and is never wider than its
+original, then compares the bytes a 400 px phone and a 1280 px laptop
+would download (WebP at the width they need) with the originals.
+
+Usage: python bench_derivatives.py [--workers N]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+import _common  # noqa: F401  (sys.path: vendored Pillow as fallback)
+
+from PIL import Image
+
+from image_tools.derivatives import DerivativeBuilder
+
+WEBSITE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SOURCES = ('Images', 'img')
+
+
+def check(root, manifest):
+    files = 0
+    for rel, entry in manifest.items():
+        for derivatives in entry['derivatives'].values():
+            for d in derivatives:
+                with Image.open(os.path.join(root, d['path'])) as image:
+                    if image.size != (d['width'], d['height']) or d['width'] > entry['width']:
+                        raise SystemExit(f"{d['path']}: {image.size}, manifest says {d['width']}x{d['height']}")
+                files += 1
+    print(f"check: {files} derivatives of {len(manifest)} images match the manifest, none upscaled")
+
+
+def weight(manifest, viewport):
+    """(original bytes, WebP bytes) for showing every image at `viewport` CSS px"""
+    original = webp = 0
+    for entry in manifest.values():
+        candidates = entry['derivatives']['webp']
+        pick = next((d for d in candidates if d['width'] >= viewport), candidates[-1])
+        original += entry['bytes']
+        webp += pick['bytes']
+    return original, webp
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        for folder in SOURCES:
+            shutil.copytree(os.path.join(WEBSITE, folder), os.path.join(root, folder))
+        out = os.path.join(root, 'Images', 'responsive')
+        runs = []
+        for name, workers, draft in (('cold, 1 process, full decode', 1, False),
+                                     ('cold, 1 process, draft decode', 1, True),
+                                     (f'cold, {args.workers} processes, draft', args.workers, True)):
+            shutil.rmtree(out, ignore_errors=True)
+            stats = DerivativeBuilder(root, SOURCES, workers=workers, draft=draft).build()
+            runs.append((name, stats))
+        builder = DerivativeBuilder(root, SOURCES, workers=args.workers)
+        runs.append(('warm, nothing changed', builder.build()))
+        with open(os.path.join(root, 'Images', 'Car-3.jpg'), 'ab') as f:
+            f.write(b'\0')
+        runs.append(('warm, one photo changed', builder.build()))
+
+        manifest = builder.load_manifest()
+        check(root, manifest)
+        print(f"{len(manifest)} images, {os.cpu_count()} cores")
+        for name, stats in runs:
+            print(f"{name:34} {stats.elapsed:7.2f} s  {len(stats.built):3} built {stats.skipped:3} skipped"
+                  f" {stats.removed:3} removed")
+        for viewport in (400, 1280):
+            original, webp = weight(manifest, viewport)
+            print(f"all images at {viewport:4} px: originals {original / 1024:6.0f} KB, WebP {webp / 1024:6.0f} KB "
+                  f"({webp / original:.0%})")
+
+
+if __name__ == '__main__':
+    main()
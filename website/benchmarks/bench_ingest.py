@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streaming feed ingest vs json.load of the whole file
+
+Writes --items listings (about 1 in 500 invalid) as a JSON array and as
+JSON Lines, then in a fresh interpreter per case reads, validates,
+marshals and batches them through BulkLoader into a client that discards
+the writes, so the figures are the reader's own. Reports rows/s and how
+far the ingest raised peak RSS (Linux: ru_maxrss). The parser itself is
+checked in tests/test_ingest.py.
+
+Usage: python bench_ingest.py [--items N]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import make_listings
+
+from listing_tools.bulk_loader import BulkLoader
+from listing_tools.ingest import FeedReader, validate_listing
+from listing_tools.listings import marshal_listing
+
+
+class NullClient:
+    """DynamoDB client stand-in that accepts and forgets every batch"""
+
+    def batch_write_item(self, RequestItems, **kwargs):
+        return {'UnprocessedItems': {}}
+
+
+def child(path, mode):
+    """Runs in the fresh interpreter: ingest path once"""
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    loader = BulkLoader(NullClient(), 'CarListings', workers=2)
+    if mode == 'json.load':
+        with open(path) as f:
+            listings = json.load(f)
+        stats = loader.load(marshal_listing(x) for x in listings if not validate_listing(x))
+        rows = len(listings)
+    else:
+        with FeedReader(path) as reader:
+            stats = loader.load(marshal_listing(x) for _, x, problems in reader if not problems)
+        rows = reader.rows
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    print('RESULT ' + json.dumps({'rows': rows, 'written': stats.written, 's': elapsed, 'peak': peak / 1024}))
+
+
+def run(path, mode):
+    out = subprocess.run([sys.executable, __file__, '--child', path, mode],
+                         capture_output=True, text=True, check=True).stdout
+    line = next(line for line in out.splitlines() if line.startswith('RESULT '))
+    return json.loads(line[len('RESULT '):])
+
+
+def write_feeds(directory, count):
+    array, lines = os.path.join(directory, 'feed.json'), os.path.join(directory, 'feed.jsonl')
+    with open(array, 'w') as fa, open(lines, 'w') as fl:
+        fa.write('[\n')
+        for i, listing in enumerate(make_listings(count)):
+            if i % 500 == 499:
+                del listing['car']['make']
+            text = json.dumps(listing)
+            fa.write((',\n' if i else '') + text)
+            fl.write(text + '\n')
+        fa.write('\n]\n')
+    return array, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=100_000)
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        array, lines = write_feeds(directory, args.items)
+        print(f"{args.items} listings: array {os.path.getsize(array) / 2**20:.0f} MB, "
+              f"JSON Lines {os.path.getsize(lines) / 2**20:.0f} MB")
+        print(f"{'reader':22} {'rows/s':>8} {'written':>8} {'+peak MB':>9}")
+        for name, path, mode in (('json.load (array)', array, 'json.load'),
+                                 ('FeedReader (array)', array, 'stream'),
+                                 ('FeedReader (JSONL)', lines, 'stream')):
+            r = run(path, mode)
+            print(f"{name:22} {r['rows'] / r['s']:>8.0f} {r['written']:>8} {r['peak']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
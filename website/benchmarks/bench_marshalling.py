@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled listing marshaller vs generic converters
+
+Both directions are timed over --items listings against the old
+hand-written convert_to_dynamodb_format (marshal only), boto3's
+TypeSerializer/TypeDeserializer and the generic converters. The round-trip
+properties are checked in tests/test_marshalling.py.
+
+Usage: python bench_marshalling.py [--items N]
+"""
+
+import argparse
+import gc
+
+from _common import make_listings, timed
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from listing_tools.listings import marshal_listing, unmarshal_listing
+from listing_tools.marshalling import from_attribute, to_attribute
+
+
+def convert_to_dynamodb_format(listing):
+    """The hand-written converter add-placeholder-listings.py used (six fixed photo slots)"""
+    photo = lambda slot: {'M': {name: {'S': listing['photos'][slot][name]} for name in ('key', 'url', 'contentType')}}
+    return {
+        'listingId': {'S': listing['listingId']},
+        'status': {'S': listing['status']},
+        'isPlaceholder': {'BOOL': listing['isPlaceholder']},
+        'createdAt': {'S': listing['createdAt']},
+        'updatedAt': {'S': listing['updatedAt']},
+        'seller': {'M': {name: {'S': listing['seller'][name]} for name in ('name', 'mobile', 'email')}},
+        'car': {'M': {name: {'S': listing['car'][name]} for name in (
+            'make', 'model', 'edition', 'registrationYear', 'kmsDriven', 'expectedPrice')}},
+        'photos': {'M': {slot: photo(slot) for slot in (
+            'exteriorFront', 'exteriorBack', 'exteriorLeft', 'exteriorRight', 'interiorSeat', 'interiorCluster')}},
+    }
+
+
+def convert_all(fn, rows):
+    """Convert every row with the garbage collector off, as timeit does"""
+    gc.disable()
+    try:
+        for row in rows:
+            fn(row)
+    finally:
+        gc.enable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=100_000)
+    args = parser.parse_args()
+
+    listings = list(make_listings(args.items))
+    items = [marshal_listing(listing) for listing in listings]
+    serializer, deserializer = TypeSerializer(), TypeDeserializer()
+
+    print(f"{args.items} listings, best of 3")
+    for name, fn, rows in [
+        ('marshal: hand-written', convert_to_dynamodb_format, listings),
+        ('marshal: boto3 TypeSerializer', lambda x: serializer.serialize(x)['M'], listings),
+        ('marshal: to_attribute', lambda x: to_attribute(x)['M'], listings),
+        ('marshal: compiled', marshal_listing, listings),
+        ('unmarshal: boto3 TypeDeserializer', lambda x: deserializer.deserialize({'M': x}), items),
+        ('unmarshal: from_attribute', lambda x: from_attribute({'M': x}), items),
+        ('unmarshal: compiled', unmarshal_listing, items),
+    ]:
+        elapsed, _ = timed(convert_all, fn, rows)
+        print(f"{name:36} {elapsed * 1000:7.0f} ms  {args.items / elapsed / 1000:7.0f}k rows/s")
+
+
+if __name__ == '__main__':
+    main()
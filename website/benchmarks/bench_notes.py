@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled notes paragraphs vs Paragraph markup parsing
+
+Builds the detailed-notes paragraph for long notes three ways: reportlab
+Paragraph parsing the (escaped) markup, notes_paragraph compiling fresh
+fragments, and notes_paragraph hitting its cache. Each is also wrapped to
+the card width, and the wrapped lines are checked to be identical.
+
+Usage: python bench_notes.py [--words N] [--repeat N]
+"""
+
+import argparse
+import random
+from xml.sax.saxutils import escape
+
+from _common import timed
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph
+
+import notes
+from lambda_function import COLOR_TEXT, CONTENT_WIDTH, FONT_BODY, FONT_FAMILY
+
+LABELS = ['Exterior/Paint:', 'Interior:', 'Engine:', 'Tires & Wheels:', 'Structure:', 'Test Drive:']
+WORDS = ('minor scratch on rear bumper, paint meter reading 110-130 microns; '
+         'no repaint & no rust <observed> at door edges').split()
+
+
+def make_sections(words, seed=0):
+    rng = random.Random(seed)
+    return [(label, ' '.join(rng.choice(WORDS) for _ in range(words))) for label in LABELS]
+
+
+def markup(sections):
+    body = '<br/><br/>'.join(f'<b>{escape(label)}</b> {escape(text)}' for label, text in sections)
+    return f'<font face="{FONT_FAMILY}">{body}</font>'
+
+
+def lines(paragraph):
+    paragraph.wrap(CONTENT_WIDTH - 28, 10000)
+    return [''.join(getattr(w, 'text', '') for w in line.words) if hasattr(line, 'words') else line
+            for line in paragraph.blPara.lines]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--words', type=int, default=400, help='words per note section')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    style = ParagraphStyle('Notes', fontSize=FONT_BODY, fontName=FONT_FAMILY, textColor=COLOR_TEXT, leading=14)
+    sections = make_sections(args.words)
+    text = markup(sections)
+    if lines(Paragraph(text, style)) != lines(notes.notes_paragraph(sections, style)):
+        raise SystemExit('compiled notes wrap differently from parsed markup')
+
+    def cold():
+        notes._cache.clear()
+        return notes.notes_paragraph(sections, style)
+
+    print(f"{len(LABELS)} sections x {args.words} words ({len(text) / 1024:.0f} KB of markup)")
+    for name, build in (('Paragraph', lambda: Paragraph(text, style)),
+                        ('compiled', cold),
+                        ('cached', lambda: notes.notes_paragraph(sections, style))):
+        built, _ = timed(build, repeat=args.repeat)
+        wrapped, _ = timed(lambda: lines(build()), repeat=args.repeat)
+        print(f"{name:10} build {built * 1000:7.2f} ms   build+wrap {wrapped * 1000:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF build time vs file size across zlib levels 1-9
+
+Usage: python bench_pdf_compression.py [--photos N] [--min-size BYTES]
+"""
+
+import argparse
+
+from _common import SAMPLE_FIELDS, make_photo_files, timed
+
+import pdf_writer
+import lambda_function
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--photos', type=int, default=9)
+    parser.add_argument('--min-size', type=int, default=pdf_writer.COMPRESS_MIN_SIZE)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    image_files = make_photo_files(args.photos)
+    print(f"{'level':>5} {'build ms':>10} {'size KB':>10}")
+    for level in range(1, 10):
+        pdf_writer.set_compression(level, args.min_size)
+        elapsed, (pdf_data, _) = timed(lambda_function.generate_pdf, SAMPLE_FIELDS, image_files,
+                                       repeat=args.repeat)
+        print(f"{level:>5} {elapsed * 1000:>10.1f} {len(pdf_data) / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
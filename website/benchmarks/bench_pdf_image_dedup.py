@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark: content-hash interning of photo XObjects
+
+Builds a report with every photo repeated under another field name and
+times it with interning on and with reportlab's decode-and-hash naming.
+Output sizes are printed for reference; tests/test_pdf_writer.py checks
+that the repeats add no image XObjects.
+
+Usage: python bench_pdf_image_dedup.py [--photos N]
+"""
+
+import argparse
+
+from _common import SAMPLE_FIELDS, make_photo_files, timed
+
+import pdf_writer
+import lambda_function
+
+
+def build(image_files):
+    pdf_data, _ = lambda_function.generate_pdf(SAMPLE_FIELDS, image_files)
+    return pdf_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--photos', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    photos = make_photo_files(args.photos)
+    repeated = dict(photos)
+    for name, photo in photos.items():
+        repeated[name + '_again'] = dict(photo)
+
+    single = build(photos)
+    double = build(repeated)
+    images = single.count(b'/Subtype /Image'), double.count(b'/Subtype /Image')
+    print(f"{args.photos} photos: {len(single) / 1024:.1f} KB, {images[0]} image XObjects")
+    print(f"each photo twice: {len(double) / 1024:.1f} KB, {images[1]} image XObjects")
+
+    elapsed, _ = timed(build, repeated, repeat=args.repeat)
+    print(f"interned:   {elapsed * 1000:.0f} ms")
+    jpeg_key = pdf_writer.ReportCanvas._jpegKey
+    pdf_writer.ReportCanvas._jpegKey = staticmethod(lambda image: None)
+    try:
+        elapsed, pdf_data = timed(build, repeated, repeat=args.repeat)
+    finally:
+        pdf_writer.ReportCanvas._jpegKey = jpeg_key
+    print(f"reportlab:  {elapsed * 1000:.0f} ms ({len(pdf_data) / 1024:.1f} KB)")
+
+
+if __name__ == '__main__':
+    main()
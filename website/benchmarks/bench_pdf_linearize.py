@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to first page of a report PDF over a throttled link, plain vs linearized
+
+Generates a report with --photos photos, with ASCII85 streams (reportlab's
+default) and binary streams (RL_useA85=0), and linearizes each; the
+output itself is checked in tests/test_linearize.py. Then each file is
+sent over a local TCP connection throttled to --kbps and the time is
+taken at which the bytes a viewer needs for page 1 have arrived: all of
+them for the plain file (its cross-reference table is at the end), the
+first /E bytes for the linearized one. Page 1's render time (PyMuPDF) is
+added to both.
+
+Needs PyMuPDF for the render times: pip install -r requirements-dev.txt
+
+Usage: python bench_pdf_linearize.py [--photos N] [--kbps N]
+"""
+
+import argparse
+import os
+import re
+import socket
+import threading
+import time
+
+from _common import SAMPLE_FIELDS, make_photo_files
+
+os.environ.setdefault('REPORT_WARMUP', '0')
+
+try:
+    import pymupdf
+except ImportError:
+    raise SystemExit('bench_pdf_linearize needs PyMuPDF: pip install -r requirements-dev.txt')
+from reportlab import rl_config  # noqa: E402
+
+import lambda_function  # noqa: E402
+from linearize import linearize  # noqa: E402
+
+FIRST_PAGE_END = re.compile(rb'<< /Linearized 1 [^>]*/E +(\d+)')
+
+
+def first_page_end(data):
+    """/E of a linearized file: the bytes a viewer needs for page 1"""
+    return int(FIRST_PAGE_END.search(data, 0, 300).group(1))
+
+
+def first_page_ms(data):
+    document = pymupdf.open(stream=data)
+    start = time.perf_counter()
+    document[0].get_pixmap(dpi=110)
+    return (time.perf_counter() - start) * 1000
+
+
+def transfer(data, need, kbps):
+    """Seconds until `need` bytes and until all of data arrived over a link throttled to kbps"""
+    server = socket.create_server(('127.0.0.1', 0))
+    rate = kbps * 1000 / 8
+
+    def send():
+        connection, _ = server.accept()
+        with connection:
+            start = time.perf_counter()
+            for i in range(0, len(data), 4096):
+                connection.sendall(data[i:i + 4096])
+                delay = start + (i + 4096) / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    sender = threading.Thread(target=send)
+    sender.start()
+    client = socket.create_connection(server.getsockname())
+    start = time.perf_counter()
+    received = 0
+    ready = None
+    while received < len(data):
+        chunk = client.recv(65536)
+        if not chunk:
+            break
+        received += len(chunk)
+        if ready is None and received >= need:
+            ready = time.perf_counter() - start
+    done = time.perf_counter() - start
+    client.close()
+    sender.join()
+    server.close()
+    return ready, done
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--photos', type=int, default=6)
+    parser.add_argument('--kbps', type=int, default=4000, help='link speed in kbit/s')
+    args = parser.parse_args()
+
+    photos = make_photo_files(args.photos, (1600, 1200))
+    rows = []
+    for a85 in (1, 0):
+        rl_config.useA85 = a85
+        pdf, _ = lambda_function.generate_pdf(dict(SAMPLE_FIELDS), photos)
+        start = time.perf_counter()
+        linear = linearize(pdf)
+        took = time.perf_counter() - start
+        end = first_page_end(linear)
+        streams = 'ASCII85' if a85 else 'binary'
+        rows.append((f'{streams}, plain', pdf, len(pdf), None))
+        rows.append((f'{streams}, linearized', linear, end, took))
+    print(f"{args.photos} photos, {args.kbps} kbit/s")
+    print(f"{'output':22} {'size':>8} {'page 1 needs':>13} {'first page':>11} {'whole file':>11} {'linearize':>10}")
+    for name, data, need, took in rows:
+        ready, done = transfer(data, need, args.kbps)
+        render = first_page_ms(data)
+        print(f"{name:22} {len(data) / 1024:6.0f}KB {need / 1024:11.0f}KB {ready + render / 1000:10.2f}s "
+              f"{done:10.2f}s {'' if took is None else f'{took * 1000:8.0f}ms'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parallel page-stream compression at save time
+
+Checks that the threaded path produces byte-identical output to the serial
+path (rl_config.invariant=1), then times long photo reports with both.
+
+Usage: python bench_pdf_parallel.py [--pages N] [--photos N] [--workers N]
+"""
+
+import argparse
+import io
+
+from _common import SAMPLE_FIELDS, make_photo, make_photo_files, timed
+
+from reportlab import rl_config
+from reportlab.lib.utils import ImageReader
+import pdf_writer
+import lambda_function
+
+
+def render_pages(pages, workers):
+    """Text-heavy pages with a photo each, drawn straight on FooterCanvas"""
+    buffer = io.BytesIO()
+    c = lambda_function.FooterCanvas(buffer, compressWorkers=workers)
+    photo = ImageReader(io.BytesIO(make_photo(0, (400, 300))))
+    for page in range(pages):
+        for line in range(60):
+            c.drawString(40, 800 - line * 12, f'Page {page} checkpoint {line}: condition noted as satisfactory')
+        c.drawImage(photo, 40, 40, 200, 150)
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--photos', type=int, default=60)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rl_config.invariant = 1
+    serial = render_pages(args.pages, 1)
+    threaded = render_pages(args.pages, args.workers)
+    print(f"byte-identical ({args.pages} pages): {serial == threaded}")
+    if serial != threaded:
+        raise SystemExit(1)
+
+    for workers in (1, args.workers):
+        elapsed, _ = timed(render_pages, args.pages, workers, repeat=args.repeat)
+        print(f"canvas {args.pages} pages, workers={workers}: {elapsed * 1000:.1f} ms")
+
+    image_files = make_photo_files(args.photos)
+    for workers in (1, args.workers):
+        pdf_writer.set_compression(workers=workers)
+        elapsed, (pdf_data, _) = timed(lambda_function.generate_pdf, SAMPLE_FIELDS, image_files,
+                                       repeat=args.repeat)
+        print(f"report {args.photos} photos, workers={workers}: {elapsed * 1000:.1f} ms, "
+              f"{len(pdf_data) / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak Python memory of in-memory vs streaming PDF output
+
+Peak is measured with tracemalloc around generate_pdf, excluding the input
+photos which both modes hold anyway.
+
+Usage: python bench_pdf_streaming.py [--photos 5 10 20]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+from _common import SAMPLE_FIELDS, make_photo_files
+
+import lambda_function
+
+
+def measure(image_files, streaming):
+    tracemalloc.start()
+    start = time.perf_counter()
+    if streaming:
+        with tempfile.TemporaryFile() as pdf_file:
+            lambda_function.generate_pdf(SAMPLE_FIELDS, image_files, output=pdf_file)
+            size = pdf_file.tell()
+    else:
+        pdf_data, _ = lambda_function.generate_pdf(SAMPLE_FIELDS, image_files)
+        size = len(pdf_data)
+        del pdf_data
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--photos', type=int, nargs='+', default=[5, 10, 20])
+    args = parser.parse_args()
+
+    print(f"{'photos':>6} {'mode':>10} {'ms':>8} {'peak MB':>8} {'PDF KB':>8}")
+    for count in args.photos:
+        image_files = make_photo_files(count)
+        for streaming in (False, True):
+            elapsed, peak, size = measure(image_files, streaming)
+            mode = 'streaming' if streaming else 'memory'
+            print(f"{count:>6} {mode:>10} {elapsed * 1000:>8.0f} {peak / 2**20:>8.1f} {size / 1024:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: listing photo derivatives per photo, naive vs draft decode + chained resizes
+
+Makes synthetic phone photos (12 MP landscape, 12 MP portrait via EXIF
+orientation, 3 MP) and times make_derivatives per photo three ways: full
+decode with every size resized from it, draft decode with every size
+resized from it, and draft decode with chained resizes (what the worker
+does). Then sends a listing's six photos through the listing-photos
+lambda_handler on a LocalObjectStore, again (duplicate event) and with the
+worker's own output keys, and checks the derivative keys, sizes and
+headers and that nothing was processed twice.
+
+Usage: python bench_photo_derivatives.py [--repeat N]
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+
+from _common import PHOTOS_SRC, PHOTO_SLOTS, make_photo, timed
+
+from PIL import Image, ImageOps
+
+from object_store import LocalObjectStore, s3_event
+from photo_derivatives import IMMUTABLE, VARIANTS, fit, make_derivatives
+
+
+def load_handler():
+    """listing-photos lambda_function (the report Lambda's has the same module name)"""
+    spec = importlib.util.spec_from_file_location('listing_photos_lambda', os.path.join(PHOTOS_SRC, 'lambda_function.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.lambda_handler
+
+
+def rotated(data):
+    """The photo stored sideways with EXIF orientation 6, like a phone held upright"""
+    with Image.open(io.BytesIO(data)) as image:
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        output = io.BytesIO()
+        image.transpose(Image.ROTATE_90).save(output, 'JPEG', quality=85, exif=exif.tobytes())
+    return output.getvalue()
+
+
+def check(store, submission, photos):
+    for slot in PHOTO_SLOTS:
+        manifest = json.loads(store.get(f'submissions/{submission}/{slot}.derivatives.json'))
+        with Image.open(io.BytesIO(photos[slot])) as original:
+            size = ImageOps.exif_transpose(original).size
+        for name, edge, _ in VARIANTS:
+            variant = manifest['variants'][name]
+            expected = f"submissions/{submission}/{slot}.{name}.{manifest['hash'][:8]}.jpg"
+            data, content_type, cache_control = store.objects[variant['key']]
+            with Image.open(io.BytesIO(data)) as image:
+                if variant['key'] != expected or image.size != fit(*size, edge) or image.format != 'JPEG':
+                    raise SystemExit(f"{variant['key']}: {image.size}, expected {expected} at {fit(*size, edge)}")
+            if (variant['width'], variant['height']) != image.size or content_type != 'image/jpeg' \
+                    or cache_control != IMMUTABLE:
+                raise SystemExit(f"{variant['key']}: manifest or headers wrong")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    photos = {
+        '4032x3024 landscape': make_photo(1, (4032, 3024), quality=90),
+        '3024x4032 portrait (EXIF)': rotated(make_photo(2, (4032, 3024), quality=90)),
+        '2048x1536 landscape': make_photo(3, (2048, 1536), quality=90),
+    }
+    print(f"{'photo':28} {'KB':>6} {'naive':>9} {'draft':>9} {'draft+chain':>12}   output KB (full/card/thumb)")
+    for name, data in photos.items():
+        times = []
+        for draft, chained in ((False, False), (True, False), (True, True)):
+            seconds, derivatives = timed(make_derivatives, data, VARIANTS, draft, chained, repeat=args.repeat)
+            times.append(seconds)
+        sizes = '/'.join(f'{len(d.data) / 1024:.0f}' for d in derivatives)
+        print(f"{name:28} {len(data) / 1024:6.0f} {times[0] * 1000:7.0f}ms {times[1] * 1000:7.0f}ms "
+              f"{times[2] * 1000:10.0f}ms   {sizes}  ({times[0] / times[2]:.1f}x)")
+
+    handler = load_handler()
+    store = LocalObjectStore()
+    submission = 'sub_1760000000000_bench'
+    listing_photos = {}
+    for i, slot in enumerate(PHOTO_SLOTS):
+        data = make_photo(10 + i, (4032, 3024), quality=90)
+        if slot.startswith('interior'):
+            data = rotated(data)
+        listing_photos[slot] = data
+        store.put(f'submissions/{submission}/{slot}.jpg', data, 'image/jpeg')
+    store.put(f'submissions/{submission}/rcDocument.pdf', b'%PDF-1.4', 'application/pdf')
+    uploads = s3_event('listings', *(f'submissions/{submission}/{slot}.jpg' for slot in PHOTO_SLOTS),
+                       f'submissions/{submission}/rcDocument.pdf')
+
+    seconds, _ = timed(handler, uploads, None, store, repeat=1)
+    puts = store.calls['put']
+    check(store, submission, listing_photos)
+    own_output = s3_event('listings', *[key for key in store.objects if key.count('.') > 1])
+    again, _ = timed(handler, uploads, None, store, repeat=1)
+    handler(own_output, None, store)
+    if store.calls['put'] != puts:
+        raise SystemExit('duplicate event or derivative keys were processed again')
+    print(f"check: 6 photos -> {len(VARIANTS) * 6} derivatives + 6 manifests with content-hashed keys, "
+          f"immutable Cache-Control; duplicate event and own output keys wrote nothing")
+    print(f"listing of 6 photos: {seconds:.2f} s ({seconds / 6 * 1000:.0f} ms per photo), duplicate event {again * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
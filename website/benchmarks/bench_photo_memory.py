@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory of 20-40 photo reports, eager vs lazy photos
+
+For each photo count the same report is rendered with
+- eager:  reportlab Image flowables over the photo bytes (the old grid),
+- lazy:   LazyPhoto over the photo bytes held in the files dict,
+- store:  LazyPhoto over a PhotoStore kept in memory,
+- spill:  LazyPhoto over a PhotoStore spilled to a temp file,
+each into an in-memory PDF and streamed (PDF_STREAMING=1) to a temp file.
+Every render runs in a fresh interpreter and reports how far loading the
+photos and rendering raised the process's peak RSS above where it was
+after the imports (Linux: ru_maxrss), plus how much photo data it held in
+memory going into the render.
+
+Usage: python bench_photo_memory.py [--photos 20 30 40]
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import SAMPLE_FIELDS, make_photo_files
+
+MODES = ('eager', 'lazy', 'store', 'spill')
+STORE_LIMITS = {'store': float('inf'), 'spill': 0}
+
+
+def child(photo_dir, mode, streaming):
+    """Runs in the fresh interpreter: load the photos, render once"""
+    import lambda_function
+    from photos import PhotoStore
+    from reportlab.platypus import Image as RLImage
+
+    if mode == 'eager':
+        lambda_function.LazyPhoto = lambda source, width, height: RLImage(io.BytesIO(source), width=width, height=height)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    store = PhotoStore(max_memory=STORE_LIMITS[mode]) if mode in STORE_LIMITS else None
+    image_files = {}
+    for filename in sorted(os.listdir(photo_dir)):
+        with open(os.path.join(photo_dir, filename), 'rb') as f:
+            content = f.read()
+        name = os.path.splitext(filename)[0]
+        image_files[name] = {'filename': filename, 'content': content if store is None else store.put(name, content)}
+        del content
+    held = sum(len(f['content']) for f in image_files.values()) if store is None else store.memory_bytes
+
+    start = time.perf_counter()
+    if streaming:
+        with tempfile.TemporaryFile() as pdf_file:
+            lambda_function.generate_pdf(SAMPLE_FIELDS, image_files, output=pdf_file)
+            size = pdf_file.tell()
+    else:
+        pdf_data, _ = lambda_function.generate_pdf(SAMPLE_FIELDS, image_files)
+        size = len(pdf_data)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    print('RESULT ' + json.dumps({'ms': elapsed * 1000, 'held': held / 2**20, 'peak': peak / 1024, 'size': size / 1024}))
+
+
+def run(photo_dir, mode, streaming):
+    env = dict(os.environ, REPORT_WARMUP='0')
+    out = subprocess.run([sys.executable, __file__, '--child', photo_dir, mode, str(int(streaming))],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    line = next(line for line in out.splitlines() if line.startswith('RESULT '))
+    return json.loads(line[len('RESULT '):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--photos', type=int, nargs='+', default=[20, 30, 40])
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        photo_dir, mode, streaming = args.child
+        child(photo_dir, mode, streaming == '1')
+        return
+
+    print(f"{'photos':>6} {'grid':>6} {'output':>10} {'ms':>7} {'held MB':>8} {'+peak MB':>9} {'PDF KB':>8}")
+    for count in args.photos:
+        with tempfile.TemporaryDirectory() as photo_dir:
+            for name, f in make_photo_files(count).items():
+                with open(os.path.join(photo_dir, f'{name}.jpg'), 'wb') as out:
+                    out.write(f['content'])
+            for streaming in (False, True):
+                for mode in MODES:
+                    r = run(photo_dir, mode, streaming)
+                    output = 'streaming' if streaming else 'memory'
+                    print(f"{count:>6} {mode:>6} {output:>10} {r['ms']:>7.0f} "
+                          f"{r['held']:>8.1f} {r['peak']:>9.1f} {r['size']:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
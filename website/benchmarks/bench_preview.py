@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark: preview render mode (?mode=preview)
+
+Times lambda_handler end to end on the same multipart request with and
+without preview. Preview skips the photo bytes and draws placeholders, so it
+should stay under the 200 ms target however many photos are attached.
+
+Usage: python bench_preview.py [--photos N] [--target-ms MS]
+"""
+
+import argparse
+import base64
+import json
+
+from _common import SAMPLE_FIELDS, make_event, make_photo_files, timed
+
+import lambda_function
+
+
+def handle(event):
+    response = lambda_function.lambda_handler(event, None)
+    body = json.loads(response['body'])
+    if not body.get('success'):
+        raise SystemExit(body.get('error'))
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--photos', type=int, default=9)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=200)
+    args = parser.parse_args()
+
+    photos = make_photo_files(args.photos, size=(4000, 3000))
+    full = make_event(SAMPLE_FIELDS, photos)
+    preview = make_event(SAMPLE_FIELDS, photos, query={'mode': 'preview'})
+    print(f"request: {len(SAMPLE_FIELDS)} fields, {args.photos} photos, {len(full['body']) / 1024 / 1024:.1f} MB body")
+
+    handle(preview)  # first call pays for imports and font setup
+    elapsed, body = timed(handle, preview, repeat=args.repeat)
+    pdf_data = base64.b64decode(body['pdfData'])
+    if body['mode'] != 'preview' or b'/Subtype /Image' in pdf_data:
+        raise SystemExit('preview embedded photos')
+    print(f"preview: {elapsed * 1000:.0f} ms ({len(pdf_data) / 1024:.1f} KB)")
+
+    elapsed_full, body = timed(handle, full, repeat=1)
+    print(f"full:    {elapsed_full * 1000:.0f} ms ({len(base64.b64decode(body['pdfData'])) / 1024:.1f} KB)")
+
+    if elapsed * 1000 > args.target_ms:
+        raise SystemExit(f"preview over the {args.target_ms:.0f} ms target")
+
+
+if __name__ == '__main__':
+    main()
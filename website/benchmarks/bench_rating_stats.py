@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fleet rating statistics across many inspections
+
+Checks that parse_ratings reads the form's score formats and leaves
+unreadable ones (words it does not know, out of range, '3/0') unrated.
+Generates random inspection ratings (some categories unrated), checks
+category_stats against a straightforward per-inspection loop, then times
+packing and the column-wise statistics.
+
+Usage: python bench_rating_stats.py [--inspections N]
+"""
+
+import argparse
+import random
+
+from _common import timed
+
+from ratings import SIZE, UNRATED, RatingCategory, Ratings, category_stats, pack, parse_ratings
+
+
+# form value -> half steps, None for unrated
+FORM_SCORES = {'4': 8, '4.5': 9, ' 3.7 ': 7, '9/10': 9, '3/5': 6, 'Good': 8, 'excellent': 10,
+               '': None, 'great': None, '6': None, '-1': None, 'nan': None, '3/0': None, '3/-5': None, '3/inf': None}
+
+
+def check_parse():
+    for raw, expected in FORM_SCORES.items():
+        found = parse_ratings({'overallRating': raw})[RatingCategory.OVERALL]
+        if found != expected:
+            raise SystemExit(f'overallRating={raw!r}: {found}, expected {expected}')
+    print(f"check: parse_ratings on {len(FORM_SCORES)} form values, unreadable ones (incl. '3/0') left unrated")
+
+
+def random_ratings(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        Ratings(bytes(UNRATED if rng.random() < 0.1 else rng.randint(4, 10) for _ in range(SIZE)))
+        for _ in range(count)
+    ]
+
+
+def naive_stats(ratings):
+    stats = {}
+    for category in RatingCategory:
+        scores = [r[category] for r in ratings if r[category] is not None]
+        histogram = [scores.count(step) for step in range(11)]
+        stats[category] = (len(scores), sum(scores) / len(scores) / 2 if scores else None, histogram)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--inspections', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    check_parse()
+    ratings = random_ratings(args.inspections)
+    sample = ratings[:20_000]
+    if {c: tuple(s) for c, s in category_stats(sample).items()} != naive_stats(sample):
+        raise SystemExit('category_stats disagrees with the naive loop')
+
+    elapsed, packed = timed(pack, ratings, repeat=args.repeat)
+    print(f"pack:  {elapsed * 1000:.0f} ms for {args.inspections} inspections ({len(packed) / 1024 / 1024:.1f} MB)")
+    elapsed, stats = timed(category_stats, packed, repeat=args.repeat)
+    print(f"stats: {elapsed * 1000:.0f} ms ({args.inspections / elapsed / 1e6:.0f}M inspections/s)")
+    elapsed_naive, _ = timed(naive_stats, sample, repeat=1)
+    print(f"naive: {elapsed_naive / len(sample) * args.inspections * 1000:.0f} ms (extrapolated)")
+    for category, s in stats.items():
+        print(f"  {category.label:18} rated {s.count:8d}  mean {s.mean:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Stress test / benchmark: report IDs across threads and processes
+
+Generates --count IDs split over --processes forked workers with --threads
+threads each and reports the rate, the number of duplicates and whether
+every thread's IDs came out in increasing order (tests/test_report_ids.py
+checks the same properties on a smaller scale).
+
+Usage: python bench_report_ids.py [--count 2000000] [--processes 4] [--threads 4]
+"""
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import _common  # noqa: F401  (sys.path setup)
+import report_ids
+
+
+def thread_batch(count):
+    ids = [report_ids.new_report_id() for _ in range(count)]
+    return ids, ids == sorted(ids)
+
+
+def process_batch(args):
+    count, threads = args
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(thread_batch, [count // threads] * threads))
+    ids = [i for batch, _ in results for i in batch]
+    return ids, all(ordered for _, ordered in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=2_000_000)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    per_process = args.count // args.processes
+    start = time.perf_counter()
+    with multiprocessing.get_context('fork').Pool(args.processes) as pool:
+        results = pool.map(process_batch, [(per_process, args.threads)] * args.processes)
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(ids) for ids, _ in results)
+    unique = len({i for ids, _ in results for i in ids})
+    ordered = all(ok for _, ok in results)
+    print(f"{total:,} IDs in {elapsed:.2f}s ({total / elapsed:,.0f}/s incl. transfer)")
+    print(f"collisions: {total - unique}, per-thread monotonic: {ordered}")
+
+    start = time.perf_counter()
+    for _ in range(200_000):
+        report_ids.new_report_id()
+    print(f"single thread: {200_000 / (time.perf_counter() - start):,.0f} IDs/s")
+
+
+if __name__ == '__main__':
+    main()
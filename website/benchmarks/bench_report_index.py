@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark: report index lookups on a million reports
+
+Fills an SQLite report index (temp file) with --reports synthetic reports,
+about one vehicle in five inspected more than once, in batches of
+--batch, and times the load. Then times search() for each kind of lookup
+(registration typed with spaces, chassis, engine, chassis prefix, make +
+model, inspector, a number nobody has) and, for comparison, a registration
+lookup that scans the table. Checks that the vehicle lookups return
+exactly that vehicle's reports newest first, that processes adding
+overlapping batches to one file count each new report once and leave the
+FTS index consistent, and that lambda_handler with REPORT_INDEX set
+records a generated report (and not a preview).
+
+Usage: python bench_report_index.py [--reports N] [--batch N] [--queries N]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+from _common import SAMPLE_FIELDS, make_event, make_photo_files
+
+os.environ.setdefault('REPORT_WARMUP', '0')
+
+import report_ids  # noqa: E402
+from report_index import IDENTIFIERS, ReportRecord, SQLiteReportIndex, normalize_number, open_index  # noqa: E402
+
+STATES = ['MH', 'KA', 'DL', 'TN', 'GJ', 'UP', 'RJ', 'TS', 'KL', 'WB']
+MAKES = {'Maruti': ['Swift', 'Baleno', 'Brezza', 'Dzire'], 'Hyundai': ['Creta', 'i20', 'Venue'],
+         'Tata': ['Nexon', 'Altroz', 'Punch'], 'Honda': ['City', 'Amaze'], 'Mahindra': ['XUV700', 'Thar']}
+INSPECTORS = [f'{first} {last}' for first in ('Prasad', 'Amit', 'Ravi', 'Sneha', 'Imran', 'Kavya', 'Arjun', 'Neha')
+              for last in ('Kumar', 'Sharma', 'Patil', 'Iyer', 'Khan')]
+
+
+def make_vehicle(rng):
+    make = rng.choice(sorted(MAKES))
+    return {
+        'registration': (f'{rng.choice(STATES)} {rng.randrange(1, 99):02d} '
+                         f'{"".join(rng.choices(string.ascii_uppercase, k=2))} {rng.randrange(10000):04d}'),
+        'chassis': 'MA3' + ''.join(rng.choices(string.ascii_uppercase + string.digits, k=14)),
+        'engine': f'{rng.choice(["D13A", "K12M", "G4LA", "L15Z"])}-{rng.randrange(10**7):07d}',
+        'make': make,
+        'model': rng.choice(MAKES[make]),
+    }
+
+
+def make_reports(count, seed=0):
+    """(records, vehicles): ~20% of the reports are a re-inspection of an earlier vehicle"""
+    rng = random.Random(seed)
+    vehicles = []
+    records = []
+    for i in range(count):
+        if vehicles and rng.random() < 0.2:
+            vehicle = rng.choice(vehicles)
+        else:
+            vehicle = make_vehicle(rng)
+            vehicles.append(vehicle)
+        report_id = report_ids.new_report_id()
+        records.append(ReportRecord(report_id, inspector=rng.choice(INSPECTORS),
+                                    inspected_on=f'2025-{1 + i * 12 // count:02d}-{1 + i % 28:02d}',
+                                    created_at='2025-01-01T00:00:00+00:00',
+                                    artifact=f's3://inspectionwale-reports/Inspection_Report_{report_id}.pdf', **vehicle))
+    return records, vehicles
+
+
+def latencies(index, queries, limit=20):
+    times = []
+    hits = 0
+    for query in queries:
+        start = time.perf_counter()
+        hits += len(index.search(query, limit))
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99)], hits / len(queries)
+
+
+def check(records, index, vehicles, rng):
+    reports = {field: {} for field in IDENTIFIERS}
+    for record in records:
+        for field in IDENTIFIERS:
+            reports[field].setdefault(getattr(record, field), []).append(record.report_id)
+    for vehicle in rng.sample(vehicles, 500):
+        for field, query in zip(IDENTIFIERS, (vehicle['registration'].lower(), vehicle['chassis'], vehicle['engine'])):
+            # another vehicle can share a number in another field; the exact match on this one is enough
+            expected = set(reports[field][normalize_number(query)])
+            found = [record.report_id for record in index.search(query, limit=100)]
+            if not expected <= set(found) or found != sorted(found, reverse=True):
+                raise SystemExit(f'{query}: {found}, expected {sorted(expected, reverse=True)}')
+    print("check: registration/chassis/engine lookups return that vehicle's reports, newest first")
+
+
+def add_batches(path, batches):
+    index = SQLiteReportIndex(path)
+    added = sum(index.add_many(batch) for batch in batches)
+    index.close()
+    return added
+
+
+def check_processes(records, directory, processes=4, batch=50):
+    """Each process adds every other batch of the same records, in its own order"""
+    path = os.path.join(directory, 'shared.db')
+    SQLiteReportIndex(path).close()
+    batches = [records[i:i + batch] for i in range(0, len(records), batch)]
+    work = [(path, batches[k % 2::2][::1 if k < 2 else -1]) for k in range(processes)]
+    with multiprocessing.get_context('fork').Pool(processes) as pool:
+        added = sum(pool.starmap(add_batches, work))
+    index = SQLiteReportIndex(path)
+    fts = index._db.execute("SELECT count(*) FROM reports_fts WHERE reports_fts MATCH 'make:maruti OR make:hyundai "
+                            "OR make:tata OR make:honda OR make:mahindra'").fetchone()[0]
+    index._db.execute("INSERT INTO reports_fts (reports_fts) VALUES ('integrity-check')")
+    if added != len(records) or index.count() != len(records) or fts != len(records):
+        raise SystemExit(f'{processes} processes: {added} added, {index.count()} stored, {fts} in FTS, '
+                         f'expected {len(records)}')
+    index.close()
+    print(f"check: {processes} processes adding overlapping batches count each report once, FTS index consistent")
+
+
+def check_handler(directory):
+    os.environ['REPORT_INDEX'] = f"sqlite:///{os.path.join(directory, 'handler.db')}"
+    import lambda_function
+    ids = {}
+    for mode in ('report', 'preview'):
+        event = make_event(SAMPLE_FIELDS, make_photo_files(2), query={'mode': mode})
+        ids[mode] = json.loads(lambda_function.lambda_handler(event, None)['body'])['reportId']
+    index = open_index(os.environ['REPORT_INDEX'])
+    found = [record.report_id for record in index.search(SAMPLE_FIELDS['registrationNumber'])]
+    if found != [ids['report']] or index.get(ids['report']).inspector != SAMPLE_FIELDS['inspectorName']:
+        raise SystemExit(f'lambda_handler indexed {found}, expected [{ids["report"]}] (not the preview)')
+    print("check: lambda_handler records the report in REPORT_INDEX, previews are not recorded")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reports', type=int, default=1_000_000)
+    parser.add_argument('--batch', type=int, default=10_000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    records, vehicles = make_reports(args.reports)
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'reports.db')
+        index = SQLiteReportIndex(path)
+        start = time.perf_counter()
+        for i in range(0, len(records), args.batch):
+            index.add_many(records[i:i + args.batch])
+        load = time.perf_counter() - start
+        again = index.add_many(records[:args.batch])
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"{index.count()} reports, {len(vehicles)} vehicles: loaded in {load:.1f} s "
+              f"({len(records) / load:,.0f}/s), {size / 2**20:.0f} MB; re-adding a batch added {again}")
+
+        check(records, index, vehicles, rng)
+        sample = [rng.choice(vehicles) for _ in range(args.queries)]
+        kinds = {
+            'registration, typed "mh 12 ab 1234"': [v['registration'].lower() for v in sample],
+            'chassis number': [v['chassis'] for v in sample],
+            'engine number': [v['engine'] for v in sample],
+            'chassis prefix (FTS)': [v['chassis'][:9] for v in sample],
+            'make + model (FTS)': [f"{v['make']} {v['model']}" for v in sample],
+            'inspector first name (FTS)': [rng.choice(INSPECTORS).split()[0] for _ in sample],
+            'unknown number': [f'ZZ{i:08d}' for i in range(args.queries)],
+        }
+        print(f"{'lookup (limit 20)':36} {'median':>9} {'p99':>9} {'hits':>5}")
+        for name, queries in kinds.items():
+            median, p99, hits = latencies(index, queries)
+            print(f"{name:36} {median * 1e6:7.0f}us {p99 * 1e6:7.0f}us {hits:5.1f}")
+        scan = []
+        for vehicle in sample[:5]:
+            start = time.perf_counter()
+            index._db.execute('SELECT report_id FROM reports WHERE registration || \'\' = ? ORDER BY seq DESC LIMIT 20',
+                              (normalize_number(vehicle['registration']),)).fetchall()
+            scan.append(time.perf_counter() - start)
+        print(f"{'registration, table scan (no index)':36} {statistics.median(scan) * 1e6:7.0f}us")
+        index.close()
+
+        check_processes(records[:20_000], directory)
+        check_handler(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: checkpointed, conditional re-imports vs loading everything again
+
+Writes --items listings as JSON Lines and imports them into a LocalDynamoDB
+(--latency seconds per call) the way add-placeholder-listings.py does:
+- first load, which dies (access denied) after about half the rows,
+- the re-run, which resumes at the committed offset,
+- a re-sync of a regenerated feed: every updatedAt bumped and --changed
+  of the listings with a new price,
+- the same re-sync with the state file lost (conditional puts only),
+- the re-sync as a plain BatchWriteItem reload, for comparison.
+Reports what each run read, wrote and how long it took, and checks that
+the table ends up holding the feed and that unchanged listings kept their
+original updatedAt.
+
+Usage: python bench_resume.py [--items N] [--changed FRACTION] [--latency S]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from _common import make_listings
+
+from botocore.exceptions import ClientError
+
+from listing_tools.bulk_loader import BulkLoader
+from listing_tools.checkpoint import ImportCheckpoint, changed_condition
+from listing_tools.ingest import FeedReader
+from listing_tools.listings import unmarshal_listing
+from listing_tools.local_dynamo import LocalDynamoDB
+
+
+class FailingClient:
+    """Passes calls through until `budget` writes have gone by, then denies everything"""
+
+    def __init__(self, client, budget):
+        self.client = client
+        self.budget = budget
+
+    def put_item(self, **kwargs):
+        self.budget -= 1
+        if self.budget < 0:
+            raise ClientError({'Error': {'Code': 'AccessDeniedException', 'Message': 'denied'}}, 'PutItem')
+        return self.client.put_item(**kwargs)
+
+
+def write_feed(path, listings):
+    with open(path, 'w') as f:
+        for listing in listings:
+            f.write(json.dumps(listing) + '\n')
+
+
+def run_import(client, feed, state, workers=8, batch=False, fresh=False):
+    db = client.client if isinstance(client, FailingClient) else client
+    calls = dict(db.calls)
+    start = time.perf_counter()
+    checkpoint = ImportCheckpoint(state, feed)
+    if not fresh:
+        checkpoint.load()
+    loader = BulkLoader(client, 'CarListings', workers=workers, on_done=checkpoint.committed,
+                        condition=None if batch else changed_condition)
+    with FeedReader(feed) as reader:
+        stats = loader.load(checkpoint.select(listing if not problems else None for _, listing, problems in reader))
+    checkpoint.save()
+    elapsed = time.perf_counter() - start
+    requests = sum(db.calls.get(op, 0) - calls.get(op, 0) for op in ('PutItem', 'BatchWriteItem'))
+    return {'s': elapsed, 'written': stats.written, 'failed': stats.failed, 'skipped': stats.skipped,
+            'resumed': checkpoint.resumed, 'unchanged': checkpoint.unchanged, 'requests': requests,
+            'offset': checkpoint.offset}
+
+
+def check(db, listings, original_updated):
+    table = db.tables['CarListings']
+    if len(table) != len(listings):
+        raise SystemExit(f'table holds {len(table)} listings, feed {len(listings)}')
+    for listing in listings:
+        stored = unmarshal_listing(table[(('S', listing['listingId']),)])
+        stored.pop('contentHash')
+        expected = dict(listing, updatedAt=stored['updatedAt'])
+        if stored != expected:
+            raise SystemExit(f"{listing['listingId']}: table differs from the feed")
+        if listing['listingId'] in original_updated and stored['updatedAt'] != original_updated[listing['listingId']]:
+            raise SystemExit(f"{listing['listingId']}: unchanged listing had updatedAt rewritten")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=20_000)
+    parser.add_argument('--changed', type=float, default=0.02)
+    parser.add_argument('--latency', type=float, default=0.002, help='seconds per call')
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    listings = list(make_listings(args.items))
+    resync = [dict(listing, updatedAt='2026-01-01T00:00:00.000Z') for listing in listings]
+    changed = set(rng.sample(range(args.items), int(args.items * args.changed)))
+    for i in changed:
+        resync[i]['car'] = dict(resync[i]['car'], expectedPrice=str(int(resync[i]['car']['expectedPrice']) + 5000))
+    untouched = {listing['listingId']: listing['updatedAt'] for i, listing in enumerate(listings) if i not in changed}
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        feed, state = os.path.join(directory, 'feed.jsonl'), os.path.join(directory, 'feed.jsonl.import-state.json')
+        write_feed(feed, listings)
+        db = LocalDynamoDB(latency=args.latency)
+        rows.append(('first load, dies halfway', run_import(FailingClient(db, args.items // 2), feed, state)))
+        rows.append(('re-run (resume)', run_import(db, feed, state)))
+        check(db, listings, {})
+
+        write_feed(feed, resync)
+        with open(state) as f:
+            saved_state = f.read()
+        loaded = dict(db.tables['CarListings'])
+        for name, kwargs in (('re-sync, checkpoint', {}),
+                             ('re-sync, state file lost', {'fresh': True}),
+                             ('re-sync, BatchWriteItem reload', {'fresh': True, 'batch': True})):
+            db.tables['CarListings'] = dict(loaded)
+            with open(state, 'w') as f:
+                f.write(saved_state)
+            rows.append((name, run_import(db, feed, state, **kwargs)))
+            check(db, resync, {} if kwargs.get('batch') else untouched)
+    print("check: table = feed after every run; unchanged listings kept their updatedAt (except the reload)")
+
+    print(f"{args.items} listings, {len(changed)} changed in the re-sync, {args.latency * 1000:.0f} ms per call, 8 threads")
+    print(f"{'run':32} {'time':>7} {'calls':>7} {'written':>8} {'up to date':>10} {'skipped':>8} {'failed':>7}")
+    for name, r in rows:
+        print(f"{name:32} {r['s']:>6.1f}s {r['requests']:>7} {r['written']:>8} {r['skipped']:>10} "
+              f"{r['resumed'] + r['unchanged']:>8} {r['failed']:>7}")
+
+
+if __name__ == '__main__':
+    main()
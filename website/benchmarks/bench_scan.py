@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parallel segmented scan vs the serial scan
+
+Fills a LocalDynamoDB table with --items listings and reads it back with
+ParallelScan at 1 (serial) to --max-segments segments, for a Select=COUNT
+count, a status histogram and a full JSON Lines export. Every scan call
+sleeps --latency seconds, standing in for the round trip of a 1 MB page.
+Before timing, each mode's count, histogram and exported listingIds are
+checked against the generated data at every segment count.
+
+Usage: python bench_scan.py [--items N] [--latency S] [--max-segments N]
+"""
+
+import argparse
+import io
+import json
+from collections import Counter
+
+from _common import make_listings, timed
+
+from listing_tools.listings import marshal_listing
+from listing_tools.local_dynamo import LocalDynamoDB
+from listing_tools.scan import ParallelScan
+
+
+def fill(count):
+    client = LocalDynamoDB()
+    table = client.tables['CarListings']
+    statuses = Counter()
+    for listing in make_listings(count):
+        table[(('S', listing['listingId']),)] = marshal_listing(listing)
+        statuses[listing['status']] += 1
+    return client, statuses
+
+
+def export(scan):
+    out = io.StringIO()
+    return scan.export(out), out.getvalue()
+
+
+def check(client, statuses, segment_counts):
+    ids = {key[0][1] for key in client.tables['CarListings']}
+    for segments in segment_counts:
+        scan = ParallelScan(client, 'CarListings', segments=segments)
+        if scan.count().count != len(ids):
+            raise SystemExit(f'{segments} segments: wrong count')
+        if scan.summarize().statuses != statuses:
+            raise SystemExit(f'{segments} segments: wrong status histogram')
+        summary, text = export(scan)
+        exported = [json.loads(line)['listingId'] for line in text.splitlines()]
+        if len(exported) != len(ids) or set(exported) != ids or summary.statuses != statuses:
+            raise SystemExit(f'{segments} segments: export lost or repeated listings')
+    print(f"check: count, histogram and export agree at {', '.join(map(str, segment_counts))} segments")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=100_000)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds per Scan call')
+    parser.add_argument('--max-segments', type=int, default=16)
+    args = parser.parse_args()
+
+    client, statuses = fill(args.items)
+    segment_counts = [1]
+    while segment_counts[-1] * 2 <= args.max_segments:
+        segment_counts.append(segment_counts[-1] * 2)
+    check(client, statuses, segment_counts)
+
+    client.latency = args.latency
+    print(f"{args.items} listings, {args.latency * 1000:.0f} ms per page, best of 3")
+    print(f"{'segments':>8} {'count':>10} {'histogram':>10} {'export':>10}   (items/s)")
+    for segments in segment_counts:
+        scan = ParallelScan(client, 'CarListings', segments=segments)
+        rates = []
+        for run in (scan.count, scan.summarize, lambda: export(scan)):
+            elapsed, _ = timed(run)
+            rates.append(args.items / elapsed)
+        print(f"{segments:>8} " + ' '.join(f"{rate:>10.0f}" for rate in rates))
+
+
+if __name__ == '__main__':
+    main()
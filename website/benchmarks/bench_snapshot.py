@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: static listings feed vs building the public list per request
+
+Fills a LocalDynamoDB table (--latency seconds per Scan page) with --items
+listings and compares
+- per request: what handleList does on every visit (serial scan of whole
+  items, status filter, sanitise, one JSON body),
+- full build: ListingsSnapshot from a parallel scan, written to disk,
+- incremental: --changes listings approved, sold or withdrawn, applied
+  as DynamoDB Streams records to the last build.
+Checks that the feed holds exactly the per-request answer, and that the
+incremental build writes the same files a full rebuild of the changed
+table would.
+
+Usage: python bench_snapshot.py [--items N] [--changes N] [--latency S]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from _common import make_listings, timed
+
+from listing_tools.listings import marshal_listing, unmarshal_listing
+from listing_tools.local_dynamo import LocalDynamoDB
+from listing_tools.scan import ParallelScan
+from listing_tools.snapshot import ListingsSnapshot, is_visible, public_listing, scan_listings
+
+
+def per_request(client):
+    """handleList: scan everything, keep visible listings, sanitise, serialise"""
+    items = []
+    for _, page in ParallelScan(client, 'CarListings', segments=1).pages():
+        items += [public_listing(x) for x in map(unmarshal_listing, page.get('Items', [])) if is_visible(x)]
+    return json.dumps({'ok': True, 'items': items}).encode()
+
+
+def full_build(client, out_dir):
+    snapshot = ListingsSnapshot(out_dir)
+    snapshot.rebuild(scan_listings(ParallelScan(client, 'CarListings', segments=8)))
+    return snapshot, snapshot.write()
+
+
+def change_records(client, count, seed=1):
+    """Change `count` random listings in the table; the matching stream records"""
+    rng = random.Random(seed)
+    table = client.tables['CarListings']
+    records = []
+    for sequence, key in enumerate(rng.sample(sorted(table), count), 1):
+        listing = unmarshal_listing(table[key])
+        listing['status'] = rng.choice(['approved', 'sold', 'rejected'])
+        item = marshal_listing(listing)
+        table[key] = item
+        records.append({'eventName': 'MODIFY', 'dynamodb': {
+            'Keys': {'listingId': item['listingId']}, 'NewImage': item,
+            'SequenceNumber': str(10**20 + sequence)}})
+    return records
+
+
+def incremental(out_dir, records):
+    snapshot = ListingsSnapshot(out_dir)
+    snapshot.load()
+    changed = snapshot.apply_changes(records)
+    return changed, snapshot.write()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=50_000)
+    parser.add_argument('--changes', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds per Scan call')
+    args = parser.parse_args()
+
+    client = LocalDynamoDB()
+    for listing in make_listings(args.items):
+        client.tables['CarListings'][(('S', listing['listingId']),)] = marshal_listing(listing)
+    client.latency = args.latency
+
+    with tempfile.TemporaryDirectory() as directory:
+        out_dir = os.path.join(directory, 'feed')
+        request_time, body = timed(per_request, client)
+        start = time.perf_counter()
+        snapshot, stats = full_build(client, out_dir)
+        build_time = time.perf_counter() - start
+
+        served = sorted(json.loads(body)['items'], key=lambda x: x['listingId'])
+        if sorted(snapshot.ordered(), key=lambda x: x['listingId']) != served:
+            raise SystemExit('feed differs from the per-request answer')
+        pages = json.loads(_read(out_dir, 'manifest.json'))['pages']
+        first_size = os.path.getsize(os.path.join(out_dir, pages[0]))
+
+        records = change_records(client, args.changes)
+        start = time.perf_counter()
+        changed, delta = incremental(out_dir, records)
+        delta_time = time.perf_counter() - start
+        full_build(client, os.path.join(directory, 'rebuilt'))
+        if _read(out_dir, 'manifest.json') != _read(directory, 'rebuilt', 'manifest.json'):
+            raise SystemExit('incremental build differs from a full rebuild')
+        print(f"check: feed = per-request answer; incremental = full rebuild after {args.changes} changes")
+
+        print(f"{args.items} listings, {len(served)} public, {args.latency * 1000:.0f} ms per Scan page")
+        print(f"{'per request (handleList)':28} {request_time * 1000:8.0f} ms  {len(body) / 1024:8.0f} KB body")
+        print(f"{'full build (8 segments)':28} {build_time * 1000:8.0f} ms  {len(pages)} pages, "
+              f"{len(stats.written)} files; page 1 is {first_size / 1024:.0f} KB")
+        print(f"{f'incremental ({args.changes} changes)':28} {delta_time * 1000:8.0f} ms  "
+              f"{changed} listings changed, {len(delta.written)} files written, {delta.unchanged} unchanged")
+
+
+def _read(*path):
+    with open(os.path.join(*path), 'rb') as f:
+        return f.read()
+
+
+if __name__ == '__main__':
+    main()
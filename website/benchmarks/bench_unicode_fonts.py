@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: mixed-script (English + Devanagari) reports, cold and warm
+
+Uses the Noto Sans Devanagari shipped in the report Lambda's fonts/, or
+the font given by --font-dir/--regular. Each round starts a fresh interpreter
+with and without the init warm-up and times two mixed-script reports
+and a Latin-only one. In-process it then times parsing the font file and
+building the per-document subset uncached vs cached.
+
+Usage: python bench_unicode_fonts.py [--font-dir DIR] [--regular FILE] [--rounds N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from _common import SAMPLE_FIELDS
+
+MIXED_NOTES = {
+    'highlights': 'Well maintained. गाडी चांगल्या स्थितीत आहे, सर्व्हिस रेकॉर्ड उपलब्ध.',
+    'paintNotes': 'Minor scratches on rear bumper. मागच्या बंपरवर किरकोळ ओरखडे.',
+    'engineNotes': 'इंजिन सुरळीत चालते, तेल गळती नाही. Battery in good condition.',
+    'issuesFound': 'पुढचे टायर 40% घासलेले.',
+}
+
+
+def child():
+    """Runs in the fresh interpreter: time init and three reports"""
+    start = time.perf_counter()
+    import lambda_function
+    timings = {'init': time.perf_counter() - start}
+    mixed = dict(SAMPLE_FIELDS, **MIXED_NOTES)
+    for name, fields in (('first mixed', mixed), ('second mixed', mixed), ('latin only', SAMPLE_FIELDS)):
+        start = time.perf_counter()
+        lambda_function.generate_pdf(fields, {})
+        timings[name] = time.perf_counter() - start
+    print('RESULT ' + json.dumps(timings))
+
+
+def run_round(warmup):
+    env = dict(os.environ, REPORT_WARMUP='1' if warmup else '0')
+    out = subprocess.run([sys.executable, __file__, '--child'], env=env,
+                         capture_output=True, text=True, check=True).stdout
+    line = next(line for line in out.splitlines() if line.startswith('RESULT '))
+    return json.loads(line[len('RESULT '):])
+
+
+def in_process(font_path):
+    import lambda_function
+    import fonts
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    start = time.perf_counter()
+    font = fonts.ReportTTFont('BenchFont', font_path)
+    print(f"parse font file:  {(time.perf_counter() - start) * 1000:7.1f} ms")
+    subset = list(range(128)) + [ord(c) for c in fonts.DEVANAGARI]
+    plain = TTFont('BenchPlain', font_path)
+    start = time.perf_counter()
+    plain.face.makeSubset(subset)
+    print(f"build subset:     {(time.perf_counter() - start) * 1000:7.1f} ms")
+    font.face.makeSubset(subset)
+    start = time.perf_counter()
+    font.face.makeSubset(subset)
+    print(f"cached subset:    {(time.perf_counter() - start) * 1000:7.3f} ms")
+    mixed = dict(SAMPLE_FIELDS, **MIXED_NOTES)
+    lambda_function.generate_pdf(mixed, {})
+    pdf_data, _ = lambda_function.generate_pdf(mixed, {})
+    latin, _ = lambda_function.generate_pdf(SAMPLE_FIELDS, {})
+    print(f"PDF size: mixed {len(pdf_data) / 1024:.1f} KB, latin only {len(latin) / 1024:.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--font-dir', default=os.environ.get('REPORT_FONT_DIR'))
+    parser.add_argument('--regular', default=os.environ.get('REPORT_FONT_REGULAR'))
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    if args.font_dir:
+        os.environ['REPORT_FONT_DIR'] = args.font_dir
+    if args.regular:
+        os.environ['REPORT_FONT_REGULAR'] = args.regular
+    import fonts
+    font_path = os.path.join(fonts.FONT_DIR, fonts.FONT_FILES[False])
+    if not os.path.exists(font_path):
+        raise SystemExit(f'no font at {font_path}; pass --font-dir/--regular')
+
+    keys = ('init', 'first mixed', 'second mixed', 'latin only')
+    results = {True: [], False: []}
+    for _ in range(args.rounds):
+        for warmup in (True, False):
+            results[warmup].append(run_round(warmup))
+    print(f"{args.rounds} fresh interpreters each, median ms")
+    print(f"{'':12}" + ''.join(f"{key:>14}" for key in keys))
+    for warmup in (False, True):
+        medians = [statistics.median(r[key] for r in results[warmup]) * 1000 for key in keys]
+        print(f"{'warm-up' if warmup else 'no warm-up':12}" + ''.join(f"{ms:14.0f}" for ms in medians))
+    print()
+    in_process(font_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Load test: self-hosted report server (report_server.py)
+
+Fires --requests POSTs of a sample inspection form at --concurrency, then
+prints requests/s and latency percentiles. Without --url a server is
+started on a free local port with the given --workers/--threads and
+stopped afterwards.
+
+Usage: python load_test_server.py [--url URL] [--requests N] [--concurrency C] [--photos N] [--preview]
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from _common import REPORT_SRC, SAMPLE_FIELDS, make_multipart, make_photo_files
+
+
+def post(url, body, content_type):
+    """One request on a fresh connection; (status, seconds, response bytes)"""
+    parts = urlsplit(url)
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+    try:
+        conn.request('POST', parts.path + ('?' + parts.query if parts.query else ''), body,
+                     {'Content-Type': content_type})
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, time.perf_counter() - start, len(data)
+    except OSError:
+        return None, time.perf_counter() - start, 0
+    finally:
+        conn.close()
+
+
+def start_server(workers, threads, max_requests):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(REPORT_SRC, 'report_server.py'), '--host', '127.0.0.1',
+         '--port', str(port), '--workers', str(workers), '--threads', str(threads),
+         '--max-requests', str(max_requests)],
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server, f'http://127.0.0.1:{port}/'
+        except OSError:
+            if server.poll() is not None:
+                raise SystemExit('report server failed to start')
+            time.sleep(0.1)
+    server.kill()
+    raise SystemExit('report server did not start listening')
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='existing server; default starts one')
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--photos', type=int, default=6)
+    parser.add_argument('--preview', action='store_true', help='send ?mode=preview')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--max-requests', type=int, default=500)
+    args = parser.parse_args()
+
+    body, content_type = make_multipart(SAMPLE_FIELDS, make_photo_files(args.photos))
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server(args.workers, args.threads, args.max_requests)
+        print(f"server: {args.workers} workers x {args.threads} threads at {url}")
+    if args.preview:
+        url += '?mode=preview'
+
+    try:
+        post(url, body, content_type)  # warm the connection path
+        print(f"{args.requests} requests, concurrency {args.concurrency}, {len(body) / 1024:.0f} KB each")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            results = list(pool.map(lambda _: post(url, body, content_type), range(args.requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(30)
+
+    ok = sorted(seconds for status, seconds, _ in results if status == 200)
+    errors = len(results) - len(ok)
+    print(f"throughput: {len(ok) / elapsed:.1f} req/s ({elapsed:.1f} s, {errors} errors)")
+    print("latency ms: " + "  ".join(
+        f"p{pct}={percentile(ok, pct) * 1000:.0f}" for pct in (50, 90, 99)
+    ) + f"  max={ok[-1] * 1000 if ok else 0:.0f}")
+    if errors:
+        raise SystemExit(f"{errors} requests failed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Build Responsive Image Derivatives
+This script writes every image under Images/ and img/ at several widths (480-1920, never upscaled)
+as WebP plus a JPEG fallback (PNG for transparent images) into Images/responsive/, in parallel
+across cores, and records them in Images/responsive/manifest.json with srcset strings. Images whose
+content hash is unchanged since the last run are skipped.
+
+Usage: python build-images.py [--source Images --source img] [--out Images/responsive]
+                              [--widths 480,768,1280,1920] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, 'amplify', 'functions', 'generate-report', 'src', 'package'))
+
+from PIL import features
+
+from image_tools.derivatives import WIDTHS, DerivativeBuilder
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build responsive WebP/JPEG image derivatives')
+    parser.add_argument('--source', action='append', help='folder under website/ to read (default: Images and img)')
+    parser.add_argument('--out', default='Images/responsive', help='output folder under website/')
+    parser.add_argument('--widths', default=','.join(map(str, WIDTHS)), help='comma-separated widths')
+    parser.add_argument('--workers', type=int, help='processes (default: one per core)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not features.check('webp'):
+        print("❌ This Pillow has no WebP support")
+        sys.exit(1)
+    
+    builder = DerivativeBuilder(HERE, sources=args.source or ('Images', 'img'), out=args.out,
+                                widths=[int(w) for w in args.widths.split(',')], workers=args.workers)
+    print(f"🖼️ Building image derivatives into {args.out}/ ({builder.workers} workers)...")
+    print("=" * 60)
+    
+    stats = builder.build()
+    manifest = builder.load_manifest()
+    
+    original = sum(manifest[rel]['bytes'] for rel in stats.built)
+    largest_webp = sum(manifest[rel]['derivatives']['webp'][-1]['bytes'] for rel in stats.built)
+    print(f"✅ Built {len(stats.built)} images in {stats.elapsed:.1f}s, {stats.skipped} unchanged, "
+          f"{stats.removed} old files removed")
+    if stats.built:
+        print(f"   Originals {original / 1024:.0f} KB -> largest WebP {largest_webp / 1024:.0f} KB")
+    for error in stats.errors:
+        print(f"⚠️ Skipped {error}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
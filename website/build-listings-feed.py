@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Build the Static Public Listings Feed
+This script writes what the customer-listings Lambda returns for GET (approved/sold/booked listings,
+sanitised, newest first) as static JSON files: a manifest, content-hashed pages and a make/price
+index, ready for `aws s3 sync listings-feed s3://<bucket>/listings-feed`. With --changes it applies
+DynamoDB Streams records (JSON Lines) to the last build instead of scanning the table again.
+
+Usage: python build-listings-feed.py [--out listings-feed] [--changes stream-records.jsonl] [--full]
+                                     [--table CarListings] [--region us-east-1] [--segments 8]
+                                     [--page-size 24] [--endpoint-url http://localhost:8000]
+"""
+
+import argparse
+import os
+import sys
+
+import boto3
+
+from listing_tools.ingest import iter_json_lines
+from listing_tools.scan import ParallelScan
+from listing_tools.snapshot import PAGE_SIZE, ListingsSnapshot, scan_listings
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build the static public listings feed')
+    parser.add_argument('--out', default='listings-feed', help='output directory')
+    parser.add_argument('--changes', help='DynamoDB Streams records, one per line, to apply to the last build')
+    parser.add_argument('--full', action='store_true', help='rescan the table even if there is a previous build')
+    parser.add_argument('--table', default='CarListings')
+    parser.add_argument('--region', default='us-east-1')
+    parser.add_argument('--segments', type=int, default=8, help='parallel scan segments')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    parser.add_argument('--cdn-url', default=os.environ.get('CAR_LISTINGS_CDN', ''), help='base URL for photo keys')
+    parser.add_argument('--bucket', default=os.environ.get('CAR_LISTINGS_BUCKET', ''), help='S3 fallback for photo keys')
+    parser.add_argument('--endpoint-url', help='e.g. http://localhost:8000 for DynamoDB Local')
+    return parser.parse_args()
+
+def read_changes(path):
+    with open(path, encoding='utf-8') as f:
+        for number, record, error in iter_json_lines(f):
+            if error:
+                raise ValueError(f"line {number}: {error}")
+            yield record
+
+def main():
+    args = parse_args()
+    snapshot = ListingsSnapshot(args.out, page_size=args.page_size, cdn_base_url=args.cdn_url, bucket=args.bucket)
+    
+    print(f"📦 Building listings feed in {args.out}/ from {args.table}...")
+    print("=" * 60)
+    
+    try:
+        if args.changes and not args.full and snapshot.load():
+            changed = snapshot.apply_changes(read_changes(args.changes))
+            print(f"🔁 Applied {args.changes}: {changed} listings changed ({len(snapshot.sequences)} shards seen)")
+        else:
+            if args.changes and not args.full:
+                print("⚠️ No previous build found, scanning the whole table")
+            client = boto3.client('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+            snapshot.rebuild(scan_listings(ParallelScan(client, args.table, segments=args.segments)))
+            print(f"🔍 Scanned {args.table}: {len(snapshot.listings)} public listings")
+        stats = snapshot.write()
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Scan failed: {e}")
+        sys.exit(1)
+    
+    print(f"✅ {len(snapshot.listings)} listings: {len(stats.written)} files written "
+          f"({stats.bytes / 1024:.1f} KB), {stats.unchanged} unchanged, {stats.removed} old files removed")
+    for path in stats.written:
+        print(f"   {path}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
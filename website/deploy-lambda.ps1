@@ -19,7 +19,9 @@ Write-Host "📥 Installing Python dependencies..." -ForegroundColor Yellow
 pip install -t package reportlab==4.0.7 Pillow==10.1.0 --upgrade
 
 # Copy Lambda function to package
-Copy-Item lambda_function.py package/
+Copy-Item lambda_function.py, pdf_writer.py, report_ids.py, ratings.py, notes.py, fonts.py, photos.py, report_index.py, linearize.py package/
+# Devanagari TTF for Hindi/Marathi notes (see fonts.py)
+Copy-Item fonts package/ -Recurse -Force
 
 # Create ZIP file
 Write-Host "🗜️ Creating ZIP archive..." -ForegroundColor Yellow
@@ -19,8 +19,10 @@ else
 fi
 
 # Copy Lambda function to package
-echo "📄 Copying lambda_function.py..."
-cp lambda_function.py package/
+echo "📄 Copying Lambda sources..."
+cp lambda_function.py pdf_writer.py report_ids.py ratings.py notes.py fonts.py photos.py report_index.py linearize.py package/
+# Devanagari TTF for Hindi/Marathi notes (see fonts.py)
+cp -r fonts package/
 
 # Create ZIP file
 echo "🗜️ Creating ZIP archive..."
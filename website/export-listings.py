@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Count, Summarize or Export Car Listings from DynamoDB
+This script reads the whole CarListings table with a parallel segmented scan (Segment/TotalSegments,
+one thread per segment) and prints the listing count and a status histogram. With --output it also
+writes every listing as JSON Lines (plain listing JSON, .gz ok).
+
+Usage: python export-listings.py [--table CarListings] [--region us-east-1] [--segments 8]
+                                 [--workers N] [--output listings.jsonl] [--count-only]
+                                 [--endpoint-url http://localhost:8000]
+"""
+
+import argparse
+import gzip
+import sys
+
+import boto3
+
+from listing_tools.scan import ParallelScan
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Count and export car listings with a parallel scan')
+    parser.add_argument('--table', default='CarListings')
+    parser.add_argument('--region', default='us-east-1')
+    parser.add_argument('--segments', type=int, default=8, help='scan segments (1 = serial scan)')
+    parser.add_argument('--workers', type=int, help='scan threads (default: one per segment)')
+    parser.add_argument('--output', help='write every listing to this JSON Lines file (.gz ok)')
+    parser.add_argument('--count-only', action='store_true', help='Select=COUNT only, no histogram')
+    parser.add_argument('--endpoint-url', help='e.g. http://localhost:8000 for DynamoDB Local')
+    return parser.parse_args()
+
+def print_summary(summary, segments):
+    print(f"✅ {summary.count} listings in {summary.elapsed:.1f}s "
+          f"({summary.items_per_second:.0f} items/s, {summary.pages} pages, {segments} segments, {summary.retries} retries)")
+    if summary.statuses:
+        print("\n📊 By status:")
+        for status, count in summary.statuses.most_common():
+            print(f"   {status:12} {count:>8}")
+
+def main():
+    args = parse_args()
+    client = boto3.client('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+    scan = ParallelScan(client, args.table, segments=args.segments, workers=args.workers)
+
+    print(f"🔍 Scanning {args.table} ({args.segments} segments)...")
+    print("=" * 60)
+    try:
+        if args.output:
+            opener = gzip.open if args.output.endswith('.gz') else open
+            with opener(args.output, 'wt', encoding='utf-8') as out:
+                summary = scan.export(out)
+            print(f"💾 Exported to {args.output}")
+        elif args.count_only:
+            summary = scan.count()
+        else:
+            summary = scan.summarize()
+    except Exception as e:
+        print(f"❌ Scan failed: {e}")
+        sys.exit(1)
+
+    print_summary(summary, args.segments)
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+Build-time image tools for the static site
+- derivatives: responsive WebP/JPEG widths of site images with a srcset manifest
+
+Pillow comes from the environment; build-images.py falls back to the copy
+vendored with the report Lambda (amplify/functions/generate-report/src/package).
+"""
@@ -0,0 +1,212 @@
+"""
+Responsive derivatives of the site's images
+
+DerivativeBuilder turns every photo and banner under the source folders
+into the widths in WIDTHS (never wider than the original) as WebP and as
+a fallback: JPEG, or PNG for images with transparency. Each image is
+decoded once (JPEG with draft mode straight at the largest size needed),
+turned upright from its EXIF orientation, and resized per width. Images
+are independent, so they are built in a process pool, one image per task.
+
+The manifest (manifest.json in the output folder) maps each original to
+its size, content hash and derivatives, with ready srcset strings:
+
+    "Images/Car-1.jpg": {
+        "hash": "9f2c...", "width": 4032, "height": 3024, "fallback": "jpeg",
+        "derivatives": {"webp": [{"path": "Images/responsive/car-1-480.9f2c41d0.webp",
+                                  "width": 480, "height": 360, "bytes": 21504}, ...], "jpeg": [...]},
+        "srcset": {"webp": "/Images/responsive/car-1-480.9f2c41d0.webp 480w, ...", "jpeg": "..."}
+    }
+
+Derivative names carry the source hash, so they can be cached forever. A
+source whose hash and build settings match the manifest, with its files
+in place, is skipped; derivatives nothing refers to any more are removed.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+WIDTHS = (480, 768, 1280, 1920)
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.avif')
+WEBP_OPTIONS = {'quality': 80, 'method': 4}
+JPEG_OPTIONS = {'quality': 82, 'optimize': True, 'progressive': True}
+PNG_OPTIONS = {'optimize': True}
+MANIFEST = 'manifest.json'
+_ORIENTATION = 0x0112
+_SWAPS_AXES = (5, 6, 7, 8)
+
+
+def settings_key(widths):
+    """Changes whenever derivatives built with these settings would differ"""
+    settings = [list(widths), WEBP_OPTIONS, JPEG_OPTIONS, PNG_OPTIONS]
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def slug(name):
+    """'images (1).jpeg' -> 'images-1'"""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return re.sub(r'[^a-z0-9]+', '-', stem.lower()).strip('-') or 'image'
+
+
+def target_widths(width, widths=WIDTHS):
+    """The widths below the original, plus the original (or the largest width) itself"""
+    sizes = [w for w in widths if w < width]
+    if width <= widths[-1]:
+        sizes.append(width)
+    return sizes
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def build_image(source, rel, out_dir, out_rel, digest, widths=WIDTHS, draft=True):
+    """Derivatives of one image file; returns its manifest entry (runs in the worker processes)"""
+    with Image.open(source) as image:
+        orientation = image.getexif().get(_ORIENTATION, 1)
+        stored_width, stored_height = image.size
+        width, height = (stored_height, stored_width) if orientation in _SWAPS_AXES else image.size
+        sizes = target_widths(width, widths)
+        if draft and image.format == 'JPEG':
+            scale = sizes[-1] / width
+            image.draft('RGB', (int(stored_width * scale + 1), int(stored_height * scale + 1)))
+        alpha = _has_alpha(image)
+        image = ImageOps.exif_transpose(image).convert('RGBA' if alpha else 'RGB')
+    fallback = 'png' if alpha else 'jpeg'
+    name = slug(rel)
+    derivatives = {'webp': [], fallback: []}
+    for w in reversed(sizes):
+        h = max(1, round(height * w / width))
+        frame = image if image.size == (w, h) else image.resize((w, h), Image.LANCZOS, reducing_gap=3.0)
+        for fmt, options in (('webp', WEBP_OPTIONS), (fallback, PNG_OPTIONS if alpha else JPEG_OPTIONS)):
+            buffer = io.BytesIO()
+            frame.save(buffer, fmt.upper(), **options)
+            path = f"{out_rel}/{name}-{w}.{digest[:8]}.{'jpg' if fmt == 'jpeg' else fmt}"
+            with open(os.path.join(out_dir, os.path.basename(path)), 'wb') as f:
+                f.write(buffer.getvalue())
+            derivatives[fmt].insert(0, {'path': path, 'width': w, 'height': h, 'bytes': buffer.tell()})
+    return {
+        'hash': digest,
+        'settings': settings_key(widths),
+        'width': width,
+        'height': height,
+        'bytes': os.path.getsize(source),
+        'fallback': fallback,
+        'derivatives': derivatives,
+        'srcset': {fmt: ', '.join(f"/{d['path']} {d['width']}w" for d in files) for fmt, files in derivatives.items()},
+    }
+
+
+class BuildStats:
+    """What one build() did"""
+
+    def __init__(self):
+        self.built = []
+        self.skipped = 0
+        self.removed = 0
+        self.errors = []
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+
+class DerivativeBuilder:
+    """Builds and tracks the derivatives of the images under `root`/sources into `root`/out"""
+
+    def __init__(self, root, sources=('Images', 'img'), out='Images/responsive', widths=WIDTHS,
+                 workers=None, draft=True):
+        self.root = root
+        self.sources = sources
+        self.out = out.strip('/')
+        self.out_dir = os.path.join(root, self.out)
+        self.widths = tuple(sorted(widths))
+        self.workers = workers or os.cpu_count() or 1
+        self.draft = draft
+        self.manifest_path = os.path.join(self.out_dir, MANIFEST)
+
+    def source_files(self):
+        """Relative paths of the source images, sorted"""
+        found = []
+        for folder in self.sources:
+            for name in sorted(os.listdir(os.path.join(self.root, folder))):
+                rel = f'{folder}/{name}'
+                if name.lower().endswith(SOURCE_EXTENSIONS) and not rel.startswith(self.out + '/'):
+                    found.append(rel)
+        return found
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _current(self, entry, digest):
+        if not entry or entry['hash'] != digest or entry['settings'] != settings_key(self.widths):
+            return False
+        return all(os.path.exists(os.path.join(self.root, d['path']))
+                   for files in entry['derivatives'].values() for d in files)
+
+    def build(self):
+        """Bring the derivatives and the manifest up to date; returns BuildStats"""
+        stats = BuildStats()
+        os.makedirs(self.out_dir, exist_ok=True)
+        previous = self.load_manifest()
+        manifest = {}
+        todo = []
+        for rel in self.source_files():
+            with open(os.path.join(self.root, rel), 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if self._current(previous.get(rel), digest):
+                manifest[rel] = previous[rel]
+                stats.skipped += 1
+            else:
+                todo.append((os.path.join(self.root, rel), rel, self.out_dir, self.out, digest, self.widths, self.draft))
+
+        for rel, entry in self._run(todo):
+            if isinstance(entry, Exception):
+                stats.errors.append(f'{rel}: {entry}')
+            else:
+                manifest[rel] = entry
+                stats.built.append(rel)
+
+        keep = {os.path.basename(d['path']) for entry in manifest.values()
+                for files in entry['derivatives'].values() for d in files}
+        for name in os.listdir(self.out_dir):
+            if name != MANIFEST and name not in keep:
+                os.remove(os.path.join(self.out_dir, name))
+                stats.removed += 1
+        with open(self.manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(manifest.items())), f, indent=2)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+        stats.finished = time.monotonic()
+        return stats
+
+    def _run(self, todo):
+        """(rel, manifest entry or the exception) per task, from a process pool unless workers=1"""
+        if self.workers == 1 or len(todo) < 2:
+            for task in todo:
+                yield task[1], _attempt(task)
+            return
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(todo))) as pool:
+            # biggest files first, so one large photo does not finish last on its own
+            todo = sorted(todo, key=lambda task: os.path.getsize(task[0]), reverse=True)
+            for task, entry in zip(todo, pool.map(_attempt, todo)):
+                yield task[1], entry
+
+
+def _attempt(task):
+    try:
+        return build_image(*task)
+    except (OSError, UnidentifiedImageError, ValueError) as e:
+        return e
@@ -0,0 +1,15 @@
+"""
+Tools for bulk work on the CarListings DynamoDB table
+- bulk_loader: BatchWriteItem loader with writer threads and retries
+- checkpoint: content hashes and resume state for idempotent imports
+- marshalling: Python <-> DynamoDB attribute values, compiled per schema
+- listings: the listing schema and its compiled converters
+- ingest: streaming reader for JSON array / JSON Lines listing feeds
+- scan: parallel segmented Scan for counts, status histograms and exports
+- snapshot: static, paginated public listings feed with a make/price index
+- local_dynamo: in-process DynamoDB stand-in for tests and benchmarks
+
+The modules take a low-level DynamoDB client (boto3.client('dynamodb'),
+pointed at DynamoDB Local with endpoint_url, or LocalDynamoDB) and items
+in DynamoDB attribute-value format.
+"""
@@ -0,0 +1,235 @@
+"""
+Bulk loader for DynamoDB tables
+
+Items are grouped into BatchWriteItem calls of up to 25 puts and written
+by a pool of threads. Anything DynamoDB hands back as UnprocessedItems, and
+whole batches rejected by throttling, are retried with exponential backoff
+and full jitter. The input is consumed as it is written: at most
+`workers * 2` batches wait in the queue, so a generator over a huge feed
+never sits in memory.
+
+With `condition`, each item is written with its own PutItem and the
+condition expression condition(item) returns (BatchWriteItem takes no
+conditions); an item whose condition fails is counted as skipped, the
+table already holding what it should. on_done(items) gets, per batch, the
+items the table now holds, for checkpointing. A write that raises anything
+else (a bad item, a bug in condition) counts the items it had not written
+as failed, with the error; an exception from on_done or on_batch is only
+recorded in errors, the items having been written. Either way the workers
+carry on with the rest.
+
+    loader = BulkLoader(boto3.client('dynamodb'), 'CarListings')
+    stats = loader.load(items)
+    print(f"{stats.written} written, {stats.items_per_second:.0f} items/s")
+"""
+
+import queue
+import random
+import threading
+import time
+from botocore.exceptions import BotoCoreError, ClientError
+
+BATCH_SIZE = 25                 # BatchWriteItem limit
+RETRYABLE_ERRORS = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable',
+}
+
+
+def _describe(error):
+    return f'{type(error).__name__}: {error}'
+
+
+class LoadStats:
+    """Counters for one load() run, safe to update from the writer threads"""
+
+    def __init__(self):
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+        self.batches = 0
+        self.retries = 0
+        self.errors = []
+        self.started = time.monotonic()
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def add(self, written=0, skipped=0, failed=0, batches=0, retries=0, error=None):
+        with self._lock:
+            self.written += written
+            self.skipped += skipped
+            self.failed += failed
+            self.batches += batches
+            self.retries += retries
+            if error and len(self.errors) < 20:
+                self.errors.append(error)
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def items_per_second(self):
+        return self.written / self.elapsed if self.elapsed else 0.0
+
+
+class BulkLoader:
+    """Writes items to one table with BatchWriteItem from several threads
+
+    key_names are the table's key attributes. A batch may not put the same
+    key twice, so a repeated key closes the current batch early (the later
+    item wins, as with sequential puts).
+    """
+
+    def __init__(self, client, table, workers=4, key_names=('listingId',), batch_size=BATCH_SIZE,
+                 max_attempts=8, base_delay=0.05, max_delay=5.0, on_batch=None, condition=None, on_done=None):
+        if not 1 <= batch_size <= BATCH_SIZE:
+            raise ValueError(f'batch_size must be 1-{BATCH_SIZE}, got {batch_size}')
+        self.client = client
+        self.table = table
+        self.workers = max(1, workers)
+        self.key_names = tuple(key_names)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_batch = on_batch
+        self.condition = condition
+        self.on_done = on_done
+
+    def load(self, items):
+        """Write every item; returns LoadStats once all batches are done"""
+        stats = LoadStats()
+        batches = queue.Queue(maxsize=self.workers * 2)
+        threads = [threading.Thread(target=self._worker, args=(batches, stats), daemon=True)
+                   for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            for batch in self.batches(items):
+                batches.put(batch)
+        finally:
+            for _ in threads:
+                batches.put(None)
+            for thread in threads:
+                thread.join()
+            stats.finished = time.monotonic()
+        return stats
+
+    def batches(self, items):
+        """Group items into put-request lists without repeating a key"""
+        batch = []
+        keys = set()
+        for item in items:
+            key = self._key(item)
+            if len(batch) == self.batch_size or key in keys:
+                yield batch
+                batch = []
+                keys = set()
+            batch.append({'PutRequest': {'Item': item}})
+            keys.add(key)
+        if batch:
+            yield batch
+
+    def _key(self, item):
+        try:
+            return tuple(repr(item[name]) for name in self.key_names)
+        except KeyError as e:
+            raise ValueError(f'item is missing key attribute {e}') from None
+
+    def _worker(self, batches, stats):
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            # a worker that died here would leave load() blocked on the full queue
+            try:
+                if self.condition:
+                    done = [request['PutRequest']['Item'] for request in batch
+                            if self.put_conditional(request['PutRequest']['Item'], stats)]
+                    stats.add(batches=1)
+                else:
+                    done = self.write_batch(batch, stats)
+            except Exception as e:
+                # write_batch and put_conditional count their own failures; this is the backstop
+                stats.add(failed=len(batch), batches=1, error=_describe(e))
+                continue
+            try:
+                if self.on_done and done:
+                    self.on_done(done)
+                if self.on_batch:
+                    self.on_batch(stats)
+            except Exception as e:
+                stats.add(error=f'callback: {_describe(e)}')
+
+    def write_batch(self, requests, stats):
+        """Write one batch, retrying unprocessed items; failures are counted, not raised
+
+        Returns the items that were written.
+        """
+        batch = requests
+        retries = 0
+        for attempt in range(self.max_attempts):
+            if attempt:
+                retries += 1
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+            try:
+                response = self.client.batch_write_item(RequestItems={self.table: requests})
+                unprocessed = response.get('UnprocessedItems', {}).get(self.table, [])
+            except ClientError as e:
+                code = e.response.get('Error', {}).get('Code', '')
+                if code in RETRYABLE_ERRORS:
+                    continue
+                stats.add(failed=len(requests), batches=1, retries=retries, error=str(e))
+                return self._written(batch, requests)
+            except BotoCoreError:
+                continue        # connection reset, read timeout, ...
+            except Exception as e:
+                stats.add(failed=len(requests), batches=1, retries=retries, error=_describe(e))
+                return self._written(batch, requests)
+            stats.add(written=len(requests) - len(unprocessed))
+            requests = unprocessed
+            if not requests:
+                stats.add(batches=1, retries=retries)
+                return self._written(batch, requests)
+        stats.add(failed=len(requests), batches=1, retries=retries,
+                  error=f'{len(requests)} items still unprocessed after {self.max_attempts} attempts')
+        return self._written(batch, requests)
+
+    def _written(self, batch, failed):
+        if not failed:
+            return [request['PutRequest']['Item'] for request in batch]
+        # UnprocessedItems are copies, so match them by key
+        failed = {self._key(request['PutRequest']['Item']) for request in failed}
+        return [request['PutRequest']['Item'] for request in batch
+                if self._key(request['PutRequest']['Item']) not in failed]
+
+    def put_conditional(self, item, stats):
+        """PutItem with condition(item); True if the table now holds the item (written or condition failed)"""
+        for attempt in range(self.max_attempts):
+            if attempt:
+                stats.add(retries=1)
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+            try:
+                self.client.put_item(TableName=self.table, Item=item, **self.condition(item))
+            except ClientError as e:
+                code = e.response.get('Error', {}).get('Code', '')
+                if code == 'ConditionalCheckFailedException':
+                    stats.add(skipped=1)
+                    return True
+                if code in RETRYABLE_ERRORS:
+                    continue
+                stats.add(failed=1, error=str(e))
+                return False
+            except BotoCoreError:
+                continue
+            except Exception as e:
+                stats.add(failed=1, error=_describe(e))
+                return False
+            stats.add(written=1)
+            return True
+        stats.add(failed=1, error=f'item still throttled after {self.max_attempts} attempts')
+        return False
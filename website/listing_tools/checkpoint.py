@@ -0,0 +1,142 @@
+"""
+Checkpoints for resumable, idempotent listing imports
+
+ImportCheckpoint keeps a local JSON state file with
+- the content hash of every listing the table is known to hold, and
+- the committed offset: the feed row up to which every row has been
+  written, found unchanged or rejected.
+select() turns the feed's listings into the items that still need
+writing: rows at or below the offset of the same feed file are passed
+over, rows whose hash matches the state are skipped. committed() is
+BulkLoader's on_done; it records the hashes of what was written and moves
+the offset. The state is saved every `interval` seconds and by save(),
+atomically, so a run that dies loses at most one interval of progress.
+
+Items carry their hash as contentHash and changed_condition makes the
+loader put them only where the stored hash differs, so even without the
+state file (another machine, a deleted file) an unchanged listing and its
+updatedAt are never rewritten.
+
+    checkpoint = ImportCheckpoint('feed.jsonl.import-state.json', 'feed.jsonl')
+    checkpoint.load()
+    loader = BulkLoader(client, 'CarListings', condition=changed_condition, on_done=checkpoint.committed)
+    stats = loader.load(checkpoint.select(listings))
+    checkpoint.save()
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from listing_tools.listings import marshal_listing
+from listing_tools.marshalling import json_default
+
+HASH_ATTRIBUTE = 'contentHash'
+UNHASHED_FIELDS = ('updatedAt', HASH_ATTRIBUTE)
+CONDITION = 'attribute_not_exists(#h) OR #h <> :h'
+
+
+def content_hash(listing):
+    """Hash of everything in the listing except updatedAt, as 16 hex digits"""
+    content = {name: value for name, value in listing.items() if name not in UNHASHED_FIELDS}
+    text = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=json_default)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def changed_condition(item):
+    """BulkLoader condition: put only if the table's copy has another contentHash, or none"""
+    return {
+        'ConditionExpression': CONDITION,
+        'ExpressionAttributeNames': {'#h': HASH_ATTRIBUTE},
+        'ExpressionAttributeValues': {':h': item[HASH_ATTRIBUTE]},
+    }
+
+
+def _feed_identity(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+
+class ImportCheckpoint:
+    """What earlier runs of an import got into the table, and where they stopped"""
+
+    def __init__(self, path, feed_path, interval=5.0):
+        self.path = path
+        self.feed = _feed_identity(feed_path)
+        self.interval = interval
+        self.hashes = {}
+        self.offset = 0
+        self.resumed = 0            # rows passed over because of the offset
+        self.unchanged = 0          # rows skipped because of their hash
+        self._pending = {}          # id(item) -> (row, listingId, hash) until it is written
+        self._settled = set()       # rows past the offset that are done
+        self._saved = time.monotonic()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def load(self):
+        """Read the state file; False if there is none. The offset only counts for the same feed file"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        self.hashes = state.get('hashes', {})
+        self.offset = state.get('offset', 0) if state.get('feed') == self.feed else 0
+        return True
+
+    def select(self, listings):
+        """Items (stamped with contentHash) for the rows that need writing
+
+        listings are the feed's rows in order, None for a row that was
+        rejected (it still counts towards the offset).
+        """
+        for row, listing in enumerate(listings, 1):
+            if row <= self.offset:
+                self.resumed += 1
+                continue
+            if listing is None:
+                self._settle([row])
+                continue
+            digest = content_hash(listing)
+            if self.hashes.get(listing['listingId']) == digest:
+                self.unchanged += 1
+                self._settle([row])
+                continue
+            item = marshal_listing(dict(listing, **{HASH_ATTRIBUTE: digest}))
+            with self._lock:
+                self._pending[id(item)] = (row, listing['listingId'], digest)
+            yield item
+
+    def committed(self, items):
+        """BulkLoader on_done: the table holds these items now"""
+        rows = []
+        with self._lock:
+            for item in items:
+                row, listing_id, digest = self._pending.pop(id(item))
+                self.hashes[listing_id] = digest
+                rows.append(row)
+        self._settle(rows)
+        if time.monotonic() - self._saved >= self.interval:
+            self.save()
+
+    def _settle(self, rows):
+        with self._lock:
+            self._settled.update(rows)
+            while self.offset + 1 in self._settled:
+                self._settled.remove(self.offset + 1)
+                self.offset += 1
+
+    def save(self):
+        """Write the state file atomically"""
+        with self._lock:
+            self._saved = time.monotonic()
+            text = json.dumps({'feed': self.feed, 'offset': self.offset, 'hashes': self.hashes},
+                              separators=(',', ':'))
+        with self._save_lock:
+            temporary = self.path + '.tmp'
+            with open(temporary, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temporary, self.path)
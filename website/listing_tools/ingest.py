@@ -0,0 +1,198 @@
+"""
+Streaming reader for listing feeds
+
+Dealer feeds can hold hundreds of thousands of listings, so nothing here
+loads a whole file: FeedReader yields one row at a time from
+- a JSON array ([{...}, {...}]), parsed incrementally with raw_decode over
+  a sliding buffer, or
+- JSON Lines (one listing per line),
+optionally gzip-compressed (.gz), telling the two apart by the first
+character. Memory stays at one read buffer plus the largest listing,
+whatever the file size. Rows are (row number, listing, problems); a row
+with problems (see validate_listing) should be skipped and reported.
+
+IngestProgress prints real totals, throughput and an ETA worked out from
+how far into the file the reader is.
+"""
+
+import gzip
+import io
+import json
+import os
+import threading
+import time
+
+CHUNK_SIZE = 1 << 16
+MAX_ITEM_SIZE = 16 << 20        # a listing is a few KB; more means a broken file
+REQUIRED_FIELDS = ['listingId', 'status']
+REQUIRED_CAR_FIELDS = ['make', 'model', 'registrationYear', 'kmsDriven', 'expectedPrice']
+_WHITESPACE = ' \t\r\n'
+
+
+def validate_listing(listing):
+    """Problems that would stop the listing from being stored or shown; [] if none"""
+    if not isinstance(listing, dict):
+        return [f'expected an object, got {type(listing).__name__}']
+    problems = [f'missing {name}' for name in REQUIRED_FIELDS if not listing.get(name)]
+    if 'listingId' in listing and not isinstance(listing['listingId'], str):
+        problems.append('listingId must be a string')
+    car = listing.get('car')
+    if not isinstance(car, dict):
+        problems.append('missing car')
+    else:
+        problems += [f'missing car.{name}' for name in REQUIRED_CAR_FIELDS if car.get(name) in (None, '')]
+    photos = listing.get('photos')
+    if photos is not None and not isinstance(photos, dict):
+        problems.append('photos must be an object of slots')
+    elif photos:
+        # Any slot name: customer-listings stores document slots (rcDocument)
+        # next to the photo ones, and the photos MapOf takes whatever comes
+        problems += [f'photo slot {slot!r} must be a string' for slot in photos if not isinstance(slot, str)]
+    return problems
+
+
+class FeedReader:
+    """Rows of a listing feed file; position/size tell how far reading has got"""
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.raw = open(path, 'rb')
+        self.size = os.fstat(self.raw.fileno()).st_size
+        binary = gzip.GzipFile(fileobj=self.raw) if path.endswith('.gz') else self.raw
+        self.text = io.TextIOWrapper(binary, encoding='utf-8')
+        self.rows = 0
+        self.invalid = 0
+
+    @property
+    def position(self):
+        """Bytes of the file read so far (compressed bytes for .gz)"""
+        return self.raw.tell()
+
+    def close(self):
+        self.text.close()
+        self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        first = self.text.read(self.chunk_size)
+        start = len(first) - len(first.lstrip(_WHITESPACE))
+        if first[start:start + 1] == '[':
+            values = iter_json_array(self.text, first, start + 1, self.chunk_size)
+        else:
+            values = iter_json_lines(self.text, first)
+        for number, value, error in values:
+            self.rows += 1
+            problems = [error] if error else validate_listing(value)
+            if problems:
+                self.invalid += 1
+            yield number, value, problems
+
+
+def iter_json_array(fp, buf, pos, chunk_size=CHUNK_SIZE):
+    """(index, value, None) for the items of a JSON array whose '[' ends at buf[pos - 1]"""
+    decoder = json.JSONDecoder()
+    eof = False
+    index = 0
+    expect_item = True
+
+    def refill(pos, want):
+        nonlocal buf, eof
+        chunk = fp.read(max(chunk_size, want))
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        return 0
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError('unexpected end of JSON array')
+            pos = refill(pos, 0)
+            continue
+        char = buf[pos]
+        if char == ']':
+            if expect_item and index:
+                raise ValueError('trailing comma in JSON array')
+            return
+        if not expect_item:
+            if char != ',':
+                raise ValueError(f'expected , or ] in JSON array, got {char!r}')
+            pos += 1
+            expect_item = True
+            continue
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # usually an item cut off by the end of the buffer
+            if eof or len(buf) - pos > MAX_ITEM_SIZE:
+                raise
+            pos = refill(pos, len(buf) - pos)      # grow geometrically for huge items
+            continue
+        if end == len(buf) and not eof:
+            pos = refill(pos, 0)                    # a number could continue in the next chunk
+            continue
+        index += 1
+        yield index, value, None
+        pos = end
+        expect_item = False
+        if pos > chunk_size:
+            buf = buf[pos:]
+            pos = 0
+
+
+def iter_json_lines(fp, first=''):
+    """(line number, value, error) per non-blank line; error is None unless the line is not JSON"""
+    lines = fp if not first else _prepend(first, fp)
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, None, f'invalid JSON: {e}'
+            continue
+        yield number, value, None
+
+
+def _prepend(first, fp):
+    """Lines of `first` followed by the rest of fp"""
+    rest = fp.readline() if not first.endswith('\n') else ''
+    yield from io.StringIO(first + rest)
+    yield from fp
+
+
+class IngestProgress:
+    """Throttled one-line progress: rows read, written, rate and ETA"""
+
+    def __init__(self, reader, interval=1.0, out=print):
+        self.reader = reader
+        self.interval = interval
+        self.out = out
+        self.started = time.monotonic()
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def line(self, written, failed):
+        elapsed = time.monotonic() - self.started
+        rate = written / elapsed if elapsed else 0.0
+        done = self.reader.position / self.reader.size if self.reader.size else 1.0
+        eta = elapsed * (1 - done) / done if done else 0.0
+        return (f"{self.reader.rows} read, {written} written, {failed} failed, "
+                f"{self.reader.invalid} invalid | {rate:.0f} items/s | {done:.0%} ETA {eta:.0f}s")
+
+    def __call__(self, stats):
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return
+        with self._lock:
+            if now - self._last < self.interval:
+                return
+            self._last = now
+        self.out(self.line(stats.written, stats.failed))
@@ -0,0 +1,52 @@
+"""
+The car listing record, as stored in the CarListings table
+
+LISTING_SCHEMA mirrors SEED_CAR_LISTINGS.json and what the customer-listings
+Lambda writes (top-level seller fields, photo slots with key/url/contentType,
+notes), plus the contentHash the importer stamps (see checkpoint). Photos
+are a MapOf, so new slots need no change here, and fields outside the
+schema still convert, just through the generic path.
+"""
+
+from listing_tools.marshalling import MapOf, compile_marshaller, compile_unmarshaller
+
+PHOTO_SLOTS = ['exteriorFront', 'exteriorBack', 'exteriorLeft', 'exteriorRight', 'interiorSeat', 'interiorCluster']
+
+PHOTO_SCHEMA = {
+    'key': str,
+    'url': str,
+    'contentType': str,
+    'originalName': str,
+    'uploadedAt': str,
+}
+
+LISTING_SCHEMA = {
+    'listingId': str,
+    'submissionId': str,
+    'status': str,
+    'isPlaceholder': bool,
+    'createdAt': str,
+    'updatedAt': str,
+    'sellerName': str,
+    'sellerEmail': str,
+    'sellerMobile': str,
+    'seller': {
+        'name': str,
+        'mobile': str,
+        'email': str,
+    },
+    'car': {
+        'make': str,
+        'model': str,
+        'edition': str,
+        'registrationYear': str,
+        'kmsDriven': str,
+        'expectedPrice': str,
+    },
+    'photos': MapOf(PHOTO_SCHEMA),
+    'notes': str,
+    'contentHash': str,
+}
+
+marshal_listing = compile_marshaller(LISTING_SCHEMA, 'marshal_listing')
+unmarshal_listing = compile_unmarshaller(LISTING_SCHEMA, 'unmarshal_listing')
@@ -0,0 +1,255 @@
+"""
+In-process stand-in for the DynamoDB client
+
+LocalDynamoDB answers the subset of boto3.client('dynamodb') calls the
+listing tools make, on plain dicts, so the tools can be exercised and
+benchmarked without AWS or DynamoDB Local. It can add a fixed latency per
+call (a sleep, which releases the GIL like a network round trip does) and
+a provisioned write capacity: puts beyond it come back as UnprocessedItems,
+as DynamoDB does when a table is throttled. Scans page like DynamoDB's
+(SCAN_PAGE_ITEMS per call) and split the table into Segment/TotalSegments
+by a hash of the key. put_item takes a ConditionExpression made of
+attribute_exists / attribute_not_exists, comparisons, AND, OR, NOT and
+parentheses.
+
+Errors are botocore ClientErrors with DynamoDB's error codes.
+"""
+
+import re
+import threading
+import time
+import zlib
+from botocore.exceptions import ClientError
+
+BATCH_WRITE_LIMIT = 25
+SCAN_PAGE_ITEMS = 1000          # stands in for DynamoDB's 1 MB page limit (listings are ~1 KB)
+_TOKEN = re.compile(r'\s*(<>|<=|>=|[=<>(),]|[#:]?[A-Za-z_][\w.]*)')
+
+
+def _error(operation, code, message):
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+
+def _condition_holds(expression, item, names, values):
+    """Evaluate a ConditionExpression against item (None: no item yet)"""
+    tokens = []
+    pos = 0
+    while pos < len(expression.rstrip()):
+        match = _TOKEN.match(expression, pos)
+        if not match:
+            raise ValueError(f'cannot parse condition at {expression[pos:]!r}')
+        tokens.append(match.group(1))
+        pos = match.end()
+    tokens.append(None)
+    item = item or {}
+    at = 0
+
+    def take(expected=None):
+        nonlocal at
+        token = tokens[at]
+        if expected and (token or '').upper() != expected:
+            raise ValueError(f'expected {expected} in condition, got {token!r}')
+        at += 1
+        return token
+
+    def operand():
+        token = take()
+        if token.startswith(':'):
+            return values[token]
+        return item.get(names.get(token, token))
+
+    def either():
+        result = both()
+        while (tokens[at] or '').upper() == 'OR':
+            take()
+            result = both() or result
+        return result
+
+    def both():
+        result = single()
+        while (tokens[at] or '').upper() == 'AND':
+            take()
+            result = single() and result
+        return result
+
+    def single():
+        token = (tokens[at] or '').upper()
+        if token == 'NOT':
+            take()
+            return not single()
+        if token == '(':
+            take()
+            result = either()
+            take(')')
+            return result
+        if token in ('ATTRIBUTE_EXISTS', 'ATTRIBUTE_NOT_EXISTS'):
+            take()
+            take('(')
+            present = operand() is not None
+            take(')')
+            return present if token == 'ATTRIBUTE_EXISTS' else not present
+        left, op, right = operand(), take(), operand()
+        if left is None or right is None:
+            return False        # comparisons with a missing attribute are false, <> included
+        if op == '=':
+            return left == right
+        if op == '<>':
+            return left != right
+        (ltag, lvalue), (rtag, rvalue) = next(iter(left.items())), next(iter(right.items()))
+        if ltag != rtag or ltag not in ('S', 'N', 'B'):
+            return False
+        if ltag == 'N':
+            lvalue, rvalue = float(lvalue), float(rvalue)
+        return {'<': lvalue < rvalue, '<=': lvalue <= rvalue, '>': lvalue > rvalue, '>=': lvalue >= rvalue}[op]
+
+    result = either()
+    if tokens[at] is not None:
+        raise ValueError(f'unexpected {tokens[at]!r} in condition')
+    return result
+
+
+class LocalDynamoDB:
+    """Tables of items in DynamoDB attribute-value format, keyed by their key attributes
+
+    tables maps table name to its key attribute names, e.g.
+    {'CarListings': ('listingId',)}. write_capacity is items per second for
+    the whole client (None: unlimited).
+    """
+
+    def __init__(self, tables=None, latency=0.0, write_capacity=None):
+        self.key_names = dict(tables or {'CarListings': ('listingId',)})
+        self.tables = {name: {} for name in self.key_names}
+        self.latency = latency
+        self.write_capacity = write_capacity
+        self.calls = {}
+        self._versions = {name: 0 for name in self.key_names}
+        self._segments = {}
+        self._tokens = float(write_capacity or 0)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _call(self, operation):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _table(self, operation, name):
+        if name not in self.tables:
+            raise _error(operation, 'ResourceNotFoundException', f'Requested resource not found: Table: {name} not found')
+        return self.tables[name]
+
+    def _key(self, operation, table, item):
+        try:
+            return tuple(tuple(item[name].items())[0] for name in self.key_names[table])
+        except (KeyError, AttributeError, IndexError):
+            raise _error(operation, 'ValidationException',
+                         'One of the required keys was not given a value') from None
+
+    def _take_capacity(self, wanted):
+        """How many of `wanted` writes the capacity allows right now (call with the lock held)"""
+        if self.write_capacity is None:
+            return wanted
+        now = time.monotonic()
+        self._tokens = min(float(self.write_capacity), self._tokens + (now - self._refilled) * self.write_capacity)
+        self._refilled = now
+        granted = min(wanted, int(self._tokens))
+        self._tokens -= granted
+        return granted
+
+    def put_item(self, TableName, Item, ConditionExpression=None, ExpressionAttributeNames=None,
+                 ExpressionAttributeValues=None, **kwargs):
+        self._call('PutItem')
+        table = self._table('PutItem', TableName)
+        key = self._key('PutItem', TableName, Item)
+        with self._lock:
+            if ConditionExpression:
+                try:
+                    holds = _condition_holds(ConditionExpression, table.get(key), ExpressionAttributeNames or {},
+                                             ExpressionAttributeValues or {})
+                except (ValueError, KeyError) as e:
+                    raise _error('PutItem', 'ValidationException', f'Invalid ConditionExpression: {e}') from None
+                if not holds:
+                    raise _error('PutItem', 'ConditionalCheckFailedException', 'The conditional request failed')
+            if not self._take_capacity(1):
+                raise _error('PutItem', 'ProvisionedThroughputExceededException',
+                             'The level of configured provisioned throughput for the table was exceeded')
+            table[key] = Item
+            self._versions[TableName] += 1
+        return {}
+
+    def get_item(self, TableName, Key, **kwargs):
+        self._call('GetItem')
+        table = self._table('GetItem', TableName)
+        item = table.get(self._key('GetItem', TableName, Key))
+        return {'Item': item} if item is not None else {}
+
+    def batch_write_item(self, RequestItems, **kwargs):
+        self._call('BatchWriteItem')
+        count = sum(len(requests) for requests in RequestItems.values())
+        if not 1 <= count <= BATCH_WRITE_LIMIT:
+            raise _error('BatchWriteItem', 'ValidationException',
+                         f'Too many items requested for the BatchWriteItem call: {count}')
+        planned = []
+        for name, requests in RequestItems.items():
+            table = self._table('BatchWriteItem', name)
+            seen = set()
+            for request in requests:
+                put = request.get('PutRequest')
+                key = self._key('BatchWriteItem', name, put['Item'] if put else request['DeleteRequest']['Key'])
+                if key in seen:
+                    raise _error('BatchWriteItem', 'ValidationException',
+                                 'Provided list of item keys contains duplicates')
+                seen.add(key)
+                planned.append((name, table, key, put, request))
+        unprocessed = {}
+        with self._lock:
+            granted = self._take_capacity(len(planned))
+            for i, (name, table, key, put, request) in enumerate(planned):
+                if i >= granted:
+                    unprocessed.setdefault(name, []).append(request)
+                elif put:
+                    table[key] = put['Item']
+                else:
+                    table.pop(key, None)
+            if granted:
+                for name in RequestItems:
+                    self._versions[name] += 1
+        return {'UnprocessedItems': unprocessed}
+
+    def _segment_keys(self, table, segment, total):
+        """Keys of one scan segment in a stable order, cached until the table changes"""
+        with self._lock:
+            version = self._versions[table]
+            cached = self._segments.get((table, total))
+            if cached is None or cached[0] != version:
+                segments = [[] for _ in range(total)]
+                for key in self.tables[table]:
+                    segments[zlib.crc32(repr(key).encode()) % total].append(key)
+                cached = (version, [(keys, {k: i for i, k in enumerate(keys)}) for keys in segments])
+                self._segments[(table, total)] = cached
+        return cached[1][segment]
+
+    def scan(self, TableName, Segment=None, TotalSegments=None, ExclusiveStartKey=None, Limit=None,
+             Select=None, ProjectionExpression=None, ExpressionAttributeNames=None, **kwargs):
+        self._call('Scan')
+        table = self._table('Scan', TableName)
+        if (Segment is None) != (TotalSegments is None) or (TotalSegments is not None and not 0 <= Segment < TotalSegments):
+            raise _error('Scan', 'ValidationException', 'Segment must be in 0..TotalSegments-1, and both or neither given')
+        keys, index = self._segment_keys(TableName, Segment or 0, TotalSegments or 1)
+        start = 0
+        if ExclusiveStartKey is not None:
+            start = index[self._key('Scan', TableName, ExclusiveStartKey)] + 1
+        stop = min(len(keys), start + min(Limit or SCAN_PAGE_ITEMS, SCAN_PAGE_ITEMS))
+        page = [table[key] for key in keys[start:stop] if key in table]
+        response = {'Count': len(page), 'ScannedCount': len(page)}
+        if Select != 'COUNT':
+            if ProjectionExpression:
+                names = ExpressionAttributeNames or {}
+                wanted = [names.get(name.strip(), name.strip()) for name in ProjectionExpression.split(',')]
+                page = [{name: item[name] for name in wanted if name in item} for item in page]
+            response['Items'] = page
+        if stop < len(keys):
+            last = table[keys[stop - 1]]
+            response['LastEvaluatedKey'] = {name: last[name] for name in self.key_names[TableName]}
+        return response
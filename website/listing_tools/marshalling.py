@@ -0,0 +1,305 @@
+"""
+Python values <-> DynamoDB attribute values, compiled per schema
+
+to_attribute / from_attribute convert any value by inspecting it, like
+boto3's TypeSerializer. compile_marshaller / compile_unmarshaller take the
+expected shape of an item instead and generate a Python function for it
+once: fixed fields become straight-line code with the attribute tag known
+ahead, so converting a row is a few dict operations per field.
+
+Schemas:
+- str, bool, Number (int, float or Decimal), bytes, ANY: a single value
+- {'field': schema, ...}: a map with these fields
+- MapOf(schema): a map with any keys and values of one schema
+- ListOf(schema): a list of values of one schema
+- SetOf(str / Number / bytes): SS / NS / BS
+A compiled converter never rejects a row for not matching its schema:
+missing fields are left out, extra fields and values of an unexpected type
+go through to_attribute / from_attribute. Schemas only decide what is fast.
+
+Numbers come back as int when integral, otherwise as Decimal (DynamoDB
+numbers are decimal; a float is stored as its repr). None is NULL.
+"""
+
+import base64
+from collections.abc import Mapping
+from decimal import Decimal
+
+ANY = 'any'
+Number = 'number'
+_MISSING = object()
+_LEAF_TAGS = {str: 'S', bool: 'BOOL', bytes: 'B'}
+
+
+class MapOf:
+    """Map schema with arbitrary keys, e.g. photo slots"""
+
+    def __init__(self, values):
+        self.values = values
+
+
+class ListOf:
+    """List schema"""
+
+    def __init__(self, items):
+        self.items = items
+
+
+class SetOf:
+    """String, number or binary set schema"""
+
+    def __init__(self, kind):
+        if kind not in (str, Number, bytes):
+            raise ValueError(f'sets hold str, Number or bytes, not {kind!r}')
+        self.kind = kind
+
+
+def _number(value):
+    if isinstance(value, float):
+        if value != value or value in (float('inf'), float('-inf')):
+            raise ValueError(f'DynamoDB numbers must be finite, got {value!r}')
+        return repr(value)
+    if isinstance(value, Decimal) and not value.is_finite():
+        raise ValueError(f'DynamoDB numbers must be finite, got {value!r}')
+    return str(value)
+
+
+def _parse_number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return Decimal(text)
+
+
+def to_attribute(value):
+    """DynamoDB attribute value for any supported Python value"""
+    cls = value.__class__
+    if cls is str:
+        return {'S': value}
+    if cls is bool:
+        return {'BOOL': value}
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, Mapping):
+        return {'M': {str(k): to_attribute(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {'L': [to_attribute(v) for v in value]}
+    if isinstance(value, str):
+        return {'S': str(value)}
+    if isinstance(value, bool):
+        return {'BOOL': bool(value)}
+    if isinstance(value, (int, float, Decimal)):
+        return {'N': _number(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {'B': bytes(value)}
+    if isinstance(value, (set, frozenset)):
+        if not value:
+            raise ValueError('DynamoDB sets cannot be empty')
+        if all(isinstance(v, str) for v in value):
+            return {'SS': sorted(value)}
+        if all(isinstance(v, (bytes, bytearray)) for v in value):
+            return {'BS': sorted(bytes(v) for v in value)}
+        if all(isinstance(v, (int, float, Decimal)) and not isinstance(v, bool) for v in value):
+            return {'NS': sorted(_number(v) for v in value)}
+        raise TypeError('set members must all be str, all numbers or all bytes')
+    raise TypeError(f'cannot store {cls.__name__} in DynamoDB')
+
+
+def from_attribute(attribute):
+    """Python value for a DynamoDB attribute value"""
+    (tag, value), = attribute.items()
+    if tag == 'S' or tag == 'BOOL':
+        return value
+    if tag == 'N':
+        return _parse_number(value)
+    if tag == 'M':
+        return {k: from_attribute(v) for k, v in value.items()}
+    if tag == 'L':
+        return [from_attribute(v) for v in value]
+    if tag == 'NULL':
+        return None
+    if tag == 'B':
+        return bytes(value)
+    if tag == 'SS':
+        return set(value)
+    if tag == 'NS':
+        return {_parse_number(v) for v in value}
+    if tag == 'BS':
+        return {bytes(v) for v in value}
+    raise ValueError(f'unknown DynamoDB type {tag!r}')
+
+
+def json_default(value):
+    """JSON for what DynamoDB has and JSON lacks: non-integral numbers, sets and binary"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode('ascii')
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class _Writer:
+    """Source of one generated function"""
+
+    def __init__(self):
+        self.lines = []
+        self.names = {}
+        self.counter = 0
+
+    def var(self, prefix):
+        self.counter += 1
+        return f'{prefix}{self.counter}'
+
+    def const(self, value):
+        name = f'_K{len(self.names)}'
+        self.names[name] = value
+        return name
+
+    def emit(self, indent, line):
+        self.lines.append('    ' * indent + line)
+
+    def build(self, name, arg):
+        source = f'def {name}({arg}):\n' + '\n'.join(self.lines) + '\n'
+        namespace = dict(self.names, _to=to_attribute, _from=from_attribute, _num=_parse_number,
+                         _MISSING=_MISSING)
+        exec(compile(source, f'<{name}>', 'exec'), namespace)
+        function = namespace[name]
+        function.source = source
+        return function
+
+
+def _marshal(w, schema, src, target, indent):
+    """Emit code setting target to the attribute value of src"""
+    if isinstance(schema, dict):
+        fields = w.var('m')
+        w.emit(indent, f'if {src}.__class__ is dict:')
+        _marshal_fields(w, schema, src, fields, indent + 1)
+        w.emit(indent + 1, f"{target} = {{'M': {fields}}}")
+        w.emit(indent, 'else:')
+        w.emit(indent + 1, f'{target} = _to({src})')
+    elif isinstance(schema, MapOf):
+        fields, key, value = w.var('m'), w.var('k'), w.var('x')
+        w.emit(indent, f'if {src}.__class__ is dict:')
+        w.emit(indent + 1, f'{fields} = {{}}')
+        w.emit(indent + 1, f'for {key}, {value} in {src}.items():')
+        _marshal(w, schema.values, value, f'{fields}[{key}]', indent + 2)
+        w.emit(indent + 1, f"{target} = {{'M': {fields}}}")
+        w.emit(indent, 'else:')
+        w.emit(indent + 1, f'{target} = _to({src})')
+    elif isinstance(schema, ListOf):
+        items, value, converted = w.var('l'), w.var('x'), w.var('v')
+        w.emit(indent, f'if {src}.__class__ is list:')
+        w.emit(indent + 1, f'{items} = []')
+        w.emit(indent + 1, f'for {value} in {src}:')
+        _marshal(w, schema.items, value, converted, indent + 2)
+        w.emit(indent + 2, f'{items}.append({converted})')
+        w.emit(indent + 1, f"{target} = {{'L': {items}}}")
+        w.emit(indent, 'else:')
+        w.emit(indent + 1, f'{target} = _to({src})')
+    elif schema in _LEAF_TAGS:
+        tag = _LEAF_TAGS[schema]
+        w.emit(indent, f"{target} = {{'{tag}': {src}}} if {src}.__class__ is {schema.__name__} else _to({src})")
+    elif schema == Number:
+        w.emit(indent, f"{target} = {{'N': str({src})}} if {src}.__class__ is int else _to({src})")
+    elif isinstance(schema, SetOf) or schema == ANY:
+        w.emit(indent, f'{target} = _to({src})')
+    else:
+        raise ValueError(f'unsupported schema {schema!r}')
+
+
+def _marshal_fields(w, schema, src, fields, indent):
+    """Emit code filling the dict `fields` from the fixed-field map src"""
+    hits = w.var('h')
+    w.emit(indent, f'{fields} = {{}}')
+    w.emit(indent, f'{hits} = 0')
+    for name, sub in schema.items():
+        value = w.var('x')
+        w.emit(indent, f'{value} = {src}.get({name!r}, _MISSING)')
+        w.emit(indent, f'if {value} is not _MISSING:')
+        w.emit(indent + 1, f'{hits} += 1')
+        _marshal(w, sub, value, f'{fields}[{name!r}]', indent + 1)
+    known, key = w.const(frozenset(schema)), w.var('k')
+    w.emit(indent, f'if {hits} != len({src}):')
+    w.emit(indent + 1, f'for {key} in {src}.keys() - {known}:')
+    w.emit(indent + 2, f'{fields}[{key}] = _to({src}[{key}])')
+
+
+def _unmarshal(w, schema, src, target, indent):
+    """Emit code setting target to the Python value of attribute src"""
+    if isinstance(schema, dict):
+        value = w.var('a')
+        w.emit(indent, f"{value} = {src}.get('M')")
+        w.emit(indent, f'if {value} is not None:')
+        _unmarshal_fields(w, schema, value, target, indent + 1)
+        w.emit(indent, 'else:')
+        w.emit(indent + 1, f'{target} = _from({src})')
+    elif isinstance(schema, (MapOf, ListOf)):
+        tag = 'M' if isinstance(schema, MapOf) else 'L'
+        inner = schema.values if tag == 'M' else schema.items
+        value, result, key, item = w.var('a'), w.var('r'), w.var('k'), w.var('x')
+        w.emit(indent, f"{value} = {src}.get('{tag}')")
+        w.emit(indent, f'if {value} is not None:')
+        if tag == 'M':
+            w.emit(indent + 1, f'{result} = {{}}')
+            w.emit(indent + 1, f'for {key}, {item} in {value}.items():')
+            _unmarshal(w, inner, item, f'{result}[{key}]', indent + 2)
+        else:
+            converted = w.var('v')
+            w.emit(indent + 1, f'{result} = []')
+            w.emit(indent + 1, f'for {item} in {value}:')
+            _unmarshal(w, inner, item, converted, indent + 2)
+            w.emit(indent + 2, f'{result}.append({converted})')
+        w.emit(indent + 1, f'{target} = {result}')
+        w.emit(indent, 'else:')
+        w.emit(indent + 1, f'{target} = _from({src})')
+    elif schema in _LEAF_TAGS and schema is not bytes:
+        tag = _LEAF_TAGS[schema]
+        w.emit(indent, f"{target} = {src}['{tag}'] if '{tag}' in {src} else _from({src})")
+    elif schema == Number:
+        w.emit(indent, f"{target} = _num({src}['N']) if 'N' in {src} else _from({src})")
+    elif schema is bytes or isinstance(schema, SetOf) or schema == ANY:
+        w.emit(indent, f'{target} = _from({src})')
+    else:
+        raise ValueError(f'unsupported schema {schema!r}')
+
+
+def _unmarshal_fields(w, schema, src, target, indent):
+    """Emit code setting target to the dict for the attribute map src"""
+    result, hits = w.var('r'), w.var('h')
+    w.emit(indent, f'{result} = {{}}')
+    w.emit(indent, f'{hits} = 0')
+    for name, sub in schema.items():
+        value = w.var('a')
+        w.emit(indent, f'{value} = {src}.get({name!r})')
+        w.emit(indent, f'if {value} is not None:')
+        w.emit(indent + 1, f'{hits} += 1')
+        _unmarshal(w, sub, value, f'{result}[{name!r}]', indent + 1)
+    known, key = w.const(frozenset(schema)), w.var('k')
+    w.emit(indent, f'if {hits} != len({src}):')
+    w.emit(indent + 1, f'for {key} in {src}.keys() - {known}:')
+    w.emit(indent + 2, f'{result}[{key}] = _from({src}[{key}])')
+    w.emit(indent, f'{target} = {result}')
+
+
+def compile_marshaller(schema, name='marshal'):
+    """Function turning a dict shaped like schema into a DynamoDB item"""
+    if not isinstance(schema, dict):
+        raise ValueError('an item schema is a dict of fields')
+    w = _Writer()
+    w.emit(1, 'if item.__class__ is not dict:')
+    w.emit(2, "return _to(item)['M']")
+    _marshal_fields(w, schema, 'item', 'out', 1)
+    w.emit(1, 'return out')
+    return w.build(name, 'item')
+
+
+def compile_unmarshaller(schema, name='unmarshal'):
+    """Function turning a DynamoDB item into a dict, the inverse of compile_marshaller"""
+    if not isinstance(schema, dict):
+        raise ValueError('an item schema is a dict of fields')
+    w = _Writer()
+    _unmarshal_fields(w, schema, 'item', 'out', 1)
+    w.emit(1, 'return out')
+    return w.build(name, 'item')
@@ -0,0 +1,327 @@
+"""
+Static snapshot of the public listings feed
+
+The marketplace page asks the customer-listings Lambda for listings, and
+every request scans the whole table. ListingsSnapshot builds the same
+answer ahead of time as plain files that S3 + CloudFront can serve:
+
+    manifest.json               count, page paths in order, index path (short cache)
+    pages/<hash>.json           {"ok": true, "items": [...]}
+    index.<hash>.json           per make: [listingId, price, page number]
+                                sorted by price; per price band: listingIds
+
+Items are exactly what sanitizeListingForPublic returns, for the statuses
+handleList shows, newest first. Page and index names carry a hash of their
+content, so they can be cached forever; a write skips files that already
+exist and removes files that neither this manifest nor the previous one
+refers to, so a client holding the old manifest still finds its pages.
+
+Pages end where the listingId hashes to a cut point (between half and
+twice page_size items, page_size on average) rather than every page_size
+items, so adding or dropping one listing changes the page it is on and
+not every page after it.
+
+rebuild() starts from a full scan (scan_listings). apply_changes() takes DynamoDB Streams
+records (NEW_IMAGE or NEW_AND_OLD_IMAGES) instead, so after a listing is
+approved or sold only the changed listings are read. The state (the
+listingIds on each page and the last sequence number applied per shard)
+is kept next to the output directory, not in it, so `aws s3 sync` of the
+directory only publishes the feed. The listings themselves are read back
+from the pages, which already hold them, so an incremental build does not
+encode every listing a second time.
+"""
+
+import hashlib
+import json
+import os
+import re
+import zlib
+
+from listing_tools.listings import PHOTO_SLOTS, unmarshal_listing
+from listing_tools.marshalling import json_default
+
+VISIBLE_STATUSES = {'approved', 'sold', 'soldout', 'sold-out', 'sold out', 'booked', 'reserved'}
+PAGE_SIZE = 24
+PRICE_BANDS = [                 # (name, from, below) in rupees
+    ('under-3l', 0, 300_000),
+    ('3l-5l', 300_000, 500_000),
+    ('5l-8l', 500_000, 800_000),
+    ('8l-15l', 800_000, 1_500_000),
+    ('15l-plus', 1_500_000, None),
+]
+# What public_listing reads; the seller's details are never fetched
+PUBLIC_ATTRIBUTES = ['listingId', 'status', 'car', 'headline', 'display', 'photos', 'createdAt']
+_NOT_PRICE = re.compile(r'[^\d.]')
+
+
+def is_visible(listing):
+    """Whether handleList would show the listing"""
+    status = listing.get('status')
+    return isinstance(status, str) and status.lower() in VISIBLE_STATUSES
+
+
+def public_listing(listing, cdn_base_url='', bucket=''):
+    """The listing as sanitizeListingForPublic (customer-listings Lambda) returns it"""
+    photos = {}
+    for slot in PHOTO_SLOTS:
+        photo = (listing.get('photos') or {}).get(slot)
+        if not photo:
+            continue
+        url = ''
+        if isinstance(photo, str):
+            url = photo
+        elif photo.get('publicUrl'):
+            url = photo['publicUrl']
+        elif photo.get('url'):
+            url = photo['url']
+        elif photo.get('key') and cdn_base_url:
+            url = f"{cdn_base_url.rstrip('/')}/{photo['key']}"
+        elif photo.get('key') and bucket:
+            url = f"https://{bucket}.s3.amazonaws.com/{photo['key']}"
+        photos[slot] = {'url': url, 'key': photo if isinstance(photo, str) else photo.get('key') or photo}
+
+    car = listing.get('car') or {}
+    display = listing.get('display') or {}
+    result = {
+        'listingId': listing.get('listingId'),
+        'status': listing.get('status'),
+        'car': car,
+        'headline': listing.get('headline') or f"{car.get('make') or ''} {car.get('model') or ''}".strip(),
+        'location': display.get('location') or car.get('city') or '',
+        'summary': display.get('summary') or '',
+    }
+    if 'exteriorFront' in photos:
+        result['heroUrl'] = photos['exteriorFront']['url']
+    result['photos'] = photos
+    if listing.get('createdAt') is not None:
+        result['createdAt'] = listing['createdAt']
+    return result
+
+
+def price_of(listing):
+    """car.expectedPrice in rupees as an int ("7,50,000" included), None if it is not a number"""
+    price = (listing.get('car') or {}).get('expectedPrice')
+    if isinstance(price, bool) or price is None:
+        return None
+    try:
+        return int(float(_NOT_PRICE.sub('', price) if isinstance(price, str) else price))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def price_band(price):
+    for name, low, below in PRICE_BANDS:
+        if price >= low and (below is None or price < below):
+            return name
+    return None
+
+
+def scan_listings(scan):
+    """Plain listings from a ParallelScan, reading only PUBLIC_ATTRIBUTES"""
+    names = {f'#a{i}': name for i, name in enumerate(PUBLIC_ATTRIBUTES)}
+    for _, page in scan.pages(ProjectionExpression=','.join(names), ExpressionAttributeNames=names):
+        for item in page.get('Items', []):
+            yield unmarshal_listing(item)
+
+
+def _dumps(value):
+    return json.dumps(value, default=json_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class WriteStats:
+    """Files one write() touched"""
+
+    def __init__(self):
+        self.written = []
+        self.unchanged = 0
+        self.removed = 0
+        self.bytes = 0
+
+
+class ListingsSnapshot:
+    """Public listings held in memory and written out as a paginated static feed"""
+
+    def __init__(self, out_dir, page_size=PAGE_SIZE, cdn_base_url='', bucket='', state_path=None):
+        self.out_dir = out_dir
+        self.page_size = page_size
+        self.cdn_base_url = cdn_base_url
+        self.bucket = bucket
+        self.state_path = state_path or os.path.normpath(out_dir) + '.state.json'
+        self.listings = {}
+        self.sequences = {}         # shard -> last SequenceNumber applied
+        self.previous_files = []
+        self._rendered = {}         # listingIds of a page already on disk -> its path
+        self._dirty = set()
+
+    def load(self):
+        """Pick up the state of the last write(); False if it or its pages are gone (rebuild() first)"""
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            listings = {}
+            for path, _ in state.get('pages', []):
+                with open(os.path.join(self.out_dir, path), encoding='utf-8') as f:
+                    listings.update((item['listingId'], item) for item in json.load(f)['items'])
+        except FileNotFoundError:
+            return False
+        self.listings = listings
+        self.sequences = state.get('sequences', {})
+        self.previous_files = state.get('files', [])
+        self._rendered = {tuple(ids): path for path, ids in state.get('pages', [])}
+        self._dirty = set()
+        return True
+
+    def put(self, listing):
+        """Add, update or (if no longer visible) drop one listing; True if the feed changes"""
+        listing_id = listing.get('listingId')
+        if not isinstance(listing_id, str):
+            return False
+        if not is_visible(listing):
+            return self.remove(listing_id)
+        item = public_listing(listing, self.cdn_base_url, self.bucket)
+        if self.listings.get(listing_id) == item:
+            return False
+        self.listings[listing_id] = item
+        self._dirty.add(listing_id)
+        return True
+
+    def remove(self, listing_id):
+        if self.listings.pop(listing_id, None) is None:
+            return False
+        self._dirty.add(listing_id)
+        return True
+
+    def rebuild(self, listings):
+        """Replace everything with `listings` (plain listing dicts, e.g. from a full scan)"""
+        self.listings = {}
+        self._rendered = {}
+        for listing in listings:
+            self.put(listing)
+
+    def apply_changes(self, records, shard=None):
+        """Apply DynamoDB Streams records in order; returns how many changed the feed
+
+        Sequence numbers only increase within a shard, so the last one
+        applied is kept per shard: eventSourceARN plus the shard ID, taken
+        from the record's shardId (change logs that mix shards) or from
+        `shard` (one GetRecords batch). Records at or below it are skipped,
+        so the same change log can be replayed safely.
+        """
+        changed = 0
+        for record in records:
+            data = record.get('dynamodb', {})
+            sequence = int(data['SequenceNumber']) if data.get('SequenceNumber') else None
+            key = f"{record.get('eventSourceARN', '')}/{record.get('shardId', shard) or ''}"
+            if sequence is not None and key in self.sequences and sequence <= self.sequences[key]:
+                continue
+            if record.get('eventName') == 'REMOVE':
+                changed += self.remove(unmarshal_listing(data.get('Keys', {})).get('listingId'))
+            elif 'NewImage' in data:
+                changed += self.put(unmarshal_listing(data['NewImage']))
+            else:
+                raise ValueError('stream records need NewImage (StreamViewType NEW_IMAGE or NEW_AND_OLD_IMAGES)')
+            if sequence is not None:
+                self.sequences[key] = max(sequence, self.sequences.get(key, 0))
+        return changed
+
+    def ordered(self):
+        """Public listings, newest first"""
+        return sorted(self.listings.values(), key=lambda item: (str(item.get('createdAt') or ''), item['listingId']),
+                      reverse=True)
+
+    def paginate(self):
+        """The ordered listings cut into pages at content-defined boundaries"""
+        low, high = max(1, self.page_size // 2), self.page_size * 2
+        spread = max(1, self.page_size - low)
+        pages = [[]]
+        for item in self.ordered():
+            page = pages[-1]
+            page.append(item)
+            if len(page) >= high or (len(page) >= low and zlib.crc32(item['listingId'].encode()) % spread == 0):
+                pages.append([])
+        if len(pages) > 1 and not pages[-1]:
+            pages.pop()
+        return pages
+
+    def render(self):
+        """{relative path: bytes} of the pages, index and manifest, and the listingIds per page
+
+        A page whose listings are unchanged since the last write is not
+        serialised again: its path maps to None.
+        """
+        pages = self.paginate()
+        files = {}
+        page_ids = []
+        makes = {}
+        bands = {name: {'from': low, 'below': below, 'count': 0, 'listings': []} for name, low, below in PRICE_BANDS}
+        for number, page in enumerate(pages, 1):
+            ids = tuple(item['listingId'] for item in page)
+            path = self._rendered.get(ids)
+            if path and not self._dirty.intersection(ids) and os.path.exists(os.path.join(self.out_dir, path)):
+                files[path] = None
+            else:
+                body = _dumps({'ok': True, 'items': page})
+                path = f'pages/{hashlib.sha256(body).hexdigest()[:16]}.json'
+                files[path] = body
+            page_ids.append((path, ids))
+            for item in page:
+                price = price_of(item)
+                make = str((item['car'] or {}).get('make') or '').strip() or 'Other'
+                makes.setdefault(make, []).append([item['listingId'], price, number])
+                band = bands.get(price_band(price)) if price is not None else None
+                if band:
+                    band['count'] += 1
+                    band['listings'].append(item['listingId'])
+        for entries in makes.values():
+            entries.sort(key=lambda entry: (entry[1] is None, entry[1] or 0, entry[0]))
+        body = _dumps({'makes': dict(sorted(makes.items())), 'priceBands': bands})
+        index_path = f'index.{hashlib.sha256(body).hexdigest()[:16]}.json'
+        files[index_path] = body
+        files['manifest.json'] = _dumps({'count': len(self.listings), 'pages': [path for path, _ in page_ids],
+                                         'index': index_path})
+        return files, page_ids
+
+    def write(self):
+        """Write the feed and the state; unchanged files are left alone. Returns WriteStats"""
+        stats = WriteStats()
+        files, page_ids = self.render()
+        for path, body in sorted(files.items(), key=lambda entry: entry[0] == 'manifest.json'):
+            target = os.path.join(self.out_dir, path)
+            if body is None or path != 'manifest.json' and os.path.exists(target):
+                stats.unchanged += 1
+                continue
+            if path == 'manifest.json' and _read(target) == body:
+                stats.unchanged += 1
+                continue
+            _write_atomic(target, body)
+            stats.written.append(path)
+            stats.bytes += len(body)
+        keep = set(files) | set(self.previous_files)
+        for directory in ('', 'pages'):
+            for name in os.listdir(os.path.join(self.out_dir, directory)):
+                path = f'{directory}/{name}' if directory else name
+                if name.endswith('.json') and path not in keep:
+                    os.remove(os.path.join(self.out_dir, path))
+                    stats.removed += 1
+        self.previous_files = sorted(files)
+        self._rendered = {ids: path for path, ids in page_ids}
+        self._dirty = set()
+        _write_atomic(self.state_path, _dumps({'sequences': self.sequences, 'files': self.previous_files,
+                                               'pages': [[path, ids] for path, ids in page_ids]}))
+        return stats
+
+
+def _read(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path, body):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(body)
+    os.replace(temporary, path)
@@ -0,0 +1,17 @@
+"""
+Shared setup for the tests: the Lambda sources and listing_tools go on
+sys.path the same way as for the benchmarks, and the report Lambda skips
+its warm-up render.
+
+Run from the website directory (pip install -r requirements-dev.txt):
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+os.environ.setdefault('REPORT_WARMUP', '0')
+
+import _common  # noqa: E402,F401  (sys.path for the sources)
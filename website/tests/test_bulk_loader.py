@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+from _common import make_listings
+from listing_tools.bulk_loader import BulkLoader
+from listing_tools.listings import marshal_listing
+from listing_tools.local_dynamo import LocalDynamoDB
+
+ITEMS = 300
+
+
+def items(count=ITEMS):
+    return [marshal_listing(listing) for listing in make_listings(count)]
+
+
+def load(loader, feed, timeout=30):
+    """loader.load(feed), failing the test instead of hanging"""
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(stats=loader.load(feed)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        pytest.fail('load() did not return')
+    return result['stats']
+
+
+def test_writes_everything():
+    db = LocalDynamoDB()
+    stats = load(BulkLoader(db, 'CarListings', workers=3), items())
+    assert (stats.written, stats.failed) == (ITEMS, 0)
+    assert len(db.tables['CarListings']) == ITEMS
+
+
+def test_on_done_error_does_not_count_written_items_as_failed():
+    def on_done(done):
+        raise RuntimeError('checkpoint disk full')
+
+    db = LocalDynamoDB()
+    stats = load(BulkLoader(db, 'CarListings', workers=2, on_done=on_done), items())
+    assert (stats.written, stats.failed) == (ITEMS, 0)
+    assert len(db.tables['CarListings']) == ITEMS
+    assert stats.errors[0] == 'callback: RuntimeError: checkpoint disk full'
+
+
+def test_condition_raising_partway_counts_each_item_once():
+    feed = items()
+    broken = {item['listingId']['S'] for item in feed[::7]}
+
+    def condition(item):
+        if item['listingId']['S'] in broken:
+            raise TypeError('condition bug')
+        return {}
+
+    stats = load(BulkLoader(LocalDynamoDB(), 'CarListings', workers=2, condition=condition), feed)
+    assert (stats.written, stats.failed) == (ITEMS - len(broken), len(broken))
+    assert stats.errors[0] == 'TypeError: condition bug'
+
+
+def test_every_batch_raising_does_not_hang():
+    def condition(item):
+        raise TypeError('condition bug')
+
+    # more batches than the queue holds, so dead workers would block the producer
+    stats = load(BulkLoader(LocalDynamoDB(), 'CarListings', workers=2, condition=condition), items(2000))
+    assert (stats.written, stats.failed) == (0, 2000)
+
+
+def test_unexpected_client_response_fails_the_batch():
+    class BrokenClient:
+        def batch_write_item(self, RequestItems):
+            return None
+
+    stats = load(BulkLoader(BrokenClient(), 'CarListings', workers=2), items())
+    assert (stats.written, stats.failed, stats.batches) == (0, ITEMS, ITEMS // 25)
+    assert stats.errors[0].startswith('AttributeError')
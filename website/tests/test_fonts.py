@@ -0,0 +1,38 @@
+import io
+import re
+
+import pytest
+
+import fonts
+import lambda_function
+from _common import SAMPLE_FIELDS
+
+HINDI = 'इंजन ठीक है, तेल रिसाव नहीं'
+EMBEDDED = re.compile(rb'/BaseFont /[A-Z]{6}\+NotoSansDevanagari-Regular')
+
+
+def test_devanagari_font_is_shipped():
+    assert fonts.unicode_font() == 'NotoSansDevanagari-Regular'
+    assert fonts.unicode_font(bold=True) == 'NotoSansDevanagari-Regular'     # no bold file, regular stands in
+
+
+def test_script_runs():
+    assert fonts.script_runs('Battery OK') == [(False, 'Battery OK')]
+    assert fonts.script_runs('Paint ठीक है, dent') == [(False, 'Paint '), (True, 'ठीक'), (False, ' '),
+                                                        (True, 'है'), (False, ', dent')]
+
+
+def test_hindi_notes_embed_the_font():
+    pypdf = pytest.importorskip('pypdf')
+    pdf, _ = lambda_function.generate_pdf(dict(SAMPLE_FIELDS, engineNotes=HINDI), {})
+    assert EMBEDDED.search(pdf)
+    assert b'/FontFile2' in pdf
+    text = ''.join(page.extract_text() for page in pypdf.PdfReader(io.BytesIO(pdf)).pages)
+    # no shaping: the characters come back in Unicode order
+    assert all(word in text for word in HINDI.replace(',', '').split())
+
+
+def test_latin_report_embeds_no_ttf():
+    pdf, _ = lambda_function.generate_pdf(dict(SAMPLE_FIELDS), {})
+    assert not EMBEDDED.search(pdf)
+    assert b'/FontFile2' not in pdf
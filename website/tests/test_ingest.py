@@ -0,0 +1,62 @@
+import gzip
+import json
+
+import pytest
+
+from _common import make_listings
+from listing_tools.ingest import FeedReader, validate_listing
+
+PARSER_CASES = ['[]', ' [ ] ', '[{"a": 1}]', '[{"a": [1, {"b": "]"}]}, {"c": 2}]', '[\n 12345678901234, 2.5e10 ]',
+                '[{"a": 1},]', '[{"a": 1}, ]', '[,]', '[{"a": 1} {"b": 2}]', '[{"a": 1},', '[{"a": 1}']
+
+
+def read(path, **kwargs):
+    with FeedReader(str(path), **kwargs) as reader:
+        return list(reader)
+
+
+@pytest.mark.parametrize('text', PARSER_CASES)
+def test_array_parser_agrees_with_json_loads(tmp_path, text):
+    path = tmp_path / 'case.json'
+    path.write_text(text)
+    try:
+        expected = json.loads(text)
+    except ValueError:
+        with pytest.raises(ValueError):
+            read(path, chunk_size=4)
+    else:
+        assert [value for _, value, _ in read(path, chunk_size=4)] == expected
+
+
+def test_array_and_lines_give_the_same_rows(tmp_path):
+    listings = list(make_listings(50))
+    array, lines = tmp_path / 'feed.json', tmp_path / 'feed.jsonl.gz'
+    array.write_text(json.dumps(listings, indent=1))
+    with gzip.open(lines, 'wt') as f:
+        f.writelines(json.dumps(listing) + '\n' for listing in listings)
+    for path in (array, lines):
+        rows = read(path, chunk_size=64)
+        assert [value for _, value, _ in rows] == listings
+        assert all(not problems for _, _, problems in rows)
+
+
+def test_listing_with_a_document_slot_is_accepted(tmp_path):
+    listing = next(iter(make_listings(1)))
+    listing['photos']['rcDocument'] = {'key': 'submissions/s1/rcDocument.pdf', 'url': 'submissions/s1/rcDocument.pdf',
+                                       'contentType': 'application/pdf'}
+    path = tmp_path / 'feed.json'
+    path.write_text(json.dumps([listing]))
+    with FeedReader(str(path)) as reader:
+        rows = list(reader)
+        assert reader.invalid == 0
+    assert rows == [(1, listing, [])]
+
+
+def test_validate_listing_reports_problems():
+    listing = next(iter(make_listings(1)))
+    assert validate_listing(listing) == []
+    del listing['car']['make']
+    listing['photos'] = ['exteriorFront']
+    assert validate_listing(listing) == ['missing car.make', 'photos must be an object of slots']
+    assert validate_listing({'photos': {1: {}}, 'car': {}})[-1] == "photo slot 1 must be a string"
+    assert validate_listing([]) == ['expected an object, got list']
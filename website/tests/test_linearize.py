@@ -0,0 +1,120 @@
+import io
+import logging
+import re
+
+import pytest
+
+from reportlab import rl_config
+
+import lambda_function
+from _common import SAMPLE_FIELDS, make_photo_files
+from linearize import linearize, linearize_file
+
+pypdf = pytest.importorskip('pypdf')
+pymupdf = pytest.importorskip('pymupdf')
+
+# the first-page xref section does not start at object 0, which is how linearized files are made
+logging.getLogger('pypdf').setLevel(logging.ERROR)
+
+LINEARIZATION = re.compile(rb'\d+ 0 obj\n<< /Linearized 1 /L +(\d+) /H \[ +(\d+) +(\d+) \] /O (\d+) /E +(\d+) '
+                           rb'/N (\d+) /T +(\d+) >>')
+
+
+def read_bits(data, layout):
+    """Unpack (name, bits) fields from the start of data; returns (dict, bytes used)"""
+    value = int.from_bytes(data, 'big')
+    total = len(data) * 8
+    at = 0
+    out = {}
+    for name, bits in layout:
+        out[name] = (value >> (total - at - bits)) & ((1 << bits) - 1)
+        at += bits
+    return out, at // 8
+
+
+def page_objects(page):
+    """Object numbers page uses (not following /Parent)"""
+    seen = set()
+    todo = [page]
+    while todo:
+        obj = todo.pop()
+        if isinstance(obj, pypdf.generic.IndirectObject):
+            if obj.idnum in seen:
+                continue
+            seen.add(obj.idnum)
+            obj = obj.get_object()
+        if isinstance(obj, dict):
+            todo.extend(v for k, v in obj.items() if k != '/Parent')
+        elif isinstance(obj, list):
+            todo.extend(obj)
+    return seen
+
+
+@pytest.fixture(scope='module', params=[1, 0], ids=['ascii85', 'binary'])
+def report(request):
+    """(plain, linearized) report PDFs with ASCII85 or binary streams"""
+    use_a85 = rl_config.useA85
+    rl_config.useA85 = request.param
+    try:
+        pdf, _ = lambda_function.generate_pdf(dict(SAMPLE_FIELDS), make_photo_files(3, (800, 600)))
+    finally:
+        rl_config.useA85 = use_a85
+    return pdf, linearize(pdf)
+
+
+def test_linearization_dictionary_and_xrefs(report):
+    _, data = report
+    match = LINEARIZATION.search(data, 0, 300)
+    assert match, 'no linearization dictionary at the start of the file'
+    length, hint_at, hint_len, first_page, _, pages, main_entry = map(int, match.groups())
+    reader = pypdf.PdfReader(io.BytesIO(data), strict=True)
+    assert pages == len(reader.pages) > 1
+    assert length == len(data)
+    assert first_page == reader.pages[0].indirect_reference.idnum
+    first_xref = int(re.search(rb'startxref\s+(\d+)\s+%%EOF\s*$', data).group(1))
+    assert first_xref == match.end() + len('\nendobj\n')
+    assert data[main_entry + 1:main_entry + 21] == b'0000000000 65535 f \n'
+    assert re.match(rb'\d+ 0 obj', data[hint_at:]) and data[:hint_at + hint_len].endswith(b'endobj\n')
+
+
+def test_hints_and_first_page_objects(report):
+    _, data = report
+    _, hint_at, hint_len, _, end, pages, _ = map(int, LINEARIZATION.search(data, 0, 300).groups())
+    reader = pypdf.PdfReader(io.BytesIO(data), strict=True)
+    offsets = reader.xref[0]
+
+    # page offset hint table: page k starts at first page + lengths of pages before it
+    hint = data[data.index(b'stream\n', hint_at) + 7:hint_at + hint_len]
+    header, used = read_bits(hint, [('least_objects', 32), ('first_page', 32), ('object_bits', 16),
+                                    ('least_length', 32), ('length_bits', 16), ('x', 32), ('x', 16),
+                                    ('x', 32), ('x', 16), ('x', 16), ('x', 16), ('x', 16), ('x', 16)])
+    skip = (pages * header['object_bits'] + 7) // 8
+    lengths, _ = read_bits(hint[used + skip:], [(i, header['length_bits']) for i in range(pages)])
+    at = header['first_page'] + hint_len
+    for i, page in enumerate(reader.pages):
+        assert offsets[page.indirect_reference.idnum] == at, f'page {i + 1}'
+        at += header['least_length'] + lengths[i]
+    assert [n for n in page_objects(reader.pages[0].indirect_reference) if offsets[n] >= end] == []
+
+
+def test_pages_unchanged_and_fast_web_view(report):
+    original, data = report
+    before = pymupdf.open(stream=original)
+    after = pymupdf.open(stream=data)
+    assert after.is_fast_webaccess and not after.is_repaired
+    assert len(before) == len(after)
+    for a, b in zip(before, after):
+        assert a.get_text() == b.get_text()
+        assert a.get_pixmap(dpi=36).samples == b.get_pixmap(dpi=36).samples
+
+
+def test_linearize_file_in_place(report):
+    original, data = report
+    f = io.BytesIO(original)
+    assert linearize_file(f) == len(data) == f.tell()
+    assert f.getvalue() == data
+
+
+def test_rejects_what_it_cannot_handle():
+    with pytest.raises(ValueError):
+        linearize(b'%PDF-1.4\nnot really a pdf\n')
@@ -0,0 +1,66 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+from _common import PHOTOS_SRC, make_photo
+from object_store import LocalObjectStore, s3_event
+from photo_derivatives import UnreadablePhoto, make_derivatives
+
+PREFIX = 'submissions/sub_1/'
+
+
+def load_handler():
+    """listing-photos lambda_function (the report Lambda's has the same module name)"""
+    spec = importlib.util.spec_from_file_location('listing_photos_lambda', os.path.join(PHOTOS_SRC, 'lambda_function.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.lambda_handler
+
+
+class FailingStore(LocalObjectStore):
+    """Reads of `broken` fail the way a dropped S3 connection does"""
+
+    def __init__(self, broken):
+        super().__init__()
+        self.broken = broken
+
+    def get(self, key):
+        if key == self.broken:
+            raise ConnectionResetError('connection reset by peer')
+        return super().get(key)
+
+
+@pytest.mark.parametrize('data', [b'not an image', make_photo(1, (400, 300))[:2000], b''])
+def test_undecodable_data_is_unreadable(data):
+    with pytest.raises(UnreadablePhoto):
+        make_derivatives(data)
+
+
+def test_bad_uploads_are_skipped_not_retried():
+    handler = load_handler()
+    store = LocalObjectStore()
+    store.put(PREFIX + 'exteriorFront.jpg', make_photo(1, (800, 600)), 'image/jpeg')
+    store.put(PREFIX + 'exteriorBack.jpg', b'<html>not a photo</html>', 'image/jpeg')
+    store.put(PREFIX + 'exteriorLeft.jpg', make_photo(2, (800, 600))[:3000], 'image/jpeg')
+    event = s3_event('listings', *(PREFIX + f'{slot}.jpg' for slot in
+                                   ('exteriorFront', 'exteriorBack', 'exteriorLeft', 'exteriorRight')))
+
+    body = json.loads(handler(event, None, store)['body'])
+    assert body == {'processed': [PREFIX + 'exteriorFront.jpg'],
+                    'skipped': [PREFIX + 'exteriorBack.jpg', PREFIX + 'exteriorLeft.jpg', PREFIX + 'exteriorRight.jpg']}
+    assert PREFIX + 'exteriorFront.derivatives.json' in store.objects
+    assert PREFIX + 'exteriorBack.derivatives.json' not in store.objects
+
+
+def test_store_errors_fail_the_event():
+    handler = load_handler()
+    store = FailingStore(PREFIX + 'exteriorBack.jpg')
+    for i, slot in enumerate(('exteriorFront', 'exteriorBack')):
+        store.put(PREFIX + f'{slot}.jpg', make_photo(i, (800, 600)), 'image/jpeg')
+    event = s3_event('listings', PREFIX + 'exteriorBack.jpg', PREFIX + 'exteriorFront.jpg')
+
+    with pytest.raises(RuntimeError, match='exteriorBack'):
+        handler(event, None, store)
+    assert PREFIX + 'exteriorFront.derivatives.json' in store.objects
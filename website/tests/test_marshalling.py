@@ -0,0 +1,124 @@
+import copy
+import random
+from decimal import Decimal
+
+import pytest
+
+from _common import make_listings
+from listing_tools.listings import marshal_listing, unmarshal_listing
+from listing_tools.marshalling import (ANY, ListOf, MapOf, Number, SetOf, compile_marshaller,
+                                       compile_unmarshaller, from_attribute, to_attribute)
+
+
+def random_value(rng, depth=0):
+    kinds = ['str', 'int', 'decimal', 'float', 'bool', 'none', 'bytes', 'sset', 'nset']
+    if depth < 3:
+        kinds += ['map', 'list']
+    kind = rng.choice(kinds)
+    if kind == 'str':
+        return ''.join(rng.choice('abc xyz-éक') for _ in range(rng.randrange(8)))
+    if kind == 'int':
+        return rng.randint(-10**12, 10**12)
+    if kind == 'decimal':
+        return Decimal(rng.randint(-10**6, 10**6)).scaleb(-rng.randrange(1, 6))
+    if kind == 'float':
+        return rng.uniform(-1e6, 1e6)
+    if kind == 'bool':
+        return rng.random() < 0.5
+    if kind == 'none':
+        return None
+    if kind == 'bytes':
+        return rng.randbytes(rng.randrange(1, 8))
+    if kind == 'sset':
+        return {f's{rng.randrange(100)}' for _ in range(rng.randrange(1, 5))}
+    if kind == 'nset':
+        return {rng.randrange(1000) for _ in range(rng.randrange(1, 5))}
+    if kind == 'map':
+        return {f'f{i}': random_value(rng, depth + 1) for i in range(rng.randrange(4))}
+    return [random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+
+
+def mutate(listing, rng):
+    """A listing that bends the schema in a few random ways"""
+    listing = copy.deepcopy(listing)
+    for _ in range(rng.randrange(6)):
+        nested = [listing.get(name) for name in ('car', 'seller', 'photos')]
+        target = rng.choice([listing] + [d for d in nested if isinstance(d, dict) and d])
+        action = rng.choice(['drop', 'extra', 'retype', 'none'])
+        key = rng.choice(sorted(target))
+        if action == 'drop':
+            del target[key]
+        elif action == 'extra':
+            target[f'extra{rng.randrange(100)}'] = random_value(rng)
+        elif action == 'retype':
+            target[key] = random_value(rng)
+        else:
+            target[key] = None
+    return listing
+
+
+def expected(value):
+    """What a value looks like after a round trip"""
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    if isinstance(value, dict):
+        return {k: expected(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [expected(v) for v in value]
+    if isinstance(value, Decimal) and value == value.to_integral_value():
+        return int(value)
+    return value
+
+
+def test_plain_listings_match_the_generic_converter():
+    for listing in make_listings(200):
+        item = marshal_listing(listing)
+        assert item == to_attribute(listing)['M']
+        assert unmarshal_listing(item) == listing
+
+
+def test_plain_listings_match_boto3():
+    types = pytest.importorskip('boto3.dynamodb.types')
+    serializer = types.TypeSerializer()
+    for listing in make_listings(50):
+        assert marshal_listing(listing) == serializer.serialize(listing)['M']
+
+
+def test_random_listings_round_trip():
+    rng = random.Random(1)
+    for listing in make_listings(2000):
+        bent = mutate(listing, rng)
+        item = marshal_listing(bent)
+        assert item == to_attribute(bent)['M']
+        assert unmarshal_listing(item) == expected(bent) == from_attribute({'M': item})
+
+
+def test_photos_map_takes_any_slot():
+    listing = next(iter(make_listings(1)))
+    listing['photos']['rcDocument'] = {'key': 'submissions/s1/rcDocument.pdf', 'url': 'https://x/rc.pdf',
+                                       'contentType': 'application/pdf', 'pages': 2}
+    listing['photos']['odometer'] = 'not a photo record'
+    item = marshal_listing(listing)
+    assert item['photos']['M']['rcDocument']['M']['contentType'] == {'S': 'application/pdf'}
+    assert item['photos']['M']['rcDocument']['M']['pages'] == {'N': '2'}
+    assert item['photos']['M']['odometer'] == {'S': 'not a photo record'}
+    assert unmarshal_listing(item) == listing
+
+
+@pytest.mark.parametrize('schema, value', [
+    (MapOf(Number), {'a': 1, 'b': Decimal('2.5'), 'c': 'three'}),
+    (MapOf(ListOf(str)), {'x': ['a', 'b'], 'y': [], 'z': ['a', 1, None]}),
+    (MapOf({'n': Number}), {'k': {'n': 1, 'extra': True}, 'j': {}}),
+    (MapOf(str), 'not a map'),
+    (ListOf(MapOf(bool)), [{'a': True}, {}, {'b': False, 'c': 'x'}]),
+    (SetOf(str), {'a', 'b'}),
+    (SetOf(Number), {1, 2, 3}),
+    (ANY, [b'\x00', {'q': None}]),
+])
+def test_schemas_round_trip(schema, value):
+    marshal = compile_marshaller({'field': schema})
+    unmarshal = compile_unmarshaller({'field': schema})
+    item = marshal({'field': value})
+    assert item == to_attribute({'field': value})['M']
+    assert unmarshal(item) == expected({'field': value})
+    assert unmarshal({}) == {} and marshal({}) == {}
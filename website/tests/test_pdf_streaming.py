@@ -0,0 +1,44 @@
+import io
+import re
+
+import pytest
+
+import lambda_function
+from _common import SAMPLE_FIELDS, make_photo_files
+
+PAGE = re.compile(rb'/Type /Page\b(?!s)')
+
+
+@pytest.fixture
+def fixed_report_id(monkeypatch):
+    monkeypatch.setattr(lambda_function, 'new_report_id', lambda: 'IW-TEST')
+
+
+def test_pages_are_written_before_save(monkeypatch, fixed_report_id):
+    before_save = []
+    save = lambda_function.FooterCanvas.save
+
+    def record(canvas):
+        before_save.append(canvas._filename.getvalue())
+        save(canvas)
+
+    monkeypatch.setattr(lambda_function.FooterCanvas, 'save', record)
+    sink = io.BytesIO()
+    lambda_function.generate_pdf(dict(SAMPLE_FIELDS), make_photo_files(8), output=sink)
+    pages = len(PAGE.findall(sink.getvalue()))
+    assert pages > 1
+    assert len(PAGE.findall(before_save[0])) == pages
+
+
+def test_streamed_pdf_matches_in_memory(fixed_report_id):
+    pypdf = pytest.importorskip('pypdf')
+    photos = make_photo_files(4)
+    pdf, _ = lambda_function.generate_pdf(dict(SAMPLE_FIELDS), photos)
+    sink = io.BytesIO()
+    lambda_function.generate_pdf(dict(SAMPLE_FIELDS), photos, output=sink)
+    memory = pypdf.PdfReader(io.BytesIO(pdf), strict=True)
+    streamed = pypdf.PdfReader(io.BytesIO(sink.getvalue()), strict=True)
+    assert len(streamed.pages) == len(memory.pages)
+    for number, (a, b) in enumerate(zip(memory.pages, streamed.pages), 1):
+        assert f'Page {number} of {len(memory.pages)}' in b.extract_text()
+        assert sorted(a.extract_text().split()) == sorted(b.extract_text().split())
@@ -0,0 +1,64 @@
+import io
+
+from PIL import Image
+from reportlab.lib.utils import ImageReader
+
+import lambda_function
+from _common import SAMPLE_FIELDS, make_photo, make_photo_files
+from pdf_writer import ReportCanvas
+
+
+def render(draws):
+    """PDF bytes of one page per list of ImageReaders in draws"""
+    output = io.BytesIO()
+    canvas = ReportCanvas(output)
+    for images in draws:
+        for i, image in enumerate(images):
+            canvas.drawImage(image, 10 + 110 * i, 10, 100, 75)
+        canvas.showPage()
+    canvas.save()
+    return output.getvalue()
+
+
+def images(pdf):
+    return pdf.count(b'/Subtype /Image')
+
+
+def png(seed):
+    output = io.BytesIO()
+    Image.open(io.BytesIO(make_photo(seed, (64, 48)))).save(output, 'PNG')
+    return output.getvalue()
+
+
+def test_same_jpeg_bytes_embedded_once():
+    photo = make_photo(1, (400, 300))
+    once = render([[ImageReader(io.BytesIO(photo))]])
+    # separate readers over the same bytes, on one page and across pages
+    repeated = render([[ImageReader(io.BytesIO(photo)), ImageReader(io.BytesIO(photo))],
+                       [ImageReader(io.BytesIO(photo))]])
+    assert images(once) == images(repeated) == 1
+    assert len(repeated) - len(once) < 1024
+
+
+def test_different_jpegs_are_kept_apart():
+    pdf = render([[ImageReader(io.BytesIO(make_photo(1, (400, 300)))),
+                   ImageReader(io.BytesIO(make_photo(2, (400, 300))))]])
+    assert images(pdf) == 2
+
+
+def test_non_jpeg_images_use_reportlab_naming():
+    assert ReportCanvas._jpegKey(ImageReader(io.BytesIO(png(1)))) is None
+    pdf = render([[ImageReader(io.BytesIO(png(1))), ImageReader(io.BytesIO(png(1))),
+                   ImageReader(io.BytesIO(png(2)))]])
+    assert images(pdf) == 2
+
+
+def test_report_with_repeated_photos_adds_no_images():
+    photos = make_photo_files(4)
+    repeated = dict(photos)
+    for name, photo in photos.items():
+        repeated[name + '_again'] = dict(photo)
+    single, _ = lambda_function.generate_pdf(dict(SAMPLE_FIELDS), photos)
+    double, _ = lambda_function.generate_pdf(dict(SAMPLE_FIELDS), repeated)
+    assert images(single) == images(double)
+    assert len(double) - len(single) < 2048 * len(photos)
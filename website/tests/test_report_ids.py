@@ -0,0 +1,59 @@
+import itertools
+import multiprocessing
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import report_ids
+from report_ids import new_report_id, report_id_time
+
+ID = re.compile(r'INS-[0-9A-HJKMNP-TV-Z]{16}')
+
+
+def batch(count):
+    return [new_report_id() for _ in range(count)]
+
+
+def node(report_id):
+    return report_id[13:17]
+
+
+def test_format_and_time():
+    report_id = new_report_id()
+    assert ID.fullmatch(report_id)
+    assert abs(report_id_time(report_id) - time.time()) < 2
+    assert new_report_id('PRE').startswith('PRE-')
+
+
+def test_increasing_within_a_thread():
+    ids = batch(100_000)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_unique_across_threads():
+    with ThreadPoolExecutor(4) as pool:
+        batches = list(pool.map(batch, [20_000] * 4))
+    assert all(ids == sorted(ids) for ids in batches)
+    assert len({i for ids in batches for i in ids}) == 80_000
+
+
+def test_forked_children_draw_a_new_node():
+    parent = batch(1000)
+    with multiprocessing.get_context('fork').Pool(3) as pool:
+        children = pool.map(batch, [20_000] * 3)
+    assert all(ids == sorted(ids) for ids in children)
+    assert len({node(ids[0]) for ids in children} | {node(parent[0])}) == 4
+    everything = parent + [i for ids in children for i in ids]
+    assert len(set(everything)) == len(everything)
+
+
+def test_sequence_wrap_waits_for_the_next_millisecond(monkeypatch):
+    clock = itertools.chain([5_000_000] * 4, itertools.count(5_000_001))
+    monkeypatch.setattr(report_ids, '_now_ms', lambda: next(clock))
+    monkeypatch.setattr(report_ids, '_sequence', itertools.count(0x7FFE))
+    monkeypatch.setattr(report_ids._last, 'value', -1, raising=False)
+    ids = batch(4)      # sequence 7FFE, 7FFF, then 0 and 1, which must not sort first
+    assert ids == sorted(ids)
+    assert [report_id_time(i) for i in ids][:2] == [5000.0, 5000.0]
+    assert report_id_time(ids[2]) > 5000.0
@@ -0,0 +1,71 @@
+import json
+
+from _common import make_listings
+from listing_tools.listings import marshal_listing
+from listing_tools.snapshot import ListingsSnapshot
+
+STREAM = 'arn:aws:dynamodb:ap-south-1:123456789012:table/CarListings/stream/2025-01-01T00:00:00.000'
+
+
+def record(listing, sequence, shard=None, status='approved'):
+    item = marshal_listing(dict(listing, status=status))
+    result = {'eventName': 'MODIFY', 'eventSourceARN': STREAM,
+              'dynamodb': {'Keys': {'listingId': item['listingId']}, 'NewImage': item, 'SequenceNumber': str(sequence)}}
+    if shard:
+        result['shardId'] = shard
+    return result
+
+
+def hidden_listings(count):
+    return [dict(listing, status='pending') for listing in make_listings(count)]
+
+
+def test_interleaved_shards_are_all_applied(tmp_path):
+    a, b, c, d = hidden_listings(4)
+    snapshot = ListingsSnapshot(str(tmp_path / 'feed'))
+    # Each shard's numbers increase, but shard-2 starts below shard-1's
+    records = [record(a, 300, 'shard-1'), record(b, 150, 'shard-2'),
+               record(c, 310, 'shard-1'), record(d, 160, 'shard-2')]
+    assert snapshot.apply_changes(records) == 4
+    assert set(snapshot.listings) == {a['listingId'], b['listingId'], c['listingId'], d['listingId']}
+    assert snapshot.sequences == {f'{STREAM}/shard-1': 310, f'{STREAM}/shard-2': 160}
+
+    # Replaying the log, or an older record of either shard, changes nothing
+    assert snapshot.apply_changes(records) == 0
+    assert snapshot.apply_changes([record(b, 155, 'shard-2', status='rejected')]) == 0
+    assert snapshot.apply_changes([record(b, 161, 'shard-2', status='rejected')]) == 1
+    assert b['listingId'] not in snapshot.listings
+
+
+def test_shard_argument_for_one_batch(tmp_path):
+    a, b = hidden_listings(2)
+    snapshot = ListingsSnapshot(str(tmp_path / 'feed'))
+    assert snapshot.apply_changes([record(a, 500)], shard='shard-1') == 1
+    assert snapshot.apply_changes([record(b, 20)], shard='shard-2') == 1
+    assert snapshot.apply_changes([record(b, 20)], shard='shard-2') == 0
+
+
+def test_state_survives_a_reload(tmp_path):
+    out_dir = str(tmp_path / 'feed')
+    snapshot = ListingsSnapshot(out_dir, page_size=4)
+    snapshot.rebuild(make_listings(100))
+    snapshot.apply_changes([record(next(iter(hidden_listings(1))), 7, 'shard-1', status='rejected')])
+    snapshot.write()
+    with open(snapshot.state_path, encoding='utf-8') as f:
+        assert 'listings' not in json.load(f)
+
+    again = ListingsSnapshot(out_dir, page_size=4)
+    assert again.load()
+    assert again.listings == snapshot.listings and again.sequences == snapshot.sequences
+    assert again.write().written == []
+
+
+def test_load_needs_the_pages(tmp_path):
+    out_dir = tmp_path / 'feed'
+    snapshot = ListingsSnapshot(str(out_dir))
+    assert not snapshot.load()
+    snapshot.rebuild(make_listings(50))
+    snapshot.write()
+    for page in (out_dir / 'pages').iterdir():
+        page.unlink()
+    assert not ListingsSnapshot(str(out_dir)).load()